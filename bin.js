@@ -48,6 +48,114 @@ let argv = yargs
 
         }
     )
+    .command(
+        'snapshot <output> [packages..]',
+        'Build an offline snapshot of PyPI package metadata for use with `v2 run --snapshot`.',
+        (yargs) => {
+
+            yargs.option('from', {
+                type: 'string',
+                describe: 'Directory of PyPI JSON API responses (<package>.json) to load into the snapshot.'
+            });
+
+            yargs.positional('output', {
+                type: 'string',
+                describe: 'Snapshot file to write.'
+            });
+
+            yargs.positional('packages', {
+                type: 'string',
+                describe: 'Names of packages to fetch from PyPI into the snapshot.'
+            });
+
+        },
+        async (argv) => {
+
+            // Enable full logging
+            logger.level = 'silly';
+
+            // Build snapshot
+            return (new V2()).snapshot(_.omitBy({
+                output: argv.output,
+                packages: argv.packages,
+                from: argv.from
+            }, _.isUndefined));
+
+        }
+    )
+    .command(
+        'ingest-apt',
+        'Ingest the apt Packages indexes of the V2 base distribution into a local index used for apt version lookups.',
+        (yargs) => {},
+        async (argv) => {
+
+            // Enable full logging
+            logger.level = 'silly';
+
+            // Ingest
+            return (new V2()).ingestApt();
+
+        }
+    )
+    .command(
+        'index-resources',
+        'Export the index of resource names to packages from the graph into the V2 data directory.',
+        (yargs) => {},
+        async (argv) => {
+
+            // Enable full logging
+            logger.level = 'silly';
+
+            // Index
+            return (new V2()).indexResources();
+
+        }
+    )
+    .command(
+        'compile-version-matrix',
+        'Compile the version upgrade matrix in the graph into per-package artifacts in the V2 data directory.',
+        (yargs) => {},
+        async (argv) => {
+
+            // Enable full logging
+            logger.level = 'silly';
+
+            // Compile
+            return (new V2()).compileVersionMatrix();
+
+        }
+    )
+    .command(
+        'build-wheels <requirements..>',
+        'Build wheels for pinned pip requirements that only publish an sdist, so validations install them without compiling.',
+        (yargs) => {
+
+            yargs.option('interpreter', {
+                type: 'string',
+                describe: 'Python interpreter version to build for.',
+                default: '3.7',
+                choices: ['2.7', '3.7']
+            });
+
+            yargs.positional('requirements', {
+                type: 'string',
+                describe: 'Requirements as <name>==<version>, in installation order.'
+            });
+
+        },
+        async (argv) => {
+
+            // Enable full logging
+            logger.level = 'silly';
+
+            // Build
+            return (new V2()).buildWheels({
+                requirements: argv.requirements,
+                interpreter: argv.interpreter
+            });
+
+        }
+    )
     .command(
         'run [package]',
         'Dockerize a package',
@@ -63,7 +171,7 @@ let argv = yargs
                 type: 'string',
                 describe: 'Search strategy.',
                 default: 'feedback-directed',
-                choices: ['level-order', 'id-dfs', 'feedback-directed']
+                choices: ['level-order', 'id-dfs', 'feedback-directed', 'best-first']
             });
 
             yargs.option('cmd', {
@@ -106,6 +214,16 @@ let argv = yargs
                 default: 'v2'
             });
 
+            yargs.option('snapshot', {
+                type: 'string',
+                describe: 'Serve PyPI package metadata from an offline snapshot built by `v2 snapshot`. No PyPI requests are made.'
+            });
+
+            yargs.option('era', {
+                type: 'string',
+                describe: 'Start from the package versions released by a date (YYYY-MM-DD), or by a date estimated from the code with `auto`.'
+            });
+
             yargs.option('no-validate', {
                 type: 'boolean',
                 describe: 'Do not run validation. Using this option will cause V2 to return the first environment it successfully parses.',
@@ -157,6 +275,8 @@ let argv = yargs
                 format,
                 only,
                 noValidate: argv.noValidate,
+                snapshot: argv.snapshot,
+                era: argv.era,
             }, _.isUndefined));
 
             // Print
@@ -16,33 +16,51 @@ const url                    = require('url');
 
 
 // Local Modules
+const cache                  = require('./src/cache');
 const errors                 = require('./src/errors');
 const factory                = require('./src/strategy-factory');
+const knowledgeBase          = require('./src/knowledge-base');
 const logger                 = require('./src/logger');
 const tools                  = require('./src/build-tools');
+const versionUtils           = require('./src/version-utils');
 const metadata               = require('./src/metadata');
 const mutation               = require('./src/mutation');
+const constraintCheck        = require('./src/mutation/constraint-check');
+const installCost            = require('./src/mutation/install-cost');
+const successModel           = require('./src/mutation/success-model');
+const TranspositionTable     = require('./src/mutation/transposition-table');
+const versionMatrix          = require('./src/mutation/version-matrix');
 const neo4j                  = require('./src/neo4j');
+const PackageIndex           = require('./src/systems/apt/package-index');
+const ResourceIndex          = require('./src/neo4j/resource-index');
+const Refresher              = require('./src/refresher');
+const PyPIMetadata           = require('./src/systems/pip/metadata');
+const Snapshot               = require('./src/systems/pip/snapshot');
 
 
 // Constants
 const SUCCESS                = 'Success';
+const SKIPPED                = 'Skipped';
 const ERRORS_PATH            = 'dependencies.install_errors';
+const INSTALL_STATUS_PATH    = 'dependencies.status_code';
+const DEFAULT_INTERPRETER    = '3.7';
 const ENCODING               = 'utf-8';
 const TRUNCATE_BYTES         = 1024;
+const SNAPSHOT_STALE         = 604800;  // Warn when serving from a snapshot older than one week (in seconds).
 const RESOURCE_LOOKUP        = `
+UNWIND $names AS name
 CALL apoc.cypher.run(
     'MATCH (resource :resource)<-[:resource]-(version :version)<-[:version]-(package :package {system: {system}}) ' +
     'WHERE toLower({name}) STARTS WITH toLower(resource.name) ' +
     'RETURN package, version ' +
     'UNION ALL ' +
     'MATCH (package :package {name: {name}, system: {system}})-[:version]->(version :version) ' +
-    'RETURN package, version', 
-    {name: $name, system: $system}
+    'RETURN package, version',
+    {name: name, system: $system}
 ) YIELD value
-WITH value.package AS package, value.version AS version
-WITH DISTINCT package AS package, collect(DISTINCT version) AS versions, max(version.version) AS max_version
-RETURN package, head([v IN versions WHERE v.version = max_version]) AS version
+WITH name, value.package AS package, value.version AS version
+WITH name, package, collect(DISTINCT version) AS versions, max(version.version) AS max_version
+RETURN name, package, head([v IN versions WHERE v.version = max_version]) AS version
 `;
 const RESOURCE_DEP_LOOKUP    = `
 MATCH (n :package {name: {name}, system: {system}})-[:version]->(:version)-[:resource_dependency]->(:resource)<-[:resource]-(version :version)<-[:version]-(dependency:package)
@@ -56,6 +74,25 @@ OPTIONAL MATCH (dependency)-[:version]->(version :version)
 WITH DISTINCT dependency AS dependency, collect(DISTINCT version) AS versions, max(version.version) AS max_version
 RETURN dependency, head([v IN versions WHERE v.version = max_version]) AS version
 `;
+const DEPENDENCY_QUERIES     = {
+    deps: RESOURCE_DEP_LOOKUP,
+    assoc: ASSOCIATION_DEP_LOOKUP,
+    all: `${RESOURCE_DEP_LOOKUP}\nUNION\n${ASSOCIATION_DEP_LOOKUP}`
+};
+const DEPENDENCY_LOOKUP      = `
+UNWIND $nodes AS node
+CALL apoc.cypher.run($query, {name: node.name, system: node.system}) YIELD value
+RETURN node.name AS name, node.system AS system, value.dependency AS dependency
+`;
+
+// Packages found providing each resource, keyed by system and resource name. Shared across environments and
+// inferences in the same process.
+const resourceLookups        = new Map();
+
+// Dependencies found for each package, keyed by query mode, package name, and system. Shared across environments and
+// inferences in the same process.
+const dependencyExpansions   = new Map();
+const expansionKey           = (mode, node) => `${mode},${node.name},${node.system}`;
 
 // Example of filtering associations by confidence and lift values using Cypher
 // const ASSOCIATION_DEP_LOOKUP = `
@@ -205,6 +242,7 @@ class V2 {
      * @param   {String}                   [options.only]                     Only use specific rules for generating dependencies.
      * @param   {Boolean}                  [options.noValidate]               Disables validation. Inference will instead return the first environment to successfully parse.
      * @param   {String}                   [options.search=feedback-directed] Search strategy used to generate new environments.
+     * @param   {String}                   [options.era]                      Start from versions released by this date, or by an estimated date if `auto`.
      * @returns {Promise<InferenceResult>}                                    Inference with successful environment specification.
      */
     async infer(options = {}) {
@@ -215,6 +253,11 @@ class V2 {
             throw new errors.InferenceError(`Unknown search strategy: ${options.search}`);
         }
 
+        // Check the era is a date
+        if (options.era && options.era !== 'auto' && _.isNaN(Date.parse(options.era))) {
+            throw new errors.InferenceError(`Invalid era: ${options.era}`);
+        }
+
         // Get the language strategy for the current language
         const language = factory.getLanguageStrategy(metadata.language);
 
@@ -239,7 +282,11 @@ class V2 {
             // Look up transitive dependencies and installation order
             if (options.only !== 'none') {
                 logger.info('Resolving transitive dependencies.');
-                let transitiveLookup = await this.lookupTransitiveDependencies(directLookup.items, options);
+                let transitiveLookup = await this.lookupTransitiveDependencies(
+                    directLookup.items,
+                    options,
+                    environment.docker.imageTag
+                );
                 environment.metadata.transitiveDependencies = transitiveLookup;
                 environment.dependencies = transitiveLookup.installOrder;
             }
@@ -248,18 +295,41 @@ class V2 {
                 environment.dependencies = directLookup.items;
             }
 
+            // Start from the versions current when the code was written, if requested, then from any versions the
+            // code states it requires
+            if (options.era) await this.pinToEra(environment, options.era);
+            await this.pinToRequirements(environment);
+
             // Log base environment with resolved packages
             await this.logConsul(`base-environments/${environment.id}`, environment);
 
         });
 
+        // Seed extra starting environments from the nearest solved codebases. Seeds are searched first, so they are only
+        // added when validating, otherwise a seed would be returned in place of the parsed environment.
+        let seeds = options.noValidate ? [] : _.flatMap(environments, e => knowledgeBase.seed(e));
+        environments = _.concat(seeds, environments);
+
         // Create inference metadata
         let inferenceMetadata = {
             start: _.toInteger(Date.now() / 1000),
             failedValidations: [],
             numValidations: 0,
+            reusedValidations: 0,
+            repairedEnvironments: 0,
+            rejectedEnvironments: 0,
+            seededEnvironments: seeds.length,
         };
 
+        // Report the age of any offline metadata snapshot so staleness is visible
+        if (metadata.snapshot) {
+            let snapshot = Snapshot.open(metadata.snapshot);
+            inferenceMetadata.snapshot = snapshot.toJSON();
+            let message = `Served PyPI metadata from snapshot ${snapshot.path} (${snapshot.count} packages, ${_.round(snapshot.age / 86400, 1)} days old)`;
+            if (snapshot.age > SNAPSHOT_STALE) logger.warn(message);
+            else logger.info(message);
+        }
+
         // If noValidate is specified, immediately return the first environment.
         if (options.noValidate) {
 
@@ -280,6 +350,9 @@ class V2 {
         // Create mutation generator
         let mutantGenerator = searchStrategy(environments);
 
+        // Validations by environment fingerprint, so environments reached more than once are only validated once
+        let validations = new TranspositionTable();
+
         // Get the first yielded result from the generator. Continue to validate until the generator finishes.
         let control = await mutantGenerator.next();
         while (!control.done) {
@@ -298,6 +371,20 @@ class V2 {
             // Reference the generated environment
             let environment = control.value;
 
+            // Check that the pinned versions satisfy each other's requirements, repairing the environment if any have
+            // to be changed. Repairs are made in place, so the search continues from the repaired environment. Mutants
+            // that still conflict are not validated. The generator is given a skipped result instead, which search
+            // strategies treat as telling them nothing. Starting environments are always validated, since search
+            // strategies need their result.
+            let check = await constraintCheck.resolve(environment);
+            if (check.repairs.length) inferenceMetadata.repairedEnvironments++;
+            if (check.conflicts.length && !_.isEmpty(environment.metadata.mutations)) {
+                logger.info(`Skipping environment with conflicting requirements:\n${JSON.stringify(check.conflicts, null, 4)}`);
+                inferenceMetadata.rejectedEnvironments++;
+                control = await mutantGenerator.next({ status_code: SKIPPED, conflicts: check.conflicts });
+                continue;
+            }
+
             // Log
             let logValidationData = {
                 imageName: environment.docker.imageName,
@@ -307,17 +394,31 @@ class V2 {
             };
             logger.info(`Validating environment:\n${JSON.stringify(logValidationData, null, 4)}`);
 
-            // Validate
-            let validation = await language.validateEnvironment(environment);
-
-            // Increment number of validations
-            inferenceMetadata.numValidations++;
+            // Reuse the validation of an identical environment if there is one. Otherwise, validate.
+            let validation = validations.get(environment);
+            if (validation) {
+                logger.info('Environment was already validated, reusing result');
+                inferenceMetadata.reusedValidations++;
+            }
+            else {
+                validation = await language.validateEnvironment(environment);
+                inferenceMetadata.numValidations++;
+                installCost.record(environment, validation);
+                successModel.record(environment, validation.status_code === SUCCESS);
+
+                // Once dependencies are known to install, build wheels for any built from source in the background
+                if (_.get(validation, INSTALL_STATUS_PATH) === SUCCESS) {
+                    language.prebuild(environment.docker.imageTag, environment.dependencies)
+                        .catch(e => logger.warn(`Unable to build wheels: ${e.message}`));
+                }
+            }
 
             // Truncate install error output if necessary
             _.set(validation, ERRORS_PATH, _.map(_.get(validation, ERRORS_PATH), ([out, err]) => [
                 Buffer.from(out, ENCODING).toString(ENCODING, 0, TRUNCATE_BYTES),
                 Buffer.from(err, ENCODING).toString(ENCODING, 0, TRUNCATE_BYTES)
             ]));
+            validations.set(environment, validation);
 
             // If a successful environment is found, return it immediately.
             if (validation.status_code === SUCCESS) {
@@ -326,6 +427,9 @@ class V2 {
                 inferenceMetadata.validation = validation;
                 inferenceMetadata.end = _.toInteger(Date.now() / 1000);
 
+                // Remember the solution to seed later inferences
+                knowledgeBase.record(environment);
+
                 // Return inference object
                 return {
                     metadata: inferenceMetadata,
@@ -365,6 +469,106 @@ class V2 {
 
     }
 
+    /**
+     * Pin the dependencies of an environment to the newest versions released by a date. Dependencies with no known
+     * release by the date are left unchanged. The era used is recorded in the environment metadata.
+     *
+     * @param   {Environment}   environment Environment with resolved dependencies.
+     * @param   {String}        era         Date, or `auto` to estimate the date the code was written.
+     * @returns {Promise<void>}
+     */
+    async pinToEra(environment, era) {
+
+        // Determine the date
+        let estimate = era === 'auto'
+            ? factory.getLanguageStrategy(environment.metadata.language).estimateEra(environment)
+            : { date: new Date(era), source: 'user' };
+        if (!estimate) {
+            logger.info('Could not estimate when the code was written, starting from the latest versions');
+            return;
+        }
+        environment.metadata.era = estimate;
+        logger.info(`Starting from versions released by ${estimate.date.toISOString()} (${estimate.source})`);
+
+        // Pin each dependency
+        environment.dependencies = await Bluebird.map(environment.dependencies, async (dependency) => {
+            let system = factory.getSystemStrategy(dependency.system);
+            let version = await system.getVersionAtDate(dependency.name, estimate.date);
+            return version ? _.assign(_.clone(dependency), { version }) : dependency;
+        });
+
+    }
+
+    /**
+     * Pin the dependencies of an environment to the requirements its code states, such as pip installs in notebooks,
+     * requirements.txt and setup.py. A dependency keeps its version if it satisfies every specifier stated for it.
+     * Otherwise it is set to the newest available version that does. Stated packages that were not resolved from
+     * imports are added ahead of the other dependencies. The requirements applied are recorded in the environment
+     * metadata.
+     *
+     * @param   {Environment}   environment Environment with resolved dependencies.
+     * @returns {Promise<void>}
+     */
+    async pinToRequirements(environment) {
+
+        // Group stated requirements by package
+        let system = factory.getSystemStrategy(environment.metadata.system);
+        let stated = _.groupBy(
+            _.get(environment, 'metadata.parseResult.requirements', []),
+            r => system.normalizePackageName(r.name)
+        );
+        if (_.isEmpty(stated)) return;
+
+        // Resolve a version for each package
+        let resolved = await Bluebird.map(_.toPairs(stated), async ([name, requirements]) => {
+
+            let specifier = _.join(_.compact(_.map(requirements, 'specifier')), ',');
+            let sources = _.uniq(_.map(requirements, 'source'));
+
+            // Find the dependency, or the package if it was not resolved from imports
+            let index = _.findIndex(environment.dependencies, d =>
+                d.system === environment.metadata.system && system.normalizePackageName(d.name) === name
+            );
+            let dependency = index !== -1
+                ? environment.dependencies[index]
+                : await system.searchForExactPackageMatch(name, undefined, environment.docker.imageTag);
+            if (!dependency) {
+                logger.info(`Stated requirement '${name}' was not found by the package system`);
+                return { requirement: { name, specifier, sources, version: null } };
+            }
+
+            // Keep the current version if it satisfies the specifier, otherwise take the newest version that does
+            let version = dependency.version;
+            if (!version || !versionUtils.satisfiesSpecifier(version, specifier)) {
+                let versions = await system.getAvailablePackageVersions(dependency.name, environment.docker.imageTag);
+                let satisfying = _.filter(versions, v => versionUtils.satisfiesSpecifier(v, specifier));
+                if (satisfying.length) {
+                    version = _.first(await system.sortPackageVersions(satisfying, false, undefined, dependency.name));
+                }
+                else logger.warn(`No version of '${dependency.name}' satisfies stated requirement '${specifier}'`);
+            }
+
+            return {
+                index,
+                dependency: _.assign(_.clone(dependency), { version }),
+                requirement: { name: dependency.name, specifier, sources, version }
+            };
+
+        });
+
+        // Replace resolved dependencies in place and add the rest to the front, keeping their stated order
+        let added = [];
+        _.each(resolved, ({ index, dependency }) => {
+            if (!dependency) return;
+            if (index !== -1) environment.dependencies[index] = dependency;
+            else added.push(dependency);
+        });
+        environment.dependencies = _.concat(added, environment.dependencies);
+        environment.metadata.requirements = _.map(resolved, 'requirement');
+        logger.info('Applied stated requirements:', environment.metadata.requirements);
+
+    }
+
     /**
      * Look for a set of plausible packages corresponding to the resources used in some environment.
      *
@@ -373,112 +577,141 @@ class V2 {
      */
     async lookupDirectDependencies(environment) {
 
-        // Get neo4j driver using a Bluebird disposer
-        return Bluebird.using(neo4j.getDriver(), async (driver) => {
+        // Reference metadata
+        const system = environment.metadata.system;
+        const deps = environment.metadata.importedResources.items;
 
-            // Reference metadata
-            const system = environment.metadata.system;
-            const deps = environment.metadata.importedResources.items;
+        // Lookup object template
+        const lookup = {
+            items: [],
+            count: 0,
+            nameResolutions: 0,
+            resourcePackageMapping: []
+        };
 
-            // Lookup object template
-            const lookup = {
-                items: [],
-                count: 0,
-                nameResolutions: 0,
-                resourcePackageMapping: []
-            };
+        // Find packages providing every resource in one batch
+        const packages = await this.lookupResourcePackages(deps, system);
 
-            // Start mapping each known resource to a package
-            await Bluebird.all(_.map(deps, async (name) => {
-
-                // Query parameters
-                let params =  { name, system };
-
-                // Search the database, looking for any package resources with a substring match
-                // and any packages with an exact name match. Union and return distinct packages.
-                let results = await driver.session().run(RESOURCE_LOOKUP, params);
-                if (!results.records.length) logger.info('Could not perform a reverse package lookup for resource:', name);
-
-                // Push discovered packages to the package queue
-                await Bluebird.all(_.map(results.records, async (record) => {
-
-                    // Get package and version properties
-                    // let p = _.assign(
-                    //     record.get('package').properties,
-                    //     record.get('version').properties,
-                    // );
-                    let p = record.get('package').properties;
-                    logger.info(`Reverse lookup for ${name} matched package:`, p);
-
-                    // Get package management system strategy
-                    let system = factory.getSystemStrategy(p.system);
-
-                    // Search for a record match and save
-                    // let match = await system.searchForExactPackageMatch(p.name, p.version);
-                    let match = await system.searchForExactPackageMatch(p.name);
-                    if (match) {
-
-                        logger.info(`Package ${p.name} resolved by package system as:`, match);
-                        if (!_.some(lookup.items, match)) {
-                            lookup.nameResolutions++;
-                            lookup.items.push(match);
-                            lookup.resourcePackageMapping.push({
-                                resource: name,
-                                package: match.name
-                            });
-                        }
+        // Start mapping each known resource to a package
+        await Bluebird.all(_.map(deps, async (name) => {
 
-                    }
-                    else {
+            // Query parameters
+            let params =  { name, system };
 
-                        logger.info('Package system could not find package', p);
+            // Packages with a resource matching the resource name, or with an exact name match
+            let matched = packages.get(name);
+            if (!matched.length) logger.info('Could not perform a reverse package lookup for resource:', name);
 
-                    }
+            // Push discovered packages to the package queue
+            await Bluebird.all(_.map(matched, async (p) => {
 
-                }));
+                logger.info(`Reverse lookup for ${name} matched package:`, p);
 
-                // If the package queue does not contain a package with an exact name match,
-                // this might just be because of an incomplete database. Defer to the system
-                // of record. If found, push to the package queue.
-                if (!_.some(lookup.items, params)) {
+                // Get package management system strategy
+                let system = factory.getSystemStrategy(p.system);
 
-                    logger.info('No exact match in database for resource:', name);
-                    let system = factory.getSystemStrategy(environment.metadata.system);
-                    let record = await system.searchForExactPackageMatch(name);
+                // Search for a record match and save
+                // let match = await system.searchForExactPackageMatch(p.name, p.version);
+                let match = await system.searchForExactPackageMatch(p.name, undefined, environment.docker.imageTag);
+                if (match) {
 
-                    if (record) {
-                        logger.info(`Package ${name} resolved by package system as:`, record);
-                        lookup.items.push(record);
+                    logger.info(`Package ${p.name} resolved by package system as:`, match);
+                    if (!_.some(lookup.items, match)) {
+                        lookup.nameResolutions++;
+                        lookup.items.push(match);
                         lookup.resourcePackageMapping.push({
                             resource: name,
-                            package: record.name
+                            package: match.name
                         });
                     }
-                    else logger.info('No exact match found for resource:', name);
 
                 }
                 else {
 
-                    // If an exact name match is already in dependencies, then we've counted it as a name
-                    // resolution. Remove it. We only want to count cases where the names do not match.
-                    lookup.nameResolutions--;
+                    logger.info('Package system could not find package', p);
 
                 }
 
             }));
 
-            // Set count
-            lookup.count = lookup.items.length;
+            // If the package queue does not contain a package with an exact name match,
+            // this might just be because of an incomplete database. Defer to the system
+            // of record. If found, push to the package queue.
+            if (!_.some(lookup.items, params)) {
+
+                logger.info('No exact match in database for resource:', name);
+                let system = factory.getSystemStrategy(environment.metadata.system);
+                let record = await system.searchForExactPackageMatch(name, undefined, environment.docker.imageTag);
+
+                if (record) {
+                    logger.info(`Package ${name} resolved by package system as:`, record);
+                    lookup.items.push(record);
+                    lookup.resourcePackageMapping.push({
+                        resource: name,
+                        package: record.name
+                    });
+                }
+                else logger.info('No exact match found for resource:', name);
 
-            // Log and return
-            logger.info(
-                'Imported resources were mapped back to these packages:',
-                _.map(lookup.items, d => `(${d.name}, ${d.system})`)
-            );
+            }
+            else {
 
-            return lookup;
+                // If an exact name match is already in dependencies, then we've counted it as a name
+                // resolution. Remove it. We only want to count cases where the names do not match.
+                lookup.nameResolutions--;
 
-        });
+            }
+
+        }));
+
+        // Set count
+        lookup.count = lookup.items.length;
+
+        // Log and return
+        logger.info(
+            'Imported resources were mapped back to these packages:',
+            _.map(lookup.items, d => `(${d.name}, ${d.system})`)
+        );
+
+        return lookup;
+
+    }
+
+    /**
+     * Find the packages providing each of a list of resources, matching any package resources with a prefix match and
+     * any packages with an exact name match. Resources are resolved locally from the resource index. If the index is
+     * unavailable, they are searched in the database with one batched query. The packages found are memoized so
+     * environments sharing imports only search for each resource once.
+     *
+     * @param   {Array.<String>}                       names  Resource names.
+     * @param   {String}                               system Package system name.
+     * @returns {Promise<Map.<String, Array.<Object>>>}       Properties of the packages providing each resource.
+     */
+    async lookupResourcePackages(names, system) {
+
+        // Search for resources that have not been looked up before
+        let key = name => `${system},${name}`;
+        let missing = _.uniq(_.reject(names, name => resourceLookups.has(key(name))));
+        if (missing.length) {
+
+            try {
+
+                let index = await ResourceIndex.load();
+                _.each(missing, name => resourceLookups.set(key(name), index.lookup(name, system)));
+
+            }
+            catch (e) {
+
+                logger.warn(`Resource index unavailable, searching the database instead: ${e.message}`);
+                let results = await neo4j.run(RESOURCE_LOOKUP, { names: missing, system });
+                let found = _.groupBy(results.records, r => r.get('name'));
+                _.each(missing, name => resourceLookups.set(key(name), _.map(found[name], r => r.get('package').properties)));
+
+            }
+
+        }
+
+        return new Map(_.map(names, name => [name, resourceLookups.get(key(name))]));
 
     }
 
@@ -488,99 +721,132 @@ class V2 {
      * @param   {Array.<Dependency>}                  dependencies   Direct dependency list.
      * @param   {Object}                              [options]      Options object.
      * @param   {'assoc'|'deps'}                      [options.only] Only use specific rules for generating dependencies.
+     * @param   {String}                              [interpreter]  Interpreter version packages must install on.
      * @returns {Promise<TransitiveDependencyLookup>}                Resolved transitive dependencies, an installation order, and metadata about lookup.
      */
-    async lookupTransitiveDependencies(dependencies, options = {}) {
+    async lookupTransitiveDependencies(dependencies, options = {}, interpreter) {
 
-        // Get neo4j driver disposer
-        return Bluebird.using(neo4j.getDriver(), async (driver) => {
+        // Query mode. Use both dependency rules by default.
+        let mode = _.has(DEPENDENCY_QUERIES, options.only) ? options.only : 'all';
 
-            // Clone, since lookup will modify the list
-            dependencies = _.clone(dependencies);
+        // Expand the dependency graph breadth first, with one batched query per level.
+        let seen = new Set();
+        let level = dependencies;
+        while (level.length) {
 
-            // Set of encountered packages during traversal
-            let encounteredPackages = new Set();
+            _.each(level, node => seen.add(expansionKey(mode, node)));
+            await this.expandDependencies(level, mode);
 
-            // List of transitive and direct dependencies in installation order.
-            let lookup = {
-                items: [],
-                installOrder: [],
-                count: 0,
-            };
+            // Next level is every dependency not yet seen
+            level = _(level)
+                .flatMap(node => dependencyExpansions.get(expansionKey(mode, node)))
+                .reject(node => seen.has(expansionKey(mode, node)))
+                .uniqBy(node => expansionKey(mode, node))
+                .value();
 
-            // Perform DFS to resolve packages and dependencies.
-            // This is a reverse topological order if the graph
-            // structure is acyclic.
-            let root;
-            while (root = dependencies.shift()) {
+        }
 
-                // Log
-                logger.info('Starting DFS rooted from:', root);
+        // Clone, since lookup will modify the list
+        dependencies = _.clone(dependencies);
 
-                // Perform DFS rooted from this node
-                await (async function dfs(node) {
+        // Set of encountered packages during traversal
+        let encounteredPackages = new Set();
 
-                    // Get node id
-                    let system = factory.getSystemStrategy(node.system);
-                    let nodeId = `${system.normalizePackageName(node.name)},${node.system}`;
+        // Packages in the order they finished during traversal, with the root they were reached from
+        let finished = [];
 
-                    // If node has already been encountered, do nothing
-                    if (encounteredPackages.has(nodeId)) return;
+        // List of transitive and direct dependencies in installation order.
+        let lookup = {
+            items: [],
+            installOrder: [],
+            count: 0,
+        };
 
-                    // Set package as encountered
-                    logger.info('Exploring node:', node);
-                    encounteredPackages.add(nodeId);
+        // Perform DFS over the expanded graph to resolve packages and dependencies.
+        // This is a reverse topological order if the graph
+        // structure is acyclic.
+        let root;
+        while (root = dependencies.shift()) {
 
-                    // Build query. Override default depending on options.
-                    let query;
-                    if (options.only === 'deps') {
-                        query = RESOURCE_DEP_LOOKUP;
-                    }
-                    else if (options.only === 'assoc') {
-                        query = ASSOCIATION_DEP_LOOKUP;
-                    }
-                    else {
-                        query = `${RESOURCE_DEP_LOOKUP}\nUNION\n${ASSOCIATION_DEP_LOOKUP}`;
-                    }
+            // Log
+            logger.info('Starting DFS rooted from:', root);
 
-                    // Run query
-                    let results = await driver.session().run(query, node);
+            // Perform DFS rooted from this node
+            (function dfs(node) {
 
-                    // Parse results and recurse
-                    for (let record of results.records) {
+                // Get node id
+                let system = factory.getSystemStrategy(node.system);
+                let nodeId = `${system.normalizePackageName(node.name)},${node.system}`;
 
-                        // let dep = _.assign(
-                        //     record.get('dependency').properties,
-                        //     _.get(record.get('version'), 'properties')  // Use lodash.get because version might be null
-                        // );
-                        let dep = record.get('dependency').properties;
-                        if (!encounteredPackages.has(`${dep.name},${dep.system}`)) {
-                            await dfs.bind(this)(dep);
-                        }
+                // If node has already been encountered, do nothing
+                if (encounteredPackages.has(nodeId)) return;
 
-                    }
+                // Set package as encountered
+                logger.info('Exploring node:', node);
+                encounteredPackages.add(nodeId);
 
-                    // Normalize and add to dependencies
-                    // let match = await system.searchForExactPackageMatch(node.name, node.version);
-                    let match = await system.searchForExactPackageMatch(node.name);
-                    if (match) {
-                        logger.info(`Package ${node.name} resolved by package system as:`, match);
-                        lookup.installOrder.push(match);
-                        if (!_.isEqual(root, match)) {
-                            lookup.items.push(match);
-                            lookup.count++;
-                        }
+                // Recurse into expanded dependencies
+                for (let dep of dependencyExpansions.get(expansionKey(mode, node))) {
+                    if (!encounteredPackages.has(`${dep.name},${dep.system}`)) {
+                        dfs(dep);
                     }
+                }
 
-                }).bind(this)(root);
+                // Mark as finished. Packages are normalized after traversal so lookups can be batched.
+                finished.push({ node, root, system });
 
-            }
+            })(root);
 
-            logger.info('Resolved dependency ordering:', _.map(lookup.installOrder, d => `(${d.name}, ${d.system})`));
-            return lookup;
+        }
 
+        // Normalize all packages at once, then add to dependencies in the order they finished
+        let matches = await Bluebird.map(
+            finished,
+            ({ node, system }) => system.searchForExactPackageMatch(node.name, undefined, interpreter)
+        );
+        _.each(_.zip(finished, matches), ([{ node, root }, match]) => {
+            if (match) {
+                logger.info(`Package ${node.name} resolved by package system as:`, match);
+                lookup.installOrder.push(match);
+                if (!_.isEqual(root, match)) {
+                    lookup.items.push(match);
+                    lookup.count++;
+                }
+            }
         });
 
+        logger.info('Resolved dependency ordering:', _.map(lookup.installOrder, d => `(${d.name}, ${d.system})`));
+        return lookup;
+
+    }
+
+    /**
+     * Find the dependencies of each of a list of packages with one batched query, skipping packages whose dependencies
+     * have already been found.
+     *
+     * @param   {Array.<Dependency>}       nodes Packages to expand.
+     * @param   {'deps'|'assoc'|'all'}     mode  Dependency rules to query.
+     * @returns {Promise<void>}
+     */
+    async expandDependencies(nodes, mode) {
+
+        // Packages not expanded before
+        let pending = _(nodes)
+            .reject(node => dependencyExpansions.has(expansionKey(mode, node)))
+            .uniqBy(node => expansionKey(mode, node))
+            .map(node => _.pick(node, ['name', 'system']))
+            .value();
+        if (!pending.length) return;
+
+        // Query and group dependencies by package, keeping the order returned
+        logger.info(`Looking up dependencies of ${pending.length} package(s)`);
+        let results = await neo4j.run(DEPENDENCY_LOOKUP, { nodes: pending, query: DEPENDENCY_QUERIES[mode] });
+        let found = _.groupBy(results.records, r => expansionKey(mode, { name: r.get('name'), system: r.get('system') }));
+        _.each(pending, node => dependencyExpansions.set(
+            expansionKey(mode, node),
+            _.map(found[expansionKey(mode, node)], r => r.get('dependency').properties)
+        ));
+
     }
 
     // CLI methods
@@ -610,6 +876,143 @@ class V2 {
 
     }
 
+    /**
+     * Build an offline snapshot of PyPI package metadata that `run` can serve from without network access. Definitions
+     * are taken from a directory of PyPI JSON API responses (`<package>.json`), fetched from PyPI by name, or both.
+     *
+     * @param   {Object}          options            Snapshot options.
+     * @param   {String}          options.output     Snapshot file path.
+     * @param   {Array.<String>}  [options.packages] Names of packages to fetch from PyPI.
+     * @param   {String}          [options.from]     Directory of PyPI JSON definitions to load.
+     * @returns {Promise<Number>}                    Number of packages in the snapshot.
+     */
+    async snapshot(options) {
+
+        const pip = factory.getSystemStrategy('pip');
+
+        // Generate (name, projected definition) pairs from all sources
+        let entries = async function*() {
+
+            // Load definitions from a directory
+            if (options.from) {
+                for (let file of _.filter(fs.readdirSync(options.from), f => f.endsWith('.json'))) {
+                    let definition = JSON.parse(fs.readFileSync(path.join(options.from, file), ENCODING));
+                    let name = _.get(definition, 'info.name') || path.basename(file, '.json');
+                    yield [pip.normalizePackageName(name), PyPIMetadata.project(definition)];
+                }
+            }
+
+            // Fetch definitions from PyPI
+            for (let name of options.packages || []) {
+                logger.info(`Fetching definition for snapshot: '${name}'`);
+                let definition = await pip.getFullPackageDefinition(name);
+                yield [pip.normalizePackageName(name), definition && PyPIMetadata.project(definition)];
+            }
+
+        };
+
+        // Build snapshot
+        let count = await Snapshot.build(path.resolve(options.output), entries());
+        logger.info(`Wrote ${count} package definitions to ${options.output}`);
+        return count;
+
+    }
+
+    /**
+     * Ingest the Packages indexes of the apt distribution V2 installs from into a local index of package versions.
+     * Once ingested, apt version lookups and sorts are read from the index rather than running a container.
+     *
+     * @returns {Promise<Number>} Number of packages indexed.
+     */
+    async ingestApt() {
+
+        let count = await PackageIndex.ingest();
+        logger.info(`Indexed versions of ${count} apt packages`);
+        return count;
+
+    }
+
+    /**
+     * Export the index of resource names to packages from the graph into the data directory. The index is exported
+     * automatically the first time it is needed, and again whenever a graph built from a different dump is loaded.
+     *
+     * @returns {Promise<Number>} Number of resources indexed.
+     */
+    async indexResources() {
+
+        await neo4j.waitUntilReady();
+        let contents = await ResourceIndex.export();
+        logger.info(`Indexed ${_.size(contents.resources)} resources`);
+        neo4j.close();
+        return _.size(contents.resources);
+
+    }
+
+    /**
+     * Compile the version upgrade matrix in the graph into per-package artifacts in the data directory. Once compiled,
+     * version matrix mutations are generated from the artifacts rather than the graph. Run this again after loading a
+     * new graph.
+     *
+     * @returns {Promise<Number>} Number of packages compiled.
+     */
+    async compileVersionMatrix() {
+
+        try {
+
+            // Compile from the graph once it has finished loading
+            await neo4j.waitUntilReady();
+            let count = await versionMatrix.compile();
+            logger.info(`Compiled version matrices for ${count} packages`);
+            return count;
+
+        }
+        finally {
+
+            // Release pooled database and cache connections, since sorting versions can read the cache
+            neo4j.close();
+            await cache.quit();
+
+        }
+
+    }
+
+    /**
+     * Build wheels ahead of time for pinned pip requirements that only publish an sdist, and add them to the wheelhouse
+     * validations install from. Requirements are installed in order while building, so list build dependencies such
+     * as numpy first.
+     *
+     * @param   {Object}                  options               Build options.
+     * @param   {Array.<String>}          options.requirements  Requirements as `<name>==<version>`, in installation order.
+     * @param   {String}                  [options.interpreter] Python interpreter version. Defaults to 3.7.
+     * @returns {Promise<Array.<String>>}                       Requirements wheels were built for.
+     */
+    async buildWheels(options) {
+
+        // Parse pinned requirements
+        let dependencies = _.map(options.requirements, (requirement) => {
+            let [name, version] = _.split(requirement, '==');
+            if (!name || !version) throw new Error(`Requirement is not pinned as <name>==<version>: '${requirement}'`);
+            return { name: _.trim(name), version: _.trim(version), system: 'pip' };
+        });
+
+        try {
+
+            // Build
+            let language = factory.getLanguageStrategy('python');
+            let built = await language.prebuild(options.interpreter || DEFAULT_INTERPRETER, dependencies);
+            logger.info(`Built wheels for ${built.length} of ${dependencies.length} requirements`);
+            return built;
+
+        }
+        finally {
+
+            // Release cache connections opened while checking for published wheels
+            await cache.quit();
+
+        }
+
+    }
+
     /**
      * Dockerize a code snippet using a language pack.
      *
@@ -623,6 +1026,8 @@ class V2 {
      * @param   {'dockerfile'|'install-commands'|'metadata'} [options.format]          Return format.
      * @param   {String}                                     [options.only]            Only use specific rules for generating dependencies.
      * @param   {boolean}                                    [options.noValidate]      Disables validation. V2 will instead return the first environment to successfully parse.
+     * @param   {String}                                     [options.snapshot]        Offline PyPI metadata snapshot to serve package definitions from.
+     * @param   {String}                                     [options.era]             Start from versions released by this date, or by an estimated date if `auto`.
      * @returns {String}                                                               Dockerfile contents.
      */
     async run(options) {
@@ -632,6 +1037,8 @@ class V2 {
         metadata.path = path.resolve(options.pkg);
         metadata.basename = path.basename(metadata.path);
         metadata.isDir = fs.statSync(metadata.path).isDirectory();
+        metadata.date = fs.statSync(metadata.path).mtime;
+        metadata.snapshot = options.snapshot ? path.resolve(options.snapshot) : undefined;
 
         // Log
         logger.info('Inference metadata: ', metadata);
@@ -639,12 +1046,20 @@ class V2 {
         // Run inference to determine an environment specification.
         try {
 
+            // Wait for the graph to finish loading
+            await neo4j.waitUntilReady();
+
             let inference = await this.infer({
                 only: options.only,
                 noValidate: options.noValidate,
                 search: options.search,
+                era: options.era,
             });
 
+            // Record cache freshness metrics and hit rates
+            inference.metadata.freshness = Refresher.metrics();
+            inference.metadata.cache = cache.stats();
+
             // Log to consul
             await this.logConsul('timestamp', new Date().toISOString());
             await this.logConsul('inference', inference);
@@ -675,6 +1090,13 @@ class V2 {
             throw e;
 
         }
+        finally {
+
+            // Release pooled database and cache connections
+            neo4j.close();
+            await cache.quit();
+
+        }
 
     }
 
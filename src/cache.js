@@ -6,12 +6,14 @@
 
 
 // NPM/core modules
+const _           = require('lodash');
 const Bluebird    = require('bluebird');
 const redis       = require('redis');
 
 
 // Local modules
 const dockerTools = require('./docker-tools');
+const LRUCache    = require('./lru-cache');
 
 
 // Promisify redis client
@@ -26,26 +28,156 @@ const db = new Map([
 ]);
 
 
+// Constants
+const L1_SIZE = _.toInteger(_.defaultTo(process.env.V2_CACHE_L1_SIZE, 1024));  // Entries per database. 0 disables L1.
+
+
+// Long lived clients, in-process L1 caches, and hit counters by implementation name
+const clients = new Map();
+const l1      = new Map();
+const counts  = new Map();
+let closed    = false;
+
+
+/**
+ * Get the long lived redis client for an implementation, creating it on first use. A single connection is shared by
+ * all callers. The client pipelines commands issued concurrently over the connection. The connection keeps the process
+ * alive until {@link module:v2/cache.quit} is called, so pending replies are never dropped on exit.
+ *
+ * @param   {String}      name Implementation name.
+ * @returns {RedisClient}      Redis client.
+ */
+function sharedClient(name) {
+
+    // Verify cache database exists and connections have not been closed
+    if (!db.has(name)) throw new Error(`No cache for ${name}`);
+    if (closed) throw new Error('Cache connections are closed');
+
+    // Create client
+    if (!clients.has(name)) {
+        let hostname = dockerTools.dockerContainer ? 'redis' : 'localhost';
+        let client = redis.createClient({
+            host: hostname,
+            db: db.get(name)
+        });
+        clients.set(name, client);
+        l1.set(name, new LRUCache(L1_SIZE));
+        counts.set(name, { l1: { hits: 0, misses: 0 }, redis: { hits: 0, misses: 0 } });
+    }
+
+    return clients.get(name);
+
+}
+
+
 /**
- * Get a redis client configured for an implementation strategy. Each strategy
- * is provided its own database.
+ * Get a redis client configured for an implementation strategy. Each strategy is provided its own database. The client
+ * is shared and long lived, so disposing of it does not close the connection.
  *
  * @param   {String}                name           Implementation name.
  * @returns {Promise.<RedisClient>}                Redis client.
  */
 module.exports.getClientFor = (name) => {
 
-    // Verify cache database exists
-    if (!db.has(name)) throw new Error(`No cache for ${name}`);
+    // Return disposer. The shared client is left open.
+    return Bluebird.resolve(sharedClient(name)).disposer(_.noop);
 
-    // Create client
-    let hostname = dockerTools.dockerContainer ? 'redis' : 'localhost';
-    let client = redis.createClient({
-        host: hostname,
-        db: db.get(name)
-    });
-
-    // Return disposer
-    return Bluebird.resolve(client).disposer((c) => c.quit());
+};
+
+
+/**
+ * Get a JSON value from the cache for an implementation. The in-process L1 cache is checked before redis. Returned
+ * values may be shared with the L1 cache and must be treated as read-only.
+ *
+ * @param   {String}     name Implementation name.
+ * @param   {String}     key  Cache key.
+ * @returns {Promise<*>}      Cached value, or null on a miss.
+ */
+module.exports.getJSON = async (name, key) => {
+
+    let client = sharedClient(name);
+    let stats = counts.get(name);
+
+    // L1
+    let value = l1.get(name).get(key);
+    if (value !== undefined) {
+        stats.l1.hits++;
+        return value;
+    }
+    stats.l1.misses++;
+
+    // Redis
+    value = JSON.parse(await client.send_commandAsync('JSON.GET', [key]));
+    if (value === null) {
+        stats.redis.misses++;
+    }
+    else {
+        stats.redis.hits++;
+        if (L1_SIZE) l1.get(name).set(key, value);
+    }
+    return value;
+
+};
+
+
+/**
+ * Get many JSON values from the cache for an implementation. Redis commands for L1 misses are pipelined.
+ *
+ * @param   {String}              name Implementation name.
+ * @param   {Array.<String>}      keys Cache keys.
+ * @returns {Promise<Array.<*>>}       Cached values in the same order, null for misses.
+ */
+module.exports.getManyJSON = async (name, keys) => {
+
+    return Promise.all(_.map(keys, key => module.exports.getJSON(name, key)));
+
+};
+
+
+/**
+ * Set a JSON value in the cache for an implementation, writing through the L1 cache to redis.
+ *
+ * @param   {String}        name  Implementation name.
+ * @param   {String}        key   Cache key.
+ * @param   {*}             value JSON serializable value.
+ * @returns {Promise<void>}
+ */
+module.exports.setJSON = async (name, key, value) => {
+
+    let client = sharedClient(name);
+    if (L1_SIZE) l1.get(name).set(key, value);
+    await client.send_commandAsync('JSON.SET', [key, '.', JSON.stringify(value)]);
+
+};
+
+
+/**
+ * Get cache hit rates for each tier of each implementation cache used by this process.
+ *
+ * @returns {Object} Hits, misses, and hit rate per tier, by implementation name.
+ */
+module.exports.stats = () => {
+
+    let rate = ({ hits, misses }) => ({ hits, misses, hitRate: (hits + misses) ? _.round(hits / (hits + misses), 4) : null });
+    return _.fromPairs(_.map(Array.from(counts.entries()), ([name, { l1, redis }]) => [name, {
+        l1: rate(l1),
+        redis: rate(redis)
+    }]));
+
+};
+
+
+/**
+ * Close all redis connections once their pending replies arrive. Commands must call this before returning, since open
+ * connections keep the process alive. Later lookups fail, so background refreshes can not reopen a connection.
+ *
+ * @returns {Promise<void>}
+ */
+module.exports.quit = async () => {
+
+    closed = true;
+    await Bluebird.map(Array.from(clients.values()), c => c.quitAsync().catch(() => c.end(true)));
+    clients.clear();
+    l1.clear();
 
 };
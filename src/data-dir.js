@@ -0,0 +1,35 @@
+/**
+ * Local directory for data V2 builds ahead of time and reuses across runs, such as package indexes.
+ *
+ * @module data-dir
+ */
+
+
+// Core/NPM modules
+const fs   = require('fs');
+const os   = require('os');
+const path = require('path');
+
+
+// Constants
+const DATA_DIR = path.resolve(process.env.V2_DATA_DIR || path.join(os.homedir(), '.v2'));
+
+
+/**
+ * Resolve a path inside of the data directory, creating the directory if it does not exist. The directory is
+ * `$V2_DATA_DIR`, or `~/.v2` if unset.
+ *
+ * @param   {...String} parts Path segments relative to the data directory.
+ * @returns {String}          Absolute path.
+ */
+module.exports.resolve = (...parts) => {
+
+    let file = path.join(DATA_DIR, ...parts);
+    fs.mkdirSync(path.dirname(file), { recursive: true });
+    return file;
+
+};
+
+
+// Export data directory
+module.exports.path = DATA_DIR;
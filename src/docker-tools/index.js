@@ -10,6 +10,7 @@ const _              = require('lodash');
 const Bluebird       = require('bluebird');
 const child_process  = require('child_process');
 const fs             = require('fs');
+const path           = require('path');
 
 
 // Local modules
@@ -117,25 +118,49 @@ class DockerTools {
     }
 
 
+    /**
+     * Spawn a long lived interactive Docker container. The container is removed once its standard input is closed and
+     * its entrypoint exits. Communication happens over the returned process's stdio streams.
+     *
+     * @param   {String}                    image   Image to create the container from.
+     * @param   {String}                    command Command run when starting the container.
+     * @param   {Array.<String>}            [args]  Optional docker arguments.
+     * @returns {child_process.ChildProcess}        Docker client process attached to the container.
+     */
+    spawnDockerContainer(image, command, args=[]) {
+
+        // Generate the docker run command
+        let cmd = `docker run --rm --interactive ${args.join(' ')} ${image} ${command}`;
+        logger.info(`Docker spawn command: ${cmd}`);
+
+        // Spawn through a shell so the command is tokenized the same way as runDockerContainer
+        return child_process.spawn(cmd, { shell: true, stdio: ['pipe', 'pipe', 'pipe'] });
+
+    }
+
+
     /**
      * Run a Docker container with a data mount. Data mount will either come from the current container using the
      * Docker `--volumes-from` flag or from the Docker `-v` flag with the directory containing the software package.
-     * The container must print a JSON object to stdout, which will be parsed as a result object. It may print logging
-     * information to stderr, which will be logged to the user.
+     * If the package is a single file, its parent directory is mounted so files next to it, such as requirements.txt,
+     * are visible. The container must print a JSON object to stdout, which will be parsed as a result object. It may
+     * print logging information to stderr, which will be logged to the user.
      *
      * @param   {String}          image   Image to create the container from.
      * @param   {String}          command Command run when starting the container.
+     * @param   {Array.<String>}  [args]  Optional additional docker arguments.
      * @returns {Promise<Object>}         Execution result object.
      */
-    async runDockerContainerWithDataMount(image, command) {
+    async runDockerContainerWithDataMount(image, command, args=[]) {
 
         // Detect docker and determine which mount to use
+        let directory = metadata.isDir ? metadata.path : path.dirname(metadata.path);
         let dataMount = this.dockerContainer
             ? `--volumes-from='${this.dockerContainer.Id}'`
-            : `--mount='type=bind,source=${metadata.path},target=${metadata.path},readonly'`;
+            : `--mount='type=bind,source=${directory},target=${directory},readonly'`;
 
         // Run docker container with data mount arguments
-        return this.runDockerContainer(image, command, [dataMount]);
+        return this.runDockerContainer(image, command, [dataMount, ...args]);
 
     }
 
@@ -0,0 +1,143 @@
+/**
+ * Long lived Docker containers that answer JSON requests over stdio.
+ *
+ * @module docker-tools/service
+ */
+
+
+// Core/NPM modules
+const _           = require('lodash');
+const readline    = require('readline');
+
+
+// Local modules
+const dockerTools = require('./index');
+const logger      = require('../logger');
+
+
+/**
+ * A Docker container that reads newline delimited JSON requests on stdin and writes newline delimited JSON responses
+ * on stdout. Each request is tagged with an `id` that the container echoes back with either a `result` or an `error`.
+ * The container is started lazily on the first request and restarted if it exits. It does not keep the Node process
+ * alive while no requests are pending.
+ *
+ * @property {String} image   Image to create the container from.
+ * @property {String} command Command run when starting the container.
+ */
+class DockerService {
+
+    /**
+     * Construct a new service.
+     *
+     * @param {String} image   Image to create the container from.
+     * @param {String} command Command run when starting the container.
+     */
+    constructor(image, command) {
+        this.image = image;
+        this.command = command;
+        this.process = null;
+        this.pending = new Map();
+        this.nextId = 0;
+    }
+
+    /**
+     * Start the container if it is not already running.
+     *
+     * @returns {child_process.ChildProcess} Docker client process attached to the container.
+     */
+    start() {
+
+        // Already running
+        if (this.process) return this.process;
+
+        // Spawn container
+        let child = this.process = dockerTools.spawnDockerContainer(this.image, this.command);
+
+        // Resolve pending requests as responses arrive
+        readline.createInterface({ input: child.stdout }).on('line', (line) => {
+
+            let response;
+            try {
+                response = JSON.parse(line);
+            }
+            catch (e) {
+                logger.warn(`Unparseable response from ${this.image}: ${line}`);
+                return;
+            }
+
+            let request = this.pending.get(response.id);
+            if (!request) return;
+            this.pending.delete(response.id);
+            this.updateRef();
+
+            if (_.has(response, 'error')) request.reject(new Error(response.error));
+            else request.resolve(response.result);
+
+        });
+
+        // Log container output
+        readline.createInterface({ input: child.stderr }).on('line', line => logger.debug(`${this.image}: ${line}`));
+
+        // Fail any pending requests if the container exits. The next request will start a new container.
+        child.on('exit', (code) => {
+
+            logger.info(`Service ${this.image} exited with code ${code}`);
+            if (this.process === child) this.process = null;
+
+            let error = new Error(`Service ${this.image} exited with code ${code}`);
+            for (let request of this.pending.values()) request.reject(error);
+            this.pending.clear();
+
+        });
+        child.stdin.on('error', e => logger.warn(`Unable to write to ${this.image}: ${e.message}`));
+
+        return child;
+
+    }
+
+    /**
+     * Reference the container process and its streams while requests are pending, and unreference them when idle so
+     * the container does not keep the Node process alive. Closing stdin on exit stops the container.
+     */
+    updateRef() {
+
+        if (!this.process) return;
+        let method = this.pending.size ? 'ref' : 'unref';
+        this.process[method]();
+        _.each([this.process.stdin, this.process.stdout, this.process.stderr], s => s && s[method] && s[method]());
+
+    }
+
+    /**
+     * Send a request to the container.
+     *
+     * @param   {Object}     payload JSON serializable request. An `id` property will be added.
+     * @returns {Promise<*>}         Response result.
+     */
+    request(payload) {
+
+        let child = this.start();
+        let id = this.nextId++;
+
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject });
+            this.updateRef();
+            child.stdin.write(`${JSON.stringify(_.assign({}, payload, { id }))}\n`);
+        });
+
+    }
+
+    /**
+     * Stop the container by closing its stdin.
+     */
+    stop() {
+
+        if (this.process) this.process.stdin.end();
+
+    }
+
+}
+
+
+// Export
+module.exports = DockerService;
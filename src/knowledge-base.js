@@ -0,0 +1,189 @@
+/**
+ * Knowledge base of solved codebases.
+ *
+ * @module knowledge-base
+ */
+
+
+// Core/NPM modules
+const _              = require('lodash');
+const fs             = require('fs');
+
+
+// Local modules
+const dataDir        = require('./data-dir');
+const logger         = require('./logger');
+
+
+// Constants
+const SOLUTIONS_FILE = 'knowledge-base.json';
+const MIN_SIMILARITY = 0.5;   // Minimum Jaccard similarity of import sets for a solution to seed an environment.
+const MAX_SEEDS      = 3;     // Maximum number of seeded environments per starting environment.
+
+
+/**
+ * Records the pinned dependencies of environments that validated successfully, indexed by import set and interpreter.
+ * New inferences are seeded with the solutions of the most similar import sets, so codebases importing the same
+ * packages as one solved before can validate on the first attempt. Solutions are persisted to the data directory and
+ * shared across inferences.
+ */
+class KnowledgeBase {
+
+    /**
+     * Solutions by key. Loaded from the data directory on first access.
+     *
+     * @returns {Object} Map of solution key to solution.
+     */
+    get solutions() {
+
+        if (!this._solutions) {
+            let file = dataDir.resolve(SOLUTIONS_FILE);
+            this._solutions = fs.existsSync(file) ? JSON.parse(fs.readFileSync(file, 'utf8')) : {};
+        }
+        return this._solutions;
+
+    }
+
+    /**
+     * Interpreter an environment runs on.
+     *
+     * @param   {Environment} environment Environment specification.
+     * @returns {String}                  Interpreter, as `<image name>:<image tag>`.
+     */
+    interpreter(environment) {
+
+        return `${environment.docker.imageName}:${environment.docker.imageTag}`;
+
+    }
+
+    /**
+     * Sorted, unique resources imported by an environment.
+     *
+     * @param   {Environment}    environment Environment specification.
+     * @returns {Array.<String>}             Import set.
+     */
+    imports(environment) {
+
+        return _.sortBy(_.uniq(_.get(environment, 'metadata.importedResources.items', [])));
+
+    }
+
+    /**
+     * Jaccard similarity of two import sets.
+     *
+     * @param   {Array.<String>} a First import set.
+     * @param   {Array.<String>} b Second import set.
+     * @returns {Number}           Similarity between 0 and 1.
+     */
+    similarity(a, b) {
+
+        let union = _.union(a, b).length;
+        return union ? _.intersection(a, b).length / union : 1;
+
+    }
+
+    /**
+     * Record a successfully validated environment. Solving the same import set on the same interpreter again replaces
+     * the previous solution.
+     *
+     * @param {Environment} environment Successful environment.
+     */
+    record(environment) {
+
+        let imports = this.imports(environment);
+        let interpreter = this.interpreter(environment);
+        this.solutions[JSON.stringify([interpreter, imports])] = {
+            interpreter,
+            imports,
+            dependencies: _.map(environment.dependencies, d => _.pick(d, ['name', 'version', 'system'])),
+            solved: new Date().toISOString()
+        };
+        this.save();
+
+    }
+
+    /**
+     * Write solutions to the data directory.
+     */
+    save() {
+
+        try {
+            let file = dataDir.resolve(SOLUTIONS_FILE);
+            fs.writeFileSync(`${file}.tmp`, JSON.stringify(this._solutions));
+            fs.renameSync(`${file}.tmp`, file);
+        }
+        catch (e) {
+            logger.warn(`Unable to save knowledge base: ${e.message}`);
+        }
+
+    }
+
+    /**
+     * Find the solutions nearest to an environment. Only solutions for the same interpreter with import sets at least
+     * `MIN_SIMILARITY` similar are considered.
+     *
+     * @param   {Environment}    environment Environment specification.
+     * @param   {Number}         [limit]     Maximum number of solutions.
+     * @returns {Array.<Object>}             Solutions with their similarity, most similar first.
+     */
+    nearest(environment, limit = MAX_SEEDS) {
+
+        let imports = this.imports(environment);
+        let interpreter = this.interpreter(environment);
+
+        // Score solutions for the same interpreter
+        let solutions = _.map(
+            _.filter(this.solutions, { interpreter }),
+            solution => _.assign({ similarity: this.similarity(imports, solution.imports) }, solution)
+        );
+
+        // Take the most similar, preferring the most recently solved
+        solutions = _.filter(solutions, solution => solution.similarity >= MIN_SIMILARITY);
+        return _.take(_.orderBy(solutions, ['similarity', 'solved'], ['desc', 'desc']), limit);
+
+    }
+
+    /**
+     * Create starting environments seeded from the solutions nearest to a resolved environment. Each seed is a copy
+     * of the environment with dependency versions pinned to those of a solution. Seeds identical to the environment or
+     * to each other are skipped.
+     *
+     * @param   {Environment}         environment Environment with resolved dependencies.
+     * @returns {Array.<Environment>}             Seeded environments, most similar first.
+     */
+    seed(environment) {
+
+        let seeds = [];
+        let seen = new Set([JSON.stringify(environment.dependencies)]);
+        for (let solution of this.nearest(environment)) {
+
+            // Pin dependencies known to the solution
+            let pins = _.keyBy(solution.dependencies, d => `${d.system}:${d.name}`);
+            let dependencies = _.map(environment.dependencies, d => _.assign(
+                _.clone(d), _.pick(pins[`${d.system}:${d.name}`], ['version'])
+            ));
+
+            // Skip if nothing new was pinned
+            let key = JSON.stringify(dependencies);
+            if (seen.has(key)) continue;
+            seen.add(key);
+
+            // Create seeded environment
+            let seeded = _.cloneDeep(environment);
+            seeded.id = `${environment.id}.${seeds.length}`;
+            seeded.dependencies = dependencies;
+            seeded.metadata.seed = _.pick(solution, ['interpreter', 'imports', 'similarity', 'solved']);
+            seeds.push(seeded);
+
+        }
+
+        if (seeds.length) logger.info(`Seeded ${seeds.length} environment(s) from the knowledge base`);
+        return seeds;
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new KnowledgeBase();
@@ -70,6 +70,25 @@ class LanguageStrategy {
      */
     dependencyProducingException(environment, validation) { throw new Error(NOT_IMPLEMENTED); }
 
+    /**
+     * Estimate the date an application was written from evidence in its parse result. Default is unknown. Languages
+     * that can date their code may override this.
+     *
+     * @param   {Environment} environment Environment specification.
+     * @returns {Era|null}                Estimated era, or null if unknown.
+     */
+    estimateEra(environment) { return null; }
+
+    /**
+     * Build dependencies that install from source ahead of time, so later validations install them quickly. Default
+     * does nothing. Languages with a local cache of built packages may override this.
+     *
+     * @param   {String}                  interpreter  Interpreter version.
+     * @param   {Array.<Dependency>}      dependencies Dependencies in installation order.
+     * @returns {Promise<Array.<String>>}              Dependencies that were built.
+     */
+    async prebuild(interpreter, dependencies) { return []; }
+
 }
 
 
@@ -0,0 +1,177 @@
+/**
+ * Fast Python interpreter classification.
+ *
+ * @module languages/python/interpreter-detector
+ */
+
+
+// Core/NPM modules
+const _                  = require('lodash');
+const fs                 = require('fs');
+const path               = require('path');
+
+
+// Constants
+const EXTENSIONS         = ['.py', '.ipynb'];
+const STRING_PREFIXES    = [
+    [/(^|[^\w])[fF][rRbB]?["']|(^|[^\w])[rR][fF]["']/, 3, 4],   // f-strings
+    [/(^|[^\w])[uU][rR]["']/, 2, 4]                             // ur'' strings
+];
+const STRINGS            = /"""[\s\S]*?"""|'''[\s\S]*?'''|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'/g;
+const COMMENTS           = /#.*$/gm;
+
+
+// Syntax features as [pattern, interpreter major version, weight]. Weight 4 is syntax only one interpreter accepts.
+// Lower weights are names that only exist in one interpreter, which parse under both but fail at runtime.
+const SYNTAX_WEIGHT      = 4;
+const FEATURES           = [
+
+    // Python 2 syntax
+    [/^\s*print(\s+[^\s(=.,)\[\]:]|\s*$)/m, 2, 4],              // print statement
+    [/^\s*except\s+[\w.]+\s*,\s*\w+\s*:/m, 2, 4],               // except X, e:
+    [/^\s*exec\s+["'\w]/m, 2, 4],                               // exec statement
+    [/^\s*raise\s+[\w.]+\s*,/m, 2, 4],                          // raise E, "message"
+    [/`/, 2, 4],                                                // repr backticks
+    [/<>/, 2, 4],                                               // <> operator
+    [/\b\d+[lL]\b/, 2, 4],                                      // long literals
+    [/(?<![\w.]|[eE][+-])0[0-7]*[1-7][0-7]*\b/, 2, 4],          // old octal literals, not exponents such as 1e-07
+
+    // Python 2 names
+    [/^\s*(import|from)\s+(urllib2|cPickle|ConfigParser|Queue|StringIO|cStringIO|HTMLParser|httplib)\b/m, 2, 2],
+    [/\bxrange\s*\(|\braw_input\s*\(|\bbasestring\b|\bunichr\s*\(/, 2, 1],
+    [/\.(iteritems|itervalues|iterkeys|has_key)\s*\(/, 2, 1],
+
+    // Python 3 syntax
+    [/^\s*async\s+(def|for|with)\b|\bawait\s+[\w(]/m, 3, 4],    // async/await
+    [/^\s*nonlocal\s+\w/m, 3, 4],                               // nonlocal
+    [/\byield\s+from\b/, 3, 4],                                 // yield from
+    [/\bprint\s*\([^)]*\b(end|sep|file|flush)\s*=/, 3, 4],      // print() keyword arguments
+    [/^\s*def\s+\w+\s*\([^)]*\)\s*->/m, 3, 4],                  // return annotations
+    [/^\s*def\s+\w+\s*\([^)]*\*\s*,/m, 3, 4],                   // keyword-only arguments
+    [/:=/, 3, 4],                                               // assignment expressions
+
+    // Python 3 names
+    [/^\s*(import|from)\s+(pathlib|asyncio|typing|dataclasses|configparser|queue|urllib\.request)\b/m, 3, 2],
+    [/\bsuper\(\)/, 3, 1]
+
+];
+
+
+/**
+ * Ranks Python interpreters by how likely a codebase is to be written for them, using a single pass over its source
+ * looking for syntax only one interpreter accepts, names only one interpreter defines, and notebook kernel metadata.
+ * This is much cheaper than parsing with each interpreter, so it can be used to skip or deprioritize the unlikely one.
+ */
+class InterpreterDetector {
+
+    /**
+     * Read the source of each top level Python file and notebook of a codebase. Files that can not be read, such as
+     * broken symlinks, are skipped, since the ranking is only a heuristic.
+     *
+     * @param   {String}         pathname Path to a file or directory.
+     * @returns {Array.<Object>}          Sources as `{ code, notebook }`, where `notebook` is notebook metadata.
+     */
+    read(pathname) {
+
+        let files;
+        try {
+            files = fs.statSync(pathname).isDirectory()
+                ? _.map(fs.readdirSync(pathname), f => path.join(pathname, f))
+                : [pathname];
+        }
+        catch (e) {
+            return [];
+        }
+
+        return _.compact(_.map(files, (file) => {
+
+            if (!_.includes(EXTENSIONS, path.extname(file))) return null;
+            let contents;
+            try {
+                if (!fs.statSync(file).isFile()) return null;
+                contents = fs.readFileSync(file, 'utf8');
+            }
+            catch (e) {
+                return null;
+            }
+            if (path.extname(file) === '.py') return { code: contents, notebook: null };
+
+            // Notebooks. Code cells hold source in `source` (v4) or `input` (v3), without shell escapes and magics.
+            try {
+                let notebook = JSON.parse(contents);
+                let cells = _.concat(notebook.cells || [], ..._.map(notebook.worksheets, 'cells'));
+                let lines = _.flatMap(_.filter(cells, { cell_type: 'code' }), c => _.concat(c.source || c.input || [], '\n'));
+                let code = _.reject(_.join(lines, '').split('\n'), l => /^\s*[!%]/.test(l)).join('\n');
+                return { code, notebook: notebook.metadata || {} };
+            }
+            catch (e) {
+                return null;
+            }
+
+        }));
+
+    }
+
+    /**
+     * Score a codebase. Positive scores favor Python 3, negative scores favor Python 2.
+     *
+     * @param   {Array.<Object>} sources Sources, as returned by {@see read}.
+     * @returns {Object}                 Score in `score`, and the distinct syntax features only one interpreter
+     *                                   accepts that were found, by interpreter major version, in `syntax`.
+     */
+    score(sources) {
+
+        let score = 0;
+        let syntax = { 2: new Set(), 3: new Set() };
+        let add = (interpreter, weight, pattern) => {
+            score += interpreter === 3 ? weight : -weight;
+            if (pattern && weight === SYNTAX_WEIGHT) syntax[interpreter].add(pattern);
+        };
+        for (let { code, notebook } of sources) {
+
+            // Notebook kernels record the interpreter the notebook was last run with
+            let kernel = _.get(notebook, 'language_info.version') || _.get(notebook, 'kernelspec.name') || '';
+            let major = _.get(kernel.match(/[23]/), 0);
+            if (major) add(_.toInteger(major), 6);
+
+            // String prefixes, checked before string contents are removed
+            for (let [pattern, interpreter, weight] of STRING_PREFIXES) {
+                if (pattern.test(code)) add(interpreter, weight, pattern);
+            }
+
+            // Everything else, ignoring string contents and comments
+            let stripped = code.replace(STRINGS, '""').replace(COMMENTS, '');
+            for (let [pattern, interpreter, weight] of FEATURES) {
+                if (pattern.test(stripped)) add(interpreter, weight, pattern);
+            }
+
+        }
+        return { score, syntax: _.mapValues(syntax, 'size') };
+
+    }
+
+    /**
+     * Rank interpreters for a codebase.
+     *
+     * @param   {String}         pathname Path to a file or directory.
+     * @returns {Array.<Object>}          Interpreters as `{ major, confidence, contradicting }`, most likely first.
+     *                                    Confidences sum to 1, and are 0.5 each if there is no evidence either way.
+     *                                    `contradicting` counts the distinct syntax features found that only the
+     *                                    other interpreter accepts.
+     */
+    rank(pathname) {
+
+        let { score, syntax } = this.score(this.read(pathname));
+        let python3 = 1 / (1 + Math.exp(-score));
+        return _.orderBy([
+            { major: 3, confidence: python3, contradicting: syntax[2] },
+            { major: 2, confidence: 1 - python3, contradicting: syntax[3] }
+        ], ['confidence'], ['desc']);
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new InterpreterDetector();
@@ -15,6 +15,7 @@ import json
 import os
 import sys
 from itertools import chain
+from requirements import get_file_requirements, get_shell_requirements
 from visitor import ParserVisitor
 
 # Constants
@@ -44,9 +45,13 @@ def parse_method_call_tokens(snippet):
     dict
         JSON serializable dictionary containing the following keys
 
-        imports - All imports made by the parsed snippet
-        calls   - All method calls made by the parsed snippet, traced back to its
-                  associated library if possible.
+        imports          - All imports the parsed snippet requires, including
+                           dynamic imports
+        optional_imports - Imports the parsed snippet can run without
+        dynamic_imports  - Required imports made by __import__ or
+                           importlib.import_module with literal names
+        calls            - All method calls made by the parsed snippet, traced
+                           back to its associated library if possible.
     """
     # Parse snippet into an abstract syntax tree
     tree = ast.parse(str(snippet))
@@ -56,11 +61,18 @@ def parse_method_call_tokens(snippet):
     visitor.visit(tree)
 
     # Get imports and calls
-    imports = list(visitor.import_libraries)
+    imports = list(visitor.get_required_libraries())
+    optional_imports = list(visitor.get_optional_libraries())
+    dynamic_imports = list(visitor.dynamic_libraries)
     calls = list(visitor.calls)
 
     # Return
-    return {'imports': imports, 'calls': calls}
+    return {
+        'imports': imports,
+        'optional_imports': optional_imports,
+        'dynamic_imports': dynamic_imports,
+        'calls': calls
+    }
 
 
 def parse_file(filename):
@@ -76,9 +88,14 @@ def parse_file(filename):
     dict
         JSON serializable dictionary containing the following keys
 
-        imports - All imports made by the parsed snippet
-        calls   - All method calls made by the parsed snippet, traced back to its
-                  associated library if possible.
+        imports          - All imports the parsed snippet requires
+        optional_imports - Imports the parsed snippet can run without
+        dynamic_imports  - Required imports made dynamically
+        calls            - All method calls made by the parsed snippet, traced
+                           back to its associated library if possible.
+        requirements     - Packages installed by pip in notebook shell
+                           escapes and magics. Notebooks only.
+        notebook         - Notebook metadata. Notebooks only.
     """
     # Get file extension
     _, fext = os.path.splitext(filename)
@@ -117,7 +134,9 @@ def parse_file(filename):
                     'Unsupported notebook version: {}'.format(notebook_version)
                 )
 
-            # Filter magic
+            # Harvest pip installs, then filter magic
+            source_lines = list(source_lines)
+            requirements = get_shell_requirements(source_lines)
             source_lines = filter(
                 lambda l: not l.startswith('%') and not l.startswith('!'),
                 source_lines
@@ -128,6 +147,8 @@ def parse_file(filename):
 
             # Parse
             parse = parse_method_call_tokens(code)
+            parse['notebook'] = get_notebook_metadata(notebook_json)
+            parse['requirements'] = requirements
 
         # Set parse filename and return
         parse['filename'] = filename
@@ -243,6 +264,34 @@ def get_v4_source_lines(notebook):
     ))
 
 
+def get_notebook_metadata(notebook):
+    """Get metadata describing the era a notebook was written in.
+
+    Parameters
+    ----------
+    notebook : dict
+        Python dictionary conforming to the iPython v3 or v4 notebook schema
+
+    Returns
+    -------
+    dict
+        JSON serializable dictionary containing the following keys
+
+        nbformat         - Notebook format major version
+        nbformat_minor   - Notebook format minor version
+        kernel           - Kernel name, if recorded
+        language_version - Version of the language the notebook was last run
+                           with, if recorded
+    """
+    metadata = notebook.get('metadata', {})
+    return {
+        'nbformat': notebook.get('nbformat'),
+        'nbformat_minor': notebook.get('nbformat_minor'),
+        'kernel': metadata.get('kernelspec', {}).get('name'),
+        'language_version': metadata.get('language_info', {}).get('version'),
+    }
+
+
 def main():
     """Main function.
 
@@ -264,6 +313,7 @@ def main():
 
     # If pathname is a directory, iterate over all top level python files
     if os.path.isdir(pathname):
+        directory = pathname
         data = [
             parse_file(filename)
             for filename in map(
@@ -275,6 +325,7 @@ def main():
         ]
     # If pathname is a file, attempt to parse it
     elif os.path.isfile(pathname):
+        directory = os.path.dirname(pathname)
         data = [parse_file(pathname)]
     else:
         raise Exception('{} is not a directory or file.'.format(pathname))
@@ -296,7 +347,10 @@ def main():
             ),
         },
         'num_files': len(data),
-        'files': data
+        'files': data,
+        'requirements': list(chain.from_iterable(
+            parse.get('requirements', []) for parse in data
+        )) + get_file_requirements(directory)
     }))
 
 
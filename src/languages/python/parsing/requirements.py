@@ -0,0 +1,224 @@
+"""Requirement harvesting.
+
+Find the package requirements a codebase states for itself, from pip
+installs in notebook shell escapes and magics, requirements.txt, and
+setup.py.
+"""
+
+
+# Imports
+import ast
+import os
+import re
+import shlex
+
+
+# Constants
+REQUIREMENTS_TXT = 'requirements.txt'
+SETUP_PY = 'setup.py'
+SETUP_KEYWORDS = ('install_requires', 'requires')
+PIP_INSTALL = re.compile(r'\bpip3?\s+install\b')
+COMMAND_SEPARATORS = re.compile(r'&&|\|\||;')
+OPTIONS_WITH_VALUES = (
+    '-r', '--requirement', '-c', '--constraint', '-e', '--editable',
+    '-i', '--index-url', '--extra-index-url', '-f', '--find-links',
+    '-t', '--target', '--prefix', '--root', '--src', '--upgrade-strategy',
+)
+REQUIREMENT = re.compile(
+    r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*\(?([^;()]*)\)?'
+)
+
+
+def parse_requirement(line, source):
+    """Parse a single requirement specifier.
+
+    Parameters
+    ----------
+    line : string
+        Requirement, such as 'numpy>=1.10,<1.14' or 'tensorflow==1.4'.
+    source : string
+        Where the requirement was found.
+
+    Returns
+    -------
+    dict or None
+        JSON serializable dictionary containing the following keys, or
+        None if the line is not a requirement on a named package.
+
+        name      - Package name
+        specifier - Version specifier, such as '==1.4'. Empty if unpinned.
+        source    - Where the requirement was found
+    """
+    # Skip options, paths and URLs
+    line = line.split('#', 1)[0].strip()
+    if not line or line.startswith(('-', '.', '/')) or '://' in line:
+        return None
+
+    # Match name and specifier, dropping extras and environment markers
+    match = REQUIREMENT.match(line)
+    if not match:
+        return None
+    return {
+        'name': match.group(1),
+        'specifier': re.sub(r'\s+', '', match.group(2)),
+        'source': source,
+    }
+
+
+def get_shell_requirements(source_lines):
+    """Get requirements installed by pip in notebook shell escapes and magics.
+
+    Parameters
+    ----------
+    source_lines : iterable<str>
+        Source lines of a notebook, including lines starting with ! or %.
+
+    Returns
+    -------
+    list<dict>
+        Requirements, as returned by parse_requirement.
+    """
+    requirements = []
+    for line in source_lines:
+
+        # Only shell escapes and magics
+        line = line.strip()
+        if not line.startswith(('!', '%')):
+            continue
+
+        # Look at each command in the line
+        for command in COMMAND_SEPARATORS.split(line.lstrip('!%')):
+
+            match = PIP_INSTALL.search(command)
+            if not match:
+                continue
+
+            # Split arguments after install, honoring quotes if possible
+            arguments = command[match.end():]
+            try:
+                tokens = shlex.split(str(arguments))
+            except (ValueError, UnicodeError):
+                tokens = arguments.split()
+
+            # Skip options, and the values of options that take them
+            skip = False
+            for token in tokens:
+                if skip:
+                    skip = False
+                elif token.startswith('-'):
+                    skip = token in OPTIONS_WITH_VALUES
+                else:
+                    requirement = parse_requirement(token, 'notebook')
+                    if requirement:
+                        requirements.append(requirement)
+
+    return requirements
+
+
+def get_requirements_txt(directory):
+    """Get requirements listed in a requirements.txt file.
+
+    Parameters
+    ----------
+    directory : string
+        Directory that may contain requirements.txt.
+
+    Returns
+    -------
+    list<dict>
+        Requirements, as returned by parse_requirement.
+    """
+    filename = os.path.join(directory, REQUIREMENTS_TXT)
+    if not os.path.isfile(filename):
+        return []
+
+    with open(filename, 'r') as requirements_file:
+        return [
+            requirement
+            for requirement in map(
+                lambda l: parse_requirement(l, REQUIREMENTS_TXT),
+                requirements_file
+            )
+            if requirement
+        ]
+
+
+def get_setup_py(directory):
+    """Get requirements passed to setup() in a setup.py file.
+
+    Only literal lists are read, either passed directly or assigned to a
+    module level name that is passed. The file is never executed.
+
+    Parameters
+    ----------
+    directory : string
+        Directory that may contain setup.py.
+
+    Returns
+    -------
+    list<dict>
+        Requirements, as returned by parse_requirement.
+    """
+    filename = os.path.join(directory, SETUP_PY)
+    if not os.path.isfile(filename):
+        return []
+
+    # Parse. setup.py may be written for the other interpreter.
+    try:
+        with open(filename, 'r') as setup_file:
+            tree = ast.parse(setup_file.read())
+    except (SyntaxError, ValueError, UnicodeError):
+        return []
+
+    # Module level assignments of literals
+    names = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names[target.id] = node.value
+
+    # Find literal requirement lists passed to setup()
+    requirements = []
+    for node in ast.walk(tree):
+
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        if name != 'setup':
+            continue
+
+        for keyword in node.keywords:
+            if keyword.arg not in SETUP_KEYWORDS:
+                continue
+            value = keyword.value
+            if isinstance(value, ast.Name):
+                value = names.get(value.id)
+            try:
+                lines = ast.literal_eval(value)
+            except (ValueError, TypeError, SyntaxError):
+                continue
+            if isinstance(lines, (list, tuple)):
+                requirements.extend(filter(None, map(
+                    lambda l: parse_requirement(l, SETUP_PY),
+                    lines
+                )))
+
+    return requirements
+
+
+def get_file_requirements(directory):
+    """Get requirements stated in files next to a codebase.
+
+    Parameters
+    ----------
+    directory : string
+        Directory containing the codebase.
+
+    Returns
+    -------
+    list<dict>
+        Requirements, as returned by parse_requirement.
+    """
+    return get_requirements_txt(directory) + get_setup_py(directory)
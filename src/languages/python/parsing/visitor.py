@@ -12,8 +12,31 @@ import sys
 sys.setrecursionlimit(10000)
 
 
+# Constants
+IMPORT_ERRORS = ('ImportError', 'ModuleNotFoundError')
+IMPORT_NODES = (ast.Import, ast.ImportFrom)
+EXIT_CALLS = ('exit', 'quit', '_exit')
+VERSION_CHECKS = ('version_info', 'hexversion', 'python_version', 'PY2', 'PY3')
+VERSION_NAMES = ('sys', 'six', 'version_info', 'hexversion', 'PY2', 'PY3')
+VERSION_ATTRIBUTES = ('version_info', 'hexversion', 'PY2', 'PY3', 'major', 'minor', 'micro')
+DYNAMIC_IMPORTS = ('__import__', 'import_module')
+try:
+    STRING_TYPES = (str, unicode)
+except NameError:
+    STRING_TYPES = (str,)
+
+
 class ParserVisitor(ast.NodeVisitor):
-    """An AST NodeVisitor for library calls."""
+    """An AST NodeVisitor for library calls.
+
+    Imported libraries are classified as required, optional, or dynamic.
+    Optional imports are made inside try blocks that only import and recover
+    from import errors, or inside branches on the interpreter version that
+    the parsing interpreter does not take. When such a handler imports a
+    fallback library, the try body is kept required.
+    Dynamic imports are calls to __import__ or importlib.import_module with
+    literal names.
+    """
 
     def __init__(self):
         """Initialize CallVisitor."""
@@ -21,10 +44,17 @@ class ParserVisitor(ast.NodeVisitor):
         # Encoutered calls
         self.import_names = set()
         self.import_libraries = set()
+        self.optional_libraries = set()
+        self.dynamic_libraries = set()
         self.prefixes = {}
         self.aliases = {}
         self.calls = set()
 
+        # Number of enclosing optional import contexts, and sets collecting
+        # the libraries imported in them
+        self.optional_depth = 0
+        self.captures = []
+
     def is_standard_library(self, name):
         """Determine if a module name refers to a module in the python standard library.
 
@@ -60,6 +90,224 @@ class ParserVisitor(ast.NodeVisitor):
 
             return False
 
+    def add_library(self, name, dynamic=False):
+        """Record an imported library as optional if in an optional context.
+
+        Parameters
+        ----------
+        name : string
+            Name of the imported module.
+        dynamic : bool
+            True if the module is imported dynamically.
+        """
+        if self.optional_depth:
+            self.optional_libraries.add(name)
+            for capture in self.captures:
+                capture.add(name)
+        elif dynamic:
+            self.dynamic_libraries.add(name)
+        else:
+            self.import_libraries.add(name)
+
+    def get_required_libraries(self):
+        """Get libraries the code cannot run without.
+
+        Returns
+        -------
+        set
+            Statically and dynamically imported libraries outside of optional
+            contexts.
+        """
+        return self.import_libraries | self.dynamic_libraries
+
+    def get_optional_libraries(self):
+        """Get libraries the code can run without.
+
+        Returns
+        -------
+        set
+            Libraries only imported inside optional contexts, excluding those
+            whose top level package is required.
+        """
+        required = set(name.split('.')[0] for name in self.get_required_libraries())
+        return set(
+            name for name in self.optional_libraries
+            if name.split('.')[0] not in required
+        )
+
+    def handles_import_error(self, handler):
+        """Determine if an exception handler catches import errors.
+
+        Parameters
+        ----------
+        handler : ExceptHandler
+            AST exception handler.
+
+        Returns
+        -------
+        bool
+            True if the handler catches ImportError.
+        """
+        if handler.type is None:
+            return True
+        types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        return any(
+            getattr(t, 'id', getattr(t, 'attr', None)) in IMPORT_ERRORS
+            for t in types
+        )
+
+    def aborts(self, handler):
+        """Determine if an exception handler raises or exits.
+
+        Parameters
+        ----------
+        handler : ExceptHandler
+            AST exception handler.
+
+        Returns
+        -------
+        bool
+            True if the handler raises or calls an exit function.
+        """
+        for node in ast.walk(handler):
+            if isinstance(node, ast.Raise):
+                return True
+            if isinstance(node, ast.Call):
+                name = getattr(node.func, 'id', getattr(node.func, 'attr', None))
+                if name in EXIT_CALLS:
+                    return True
+        return False
+
+    def visit_optional(self, nodes):
+        """Visit nodes in an optional context.
+
+        Parameters
+        ----------
+        nodes : list<AST>
+            AST nodes to visit.
+
+        Returns
+        -------
+        set
+            Libraries imported by the nodes.
+        """
+        capture = set()
+        self.optional_depth += 1
+        self.captures.append(capture)
+        for child in nodes:
+            self.visit(child)
+        self.captures.pop()
+        self.optional_depth -= 1
+        return capture
+
+    def visit_try(self, node):
+        """Visit try statements.
+
+        Imports in the body and handlers are optional if the body contains
+        nothing but imports, and some handler recovers from an import error
+        without raising or exiting. If a recovering handler imports a
+        non-standard fallback, the body and fallback are alternatives, and
+        the body imports stay required unless the try is itself optional.
+        """
+        recovering = [
+            h for h in node.handlers
+            if self.handles_import_error(h) and not self.aborts(h)
+        ]
+        optional = bool(recovering) and all(isinstance(n, IMPORT_NODES) for n in node.body)
+
+        # Visit body and handlers
+        if optional:
+            body = self.visit_optional(node.body)
+            fallback = self.visit_optional(recovering)
+            self.visit_optional([h for h in node.handlers if h not in recovering])
+
+            # Keep the preferred alternative required if a fallback library is
+            # imported instead. Standard library fallbacks need nothing.
+            if body and fallback and not self.optional_depth:
+                self.optional_libraries -= body
+                self.import_libraries |= body
+
+        else:
+            for child in node.body + node.handlers:
+                self.visit(child)
+
+        # Visit else and finally blocks
+        for child in node.orelse + getattr(node, 'finalbody', []):
+            self.visit(child)
+
+    # Python 3 and Python 2 try statements
+    visit_Try = visit_try
+    visit_TryExcept = visit_try
+
+    def evaluate_version_check(self, test):
+        """Evaluate a simple check on the interpreter version.
+
+        Checks such as ``sys.version_info[0] >= 3``, ``sys.version_info <
+        (3, 0)`` or ``six.PY2`` are evaluated against the interpreter running
+        the parser, which is the interpreter the code is validated with.
+        Checks calling functions or referring to other names are not
+        evaluated.
+
+        Parameters
+        ----------
+        test : AST
+            Test expression of an if statement.
+
+        Returns
+        -------
+        bool or None
+            Result of the check, or None if it cannot be evaluated.
+        """
+        for node in ast.walk(test):
+            if isinstance(node, ast.Call):
+                return None
+            if isinstance(node, ast.Name) and node.id not in VERSION_NAMES:
+                return None
+            if isinstance(node, ast.Attribute) and node.attr not in VERSION_ATTRIBUTES:
+                return None
+
+        # Evaluate with the version names bound and no builtins
+        py2 = sys.version_info[0] == 2
+        names = {
+            'version_info': sys.version_info,
+            'hexversion': sys.hexversion,
+            'PY2': py2,
+            'PY3': not py2
+        }
+        version = type('Version', (object,), dict(names))
+        names.update({'sys': version, 'six': version, '__builtins__': {}})
+        try:
+            code = compile(ast.Expression(body=test), '<version check>', 'eval')
+            return bool(eval(code, names))
+        except Exception:
+            return None
+
+    def visit_If(self, node):
+        """Visit if statements.
+
+        Imports in the branch of a check on the interpreter version that the
+        parsing interpreter takes are required, and imports in the other
+        branch are optional. Imports in either branch are optional if the
+        check cannot be evaluated.
+        """
+        check = any(
+            getattr(n, 'attr', getattr(n, 'id', None)) in VERSION_CHECKS
+            for n in ast.walk(node.test)
+        )
+        if not check:
+            self.generic_visit(node)
+            return
+
+        # Visit the test, then the branches
+        self.visit(node.test)
+        taken = self.evaluate_version_check(node.test)
+        for branch, required in ((node.body, taken is True), (node.orelse, taken is False)):
+            if required:
+                for child in branch:
+                    self.visit(child)
+            else:
+                self.visit_optional(branch)
+
     def visit_Import(self, node):
         """Visit import statements.
 
@@ -74,7 +322,7 @@ class ParserVisitor(ast.NodeVisitor):
                 self.import_names.add(alias.name)
 
             if alias.name and not self.is_standard_library(alias.name):
-                self.import_libraries.add(alias.name)
+                self.add_library(alias.name)
 
         # Call generic visit to visit all child nodes
         self.generic_visit(node)
@@ -94,7 +342,7 @@ class ParserVisitor(ast.NodeVisitor):
                 self.import_names.add(alias.name)
 
             if node.module and not self.is_standard_library(node.module):
-                self.import_libraries.add(node.module)
+                self.add_library(node.module)
                 self.prefixes[alias.name] = node.module
 
         # Call generic visit to visit all child nodes
@@ -129,6 +377,14 @@ class ParserVisitor(ast.NodeVisitor):
         # Add call node to encountered calls
         self.calls.add(self.call_to_string(node))
 
+        # Record dynamic imports of literal, absolute module names
+        name = getattr(node.func, 'id', getattr(node.func, 'attr', None))
+        if name in DYNAMIC_IMPORTS and node.args:
+            module = getattr(node.args[0], 's', getattr(node.args[0], 'value', None))
+            if isinstance(module, STRING_TYPES) and module and not module.startswith('.'):
+                if not self.is_standard_library(module):
+                    self.add_library(module, dynamic=True)
+
         # Call generic visit to visit all child nodes
         self.generic_visit(node)
 
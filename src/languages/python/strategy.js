@@ -12,22 +12,42 @@ const path                     = require('path');
 const dockerTools              = require('../../docker-tools');
 const errors                   = require('../../errors');
 const factory                  = require('../../strategy-factory');
+const interpreterDetector      = require('./interpreter-detector');
 const LanguageStrategy         = require('../language-strategy');
 const logger                   = require('../../logger');
 const metadata                 = require('../../metadata');
+const wheelhouse               = require('../../systems/pip/wheelhouse');
 
 
 // Constants
 const ADD_PATH                 = '/app';
 const IMPORT_ERRORS            = ['ImportError', 'ModuleNotFoundError'];
+const NBFORMAT_V4_RELEASE      = '2015-02-27';  // Notebooks in older formats were last saved before this date.
+const SKIP_CONFIDENCE          = 0.02;          // Interpreters less likely than this are not parsed with...
+const SKIP_CONTRADICTING       = 2;             // ...if this many distinct syntax features rule them out.
+
+
+// Dates each Python version stopped being the newest release of its major version, by major.minor version. Code
+// run with a version was most likely written before its successor was released.
+const PYTHON_SUCCEEDED         = {
+    '2.7': '2020-01-01',
+    '3.3': '2014-03-16',
+    '3.4': '2015-09-13',
+    '3.5': '2016-12-23',
+    '3.6': '2018-06-27',
+    '3.7': '2019-10-14',
+    '3.8': '2020-10-05',
+    '3.9': '2021-10-04'
+};
 
 
 // Docker images
 const PYTHON2_PARSE            = 'localhost:5000/v2/python2-parse:latest';
 const PYTHON3_PARSE            = 'localhost:5000/v2/python3-parse:latest';
-const PARSERS                  = [PYTHON3_PARSE, PYTHON2_PARSE];
+const PARSERS                  = { 3: PYTHON3_PARSE, 2: PYTHON2_PARSE };
 const PYTHON2_VALIDATE         = 'localhost:5000/v2/python2-validate:latest';
 const PYTHON3_VALIDATE         = 'localhost:5000/v2/python3-validate:latest';
+const BUILDERS                 = { 3: PYTHON3_VALIDATE, 2: PYTHON2_VALIDATE };
 const PYTHON2_JUPYTER_VALIDATE = 'localhost:5000/v2/python2-jupyter-validate:latest';
 const PYTHON3_JUPYTER_VALIDATE = 'localhost:5000/v2/python3-jupyter-validate:latest';
 
@@ -38,7 +58,11 @@ const PYTHON3_JUPYTER_VALIDATE = 'localhost:5000/v2/python3-jupyter-validate:lat
 class PythonStrategy extends LanguageStrategy {
 
     /**
-     * Parse an application and generate a set of potential starting environment configurations.
+     * Parse an application and generate a set of potential starting environment configurations. Interpreters are
+     * ranked by a fast syntax scan first. The application is parsed with the most likely interpreter first, and is not
+     * parsed with an interpreter it almost certainly does not run on. An interpreter is only ruled out by several
+     * independent syntax features, so no single misleading match can skip it. Each environment's search priority is the
+     * confidence in its interpreter.
      *
      * @returns {Promise<Array.<Environment>>}
      */
@@ -48,8 +72,27 @@ class PythonStrategy extends LanguageStrategy {
         let environments = [];
         let id = 0;
 
-        // Parse with Python 2 and Python 3
-        for (let parser of PARSERS) {
+        // Rank interpreters. The ranking is only a heuristic, so parse with both if it fails.
+        let ranking;
+        try {
+            ranking = interpreterDetector.rank(metadata.path);
+        }
+        catch (e) {
+            logger.warn(`Unable to rank interpreters: ${e.message}`);
+            ranking = [{ major: 3, confidence: 0.5, contradicting: 0 }, { major: 2, confidence: 0.5, contradicting: 0 }];
+        }
+        logger.info('Interpreter ranking:', ranking);
+
+        // Parse with Python 3 and Python 2, most likely first
+        for (let { major, confidence, contradicting } of ranking) {
+
+            // Skip unlikely interpreters
+            if (confidence < SKIP_CONFIDENCE && contradicting >= SKIP_CONTRADICTING) {
+                logger.info(`Skipping Python ${major}, confidence ${confidence}, `
+                    + `${contradicting} contradicting syntax features`);
+                continue;
+            }
+            let parser = PARSERS[major];
 
             try{
 
@@ -58,6 +101,10 @@ class PythonStrategy extends LanguageStrategy {
                 const deps = _.union(..._.map(parse.files, v => v.imports));
                 logger.info('Package imports the following resources', deps);
 
+                // Optional imports are not resolved to dependencies
+                const optional = _.difference(_.union(..._.map(parse.files, v => v.optional_imports || [])), deps);
+                if (optional.length) logger.info('Package optionally imports the following resources', optional);
+
                 // Determine executable path
                 // If the path is a directory and more than one file was found, specify the added directory.
                 // If the path is a directory and one file was found (parse errors if no files are found), specify the
@@ -90,11 +137,13 @@ class PythonStrategy extends LanguageStrategy {
                     id: _.toString(id++),
                     metadata: {
                         importedResources: { items: deps, count: deps.length },
+                        optionalResources: { items: optional, count: optional.length },
                         directDependencies: { items: [], count: 0, nameResolutions: 0, resourcePackageMapping: [] },
                         transitiveDependencies: { items: [], installOrder: [], count: 0 },
                         parseResult: parse,
                         language: parse.language.name,
                         system: parse.language.system,
+                        priority: confidence,
                         mutations: []
                     },
                     docker: {
@@ -147,13 +196,15 @@ class PythonStrategy extends LanguageStrategy {
             case 2:
                 return dockerTools.runDockerContainerWithDataMount(
                     jupyter ? PYTHON2_JUPYTER_VALIDATE : PYTHON2_VALIDATE,
-                    `'${metadata.path}' '${installCommands}'`
+                    `'${metadata.path}' '${installCommands}'`,
+                    wheelhouse.dockerArgs()
                 );
 
             case 3:
                 return dockerTools.runDockerContainerWithDataMount(
                     jupyter ? PYTHON3_JUPYTER_VALIDATE : PYTHON3_VALIDATE,
-                    `'${metadata.path}' '${installCommands}'`
+                    `'${metadata.path}' '${installCommands}'`,
+                    wheelhouse.dockerArgs()
                 );
 
             default:
@@ -405,6 +456,68 @@ class PythonStrategy extends LanguageStrategy {
 
     }
 
+    /**
+     * Estimate the date a Python application was written. The estimate is the earliest date implied by any of:
+     *
+     *  - Notebooks saved in a notebook format older than v4.
+     *  - The Python version notebooks were last run with.
+     *  - The environment interpreter. Python 2 code predates the end of Python 2.
+     *
+     * @param   {Environment} environment Environment specification.
+     * @returns {Era|null}                Estimated era, or null if there is no evidence.
+     */
+    estimateEra(environment) {
+
+        let evidence = [];
+
+        // Notebook metadata
+        for (let notebook of _.compact(_.map(_.get(environment, 'metadata.parseResult.files'), 'notebook'))) {
+            if (notebook.nbformat < 4) evidence.push([NBFORMAT_V4_RELEASE, `nbformat v${notebook.nbformat}`]);
+            let version = _.join(_.take(_.split(notebook.language_version, '.'), 2), '.');
+            if (_.has(PYTHON_SUCCEEDED, version)) {
+                evidence.push([PYTHON_SUCCEEDED[version], `notebook run with Python ${version}`]);
+            }
+        }
+
+        // Interpreter
+        let interpreter = environment.docker.imageTag;
+        if (_.startsWith(interpreter, '2.') && _.has(PYTHON_SUCCEEDED, interpreter)) {
+            evidence.push([PYTHON_SUCCEEDED[interpreter], `Python ${interpreter} interpreter`]);
+        }
+
+        // Take the earliest
+        let earliest = _.minBy(evidence, 0);
+        return earliest ? { date: new Date(earliest[0]), source: earliest[1] } : null;
+
+    }
+
+    /**
+     * Build wheels for pinned pip dependencies that only publish an sdist for the interpreter, and add them to the
+     * wheelhouse validations install from. Versions that have been built, or have failed to build, before are skipped.
+     *
+     * @param   {String}                  interpreter  Interpreter version, such as `3.7`.
+     * @param   {Array.<Dependency>}      dependencies Dependencies in installation order.
+     * @returns {Promise<Array.<String>>}              Requirements wheels were built for.
+     */
+    async prebuild(interpreter, dependencies) {
+
+        // Find pinned pip dependencies without a compatible wheel
+        let pip = _.filter(dependencies, { system: 'pip' });
+        let strategy = factory.getSystemStrategy('pip');
+        let build = [];
+        for (let dependency of pip) {
+            if (!dependency.version || wheelhouse.attempted(dependency.name, dependency.version, interpreter)) continue;
+            let binary = await strategy.hasBinaryRelease(dependency.name, dependency.version, interpreter);
+            if (binary === false) build.push(dependency);
+        }
+
+        // Build in the validation image for the interpreter
+        let builder = BUILDERS[_.toInteger(_.head(_.split(interpreter, '.')))];
+        if (!build.length || !builder) return [];
+        return wheelhouse.build(builder, interpreter, pip, build);
+
+    }
+
 }
 
 
@@ -0,0 +1,156 @@
+"""Build wheels for requirements that only publish source distributions."""
+
+
+# Imports
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+# Configure logging
+logging.basicConfig(format='%(asctime)-15s %(message)s', stream=sys.stderr)
+logger = logging.getLogger('build_wheels')
+logger.setLevel(logging.INFO)
+
+
+# Result keys
+BUILT = 'built'
+FAILED = 'failed'
+
+
+def _pip(*args):
+    """Run pip, sending its output to stderr so stdout stays valid JSON.
+
+    Parameters
+    ----------
+    *args : string
+        Arguments passed to pip.
+
+    Returns
+    -------
+    bool
+        Whether pip succeeded.
+    """
+    command = ['pip'] + list(args)
+    logger.info('Executing command: {}'.format(' '.join(command)))
+    return subprocess.call(command, stdout=sys.stderr) == 0
+
+
+def _build_wheel(wheelhouse, requirement):
+    """Build a wheel and move it into the wheelhouse.
+
+    Parameters
+    ----------
+    wheelhouse : string
+        Directory wheels are moved to once built.
+    requirement : string
+        Requirement to build a wheel for.
+
+    Returns
+    -------
+    bool
+        Whether the wheel was built.
+    """
+    # pip only reads the top level of find links directories, so the hidden
+    # build directory is never installed from
+    staging = tempfile.mkdtemp(prefix='.build-', dir=wheelhouse)
+    try:
+        built = _pip(
+            'wheel', '--no-deps', '--wheel-dir', staging,
+            '--find-links', wheelhouse, requirement
+        )
+
+        # Renames within the volume are atomic
+        for name in os.listdir(staging):
+            os.rename(os.path.join(staging, name), os.path.join(wheelhouse, name))
+        return built
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def build_wheels(wheelhouse, requirements, build):
+    """Install requirements in order, building wheels for some of them.
+
+    Requirements are installed one at a time in the given order, because
+    building a package may need the packages before it, such as numpy for
+    scipy. Requirements marked for building are built into the wheelhouse
+    first and installed from there. Wheels are built into a hidden
+    directory inside of the wheelhouse and renamed into place once
+    complete, since validations installing from the wheelhouse at the same
+    time must never see a partly written wheel.
+
+    Parameters
+    ----------
+    wheelhouse : string
+        Directory wheels are written to and installed from.
+    requirements : list<str>
+        Requirements such as 'scipy==0.19.1', in installation order.
+    build : set<str>
+        Requirements to build wheels for.
+
+    Returns
+    -------
+    dict
+        JSON serializable dictionary containing the following keys.
+
+        built  - Requirements a wheel was built for
+        failed - Requirements a wheel could not be built for
+    """
+    result = {BUILT: [], FAILED: []}
+    for requirement in requirements:
+
+        # Build, then install from the wheelhouse
+        if requirement in build:
+            built = _build_wheel(wheelhouse, requirement)
+            result[BUILT if built else FAILED].append(requirement)
+
+        # Later builds may need this requirement installed
+        _pip('install', '--find-links', wheelhouse, requirement)
+
+    return result
+
+
+def main():
+    """Parse arguments and build wheels."""
+    # Get argv
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        'wheelhouse',
+        type=str,
+        help='Directory wheels are written to'
+    )
+    parser.add_argument(
+        'requirements',
+        type=str,
+        help='Comma delimited list of requirements in installation order'
+    )
+    parser.add_argument(
+        '--build',
+        type=str,
+        default='',
+        help='Comma delimited list of requirements to build wheels for'
+    )
+    argv = parser.parse_args()
+
+    # Convert lists
+    requirements = [r.strip() for r in argv.requirements.split(',') if r.strip()]
+    build = set(r.strip() for r in argv.build.split(',') if r.strip())
+
+    # Build
+    if not os.path.isdir(argv.wheelhouse):
+        os.makedirs(argv.wheelhouse)
+    result = build_wheels(argv.wheelhouse, requirements, build)
+
+    # Print result to stdout
+    logger.info('Printing to stdout.')
+    print(json.dumps(result))
+
+
+# Invoke main
+if __name__ == '__main__':
+    main()
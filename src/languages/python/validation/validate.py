@@ -19,6 +19,7 @@ import os
 import signal
 import subprocess
 import sys
+import time
 import traceback
 
 
@@ -76,6 +77,7 @@ EXCEPTION_LINE_NUMBER = 'exception_line_number'
 EXCEPTION_LINE = 'exception_line'
 EXCEPTION_STACK = 'exception_stack'
 INSTALL_ERRORS = 'install_errors'
+INSTALL_DURATIONS = 'install_durations'
 DEPENDENCIES = 'dependencies'
 EXECUTION = 'execution'
 
@@ -222,14 +224,15 @@ def run_install_commands(commands):
     try:
 
         # Build result object
-        result = {STATUS_CODE: SUCCESS, INSTALL_ERRORS: []}
+        result = {STATUS_CODE: SUCCESS, INSTALL_ERRORS: [], INSTALL_DURATIONS: []}
 
         for command_str in commands:
 
             # Log
             logger.info('Executing command: {}'.format(command_str))
 
-            # Run install command
+            # Run install command, timing it
+            start = time.time()
             command = command_str.split()
             proc = subprocess.Popen(
                 command,
@@ -238,6 +241,11 @@ def run_install_commands(commands):
             )
             stdout, stderr = map(_string, proc.communicate())
 
+            # Failed installs stop early, so their duration says nothing
+            # about the cost of installing the dependency
+            duration = None if proc.returncode else time.time() - start
+            result[INSTALL_DURATIONS].append(duration)
+
             # If a command fails, note the exception
             if proc.returncode:
 
@@ -0,0 +1,99 @@
+/**
+ * Least recently used cache.
+ *
+ * @module lru-cache
+ */
+
+
+/**
+ * A size-bounded map that evicts its least recently used entries. Recency is tracked using the insertion order of a
+ * native Map, so every operation is constant time.
+ *
+ * @property {Number} capacity Maximum number of entries held before eviction.
+ */
+class LRUCache {
+
+    /**
+     * Construct a new cache.
+     *
+     * @param {Number} [capacity=256] Maximum number of entries held before eviction.
+     */
+    constructor(capacity = 256) {
+        this.capacity = capacity;
+        this.entries = new Map();
+    }
+
+    /**
+     * Number of entries currently in the cache.
+     *
+     * @returns {Number} Cache size.
+     */
+    get size() { return this.entries.size; }
+
+    /**
+     * Determine if a key is in the cache. Does not affect recency.
+     *
+     * @param   {*}       key Cache key.
+     * @returns {Boolean}     True if the key is cached.
+     */
+    has(key) { return this.entries.has(key); }
+
+    /**
+     * Get a cached value and mark it as most recently used.
+     *
+     * @param   {*} key Cache key.
+     * @returns {*}     Cached value, or undefined on a miss.
+     */
+    get(key) {
+
+        // Miss
+        if (!this.entries.has(key)) return undefined;
+
+        // Re-insert to move the entry to the most recently used position
+        let value = this.entries.get(key);
+        this.entries.delete(key);
+        this.entries.set(key, value);
+        return value;
+
+    }
+
+    /**
+     * Cache a value, evicting the least recently used entries if the cache is over capacity.
+     *
+     * @param   {*}        key   Cache key.
+     * @param   {*}        value Value to cache.
+     * @returns {LRUCache}       This cache.
+     */
+    set(key, value) {
+
+        // Re-insert to move the entry to the most recently used position
+        this.entries.delete(key);
+        this.entries.set(key, value);
+
+        // Evict from the front of the map (least recently used) until within capacity
+        while (this.entries.size > this.capacity) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+
+        return this;
+
+    }
+
+    /**
+     * Remove a key from the cache.
+     *
+     * @param   {*}       key Cache key.
+     * @returns {Boolean}     True if the key was cached.
+     */
+    delete(key) { return this.entries.delete(key); }
+
+    /**
+     * Remove all entries from the cache.
+     */
+    clear() { this.entries.clear(); }
+
+}
+
+
+// Export
+module.exports = LRUCache;
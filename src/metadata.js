@@ -16,6 +16,8 @@
  * @property {String}  path     The resolved absolute path to the codebase.
  * @property {String}  basename The basename of the codebase path. Either a code file or directory.
  * @property {Boolean} isDir    True if path points to a directory.
+ * @property {Date}    date     Approximate date the codebase was written, taken from its modification time.
+ * @property {String}  snapshot Resolved path to an offline PyPI metadata snapshot. If set, PyPI is never called.
  */
 class Metadata {}
 
@@ -0,0 +1,235 @@
+/**
+ * Consistency of pinned dependency versions.
+ *
+ * @module mutation/constraint-check
+ */
+
+
+// Core/NPM modules
+const _            = require('lodash');
+
+
+// Local modules
+const factory      = require('../strategy-factory');
+const logger       = require('../logger');
+const LRUCache     = require('../lru-cache');
+const versionIndex = require('../version-index');
+const versionUtils = require('../version-utils');
+
+
+// Constants
+const CAPACITY     = 4096;  // Dependency versions whose constraints are held in memory.
+const MAX_REPAIRS  = 5;     // Versions changed to repair a single environment.
+const MAX_ROLLBACK = 5;     // Older versions of a requiring dependency tried to satisfy a constraint.
+
+
+/**
+ * Checks the versions pinned by an environment against the version constraints each pinned version declares on the
+ * others, such as `scipy==1.3.0` requiring `numpy>=1.13.3`. Installing an inconsistent environment either fails or has
+ * the package manager silently install other versions than the ones pinned, so inconsistent environments are repaired
+ * before validation where possible. Constraints are read from package metadata, in-process, and are only as complete
+ * as that metadata. Unknown constraints are never enforced.
+ */
+class ConstraintCheck {
+
+    /**
+     * Construct an empty constraint cache.
+     */
+    constructor() {
+
+        this.cache = new LRUCache(CAPACITY);
+
+    }
+
+    /**
+     * Get the constraints a dependency version places on other packages of its system. Lookup failures are logged and
+     * treated as unknown.
+     *
+     * @param   {Dependency}                   dependency  Dependency.
+     * @param   {String}                       interpreter Interpreter version.
+     * @returns {Promise<Array.<Object>|null>}             Constraints as `{ name, specifier }`, or null if unknown.
+     */
+    constraints(dependency, interpreter) {
+
+        let key = `${interpreter} ${dependency.system}:${dependency.name}==${dependency.version}`;
+        if (!this.cache.has(key)) {
+            let strategy = factory.getSystemStrategy(dependency.system);
+            this.cache.set(key, strategy.getDependencyConstraints(dependency.name, dependency.version, interpreter)
+                .catch((e) => {
+                    logger.warn(`Unable to get constraints of ${dependency.name}==${dependency.version}: ${e.message}`);
+                    return null;
+                }));
+        }
+        return this.cache.get(key);
+
+    }
+
+    /**
+     * Find the constraints pinned dependencies place on each other, and those that are violated.
+     *
+     * @param   {Array.<Dependency>} dependencies Environment dependencies.
+     * @param   {String}             interpreter  Interpreter version.
+     * @returns {Promise<Object>}                 Constraints as `{ dependent, required, specifier }` in `constraints`,
+     *                                            and the violated ones in `conflicts`.
+     */
+    async check(dependencies, interpreter) {
+
+        // Pinned dependencies by system and normalized name
+        let pinned = _.filter(dependencies, 'version');
+        let key = (system, name) => `${system}:${factory.getSystemStrategy(system).normalizePackageName(name)}`;
+        let byName = new Map(_.map(pinned, d => [key(d.system, d.name), d]));
+
+        // Constraints between pinned dependencies
+        let constraints = _.flatten(await Promise.all(_.map(pinned, async (dependent) => {
+            let found = await this.constraints(dependent, interpreter);
+            return _.compact(_.map(found, ({ name, specifier }) => {
+                let required = byName.get(key(dependent.system, name));
+                if (!required || required === dependent || !specifier) return null;
+                return { dependent, required, specifier };
+            }));
+        })));
+
+        return {
+            constraints,
+            conflicts: _.reject(constraints, c => versionUtils.satisfiesSpecifier(c.required.version, c.specifier))
+        };
+
+    }
+
+    /**
+     * Find a version of a required dependency satisfying every constraint on it. The newest satisfying release at or
+     * below the pinned version is preferred, keeping close to the original environment, then the oldest newer one.
+     * Only releases that install on the interpreter are considered.
+     *
+     * @param   {Dependency}          required    Required dependency.
+     * @param   {Array.<Object>}      constraints Constraints between pinned dependencies.
+     * @param   {String}              interpreter Interpreter version.
+     * @returns {Promise<String|null>}            Version, or null if no release satisfies every constraint.
+     */
+    async satisfy(required, constraints, interpreter) {
+
+        let specifiers = _.map(_.filter(constraints, c => c.required === required), 'specifier');
+        let index = await versionIndex.get(required.system, required.name, interpreter);
+        let current = versionUtils.coerceSemver(required.version);
+
+        // Releases satisfying every constraint, in ascending order
+        let releases = _.filter(_.range(index.size), i => !index.semvers[i].prerelease.length
+            && _.every(specifiers, s => versionUtils.satisfiesSpecifier(index.versions[i], s)));
+        let below = _.findLast(releases, i => index.semvers[i].compare(current) <= 0);
+        let above = _.find(releases, i => index.semvers[i].compare(current) > 0);
+
+        let found = _.isUndefined(below) ? above : below;
+        return _.isUndefined(found) || index.versions[found] === required.version ? null : index.versions[found];
+
+    }
+
+    /**
+     * Find an older version of a dependent whose constraint on a required dependency is satisfied by the pinned
+     * version, or that no longer constrains it.
+     *
+     * @param   {Object}               conflict    Violated constraint.
+     * @param   {String}               interpreter Interpreter version.
+     * @returns {Promise<String|null>}             Version, or null if none of the latest older releases qualify.
+     */
+    async rollback(conflict, interpreter) {
+
+        let { dependent, required } = conflict;
+        let strategy = factory.getSystemStrategy(dependent.system);
+        let index = await versionIndex.get(dependent.system, dependent.name, interpreter);
+
+        for (let version of _.take(index.releasesBetween(dependent.version, '0.0.0'), MAX_ROLLBACK)) {
+            let constraints = await this.constraints(_.assign(_.clone(dependent), { version }), interpreter);
+            if (!constraints) continue;
+            let constraint = _.find(constraints, c => c.name === strategy.normalizePackageName(required.name));
+            if (!constraint || versionUtils.satisfiesSpecifier(required.version, constraint.specifier)) return version;
+        }
+        return null;
+
+    }
+
+    /**
+     * Check an environment, repairing conflicts where possible. Repairs change the required dependency of a conflict to
+     * a version satisfying every constraint on it, or else roll the dependent back to a version without the conflict.
+     * The package changed by the last mutation of the environment is never changed, so repairs do not undo the
+     * mutation being tried. Repairs and remaining conflicts are reported in the metadata of the last mutation, or of
+     * the environment if it has no mutations.
+     *
+     * Repairs are made to the environment itself, replacing entries of its dependency list in place. Search strategies
+     * keep expanding the environments they yield, so they continue from the repaired dependencies rather than
+     * repairing every descendant again.
+     *
+     * @param   {Environment}     environment Environment to check and repair.
+     * @returns {Promise<Object>}             The `repairs` made and remaining `conflicts`.
+     */
+    async resolve(environment) {
+
+        let interpreter = environment.docker.imageTag;
+        let mutation = _.last(_.get(environment, 'metadata.mutations'));
+        let mutated = _.get(mutation, 'changes.package');
+        let dependencies = environment.dependencies;
+        let repairs = [];
+        let check = await this.check(dependencies, interpreter);
+
+        // Repair one conflict at a time, since each repair can resolve or introduce others
+        while (check.conflicts.length && repairs.length < MAX_REPAIRS) {
+
+            let repair = null;
+            for (let conflict of check.conflicts) {
+
+                // Change the required dependency
+                let { dependent, required } = conflict;
+                let version = required.name !== mutated
+                    ? await this.satisfy(required, check.constraints, interpreter)
+                    : null;
+                if (version) {
+                    repair = { dependency: required, version, reason: conflict };
+                    break;
+                }
+
+                // Roll back the dependent
+                version = dependent.name !== mutated ? await this.rollback(conflict, interpreter) : null;
+                if (version) {
+                    repair = { dependency: dependent, version, reason: conflict };
+                    break;
+                }
+
+            }
+            if (!repair) break;
+
+            // Apply to the environment
+            let { dependency, version, reason } = repair;
+            logger.info(`Changing ${dependency.name} from ${dependency.version} to ${version} to satisfy `
+                + `${reason.dependent.name}==${reason.dependent.version} requiring `
+                + `${reason.required.name}${reason.specifier}`);
+            dependencies[_.indexOf(dependencies, dependency)] = _.assign(_.clone(dependency), { version });
+            repairs.push({
+                package: dependency.name,
+                from: dependency.version,
+                to: version,
+                requiredBy: `${reason.dependent.name}==${reason.dependent.version}`,
+                specifier: `${reason.required.name}${reason.specifier}`
+            });
+            check = await this.check(dependencies, interpreter);
+
+        }
+
+        // Report
+        let conflicts = _.map(check.conflicts, c => ({
+            package: c.dependent.name,
+            version: c.dependent.version,
+            requires: `${c.required.name}${c.specifier}`,
+            pinned: c.required.version
+        }));
+        let target = mutation || environment.metadata;
+        if (repairs.length) target.repairs = repairs;
+        if (conflicts.length) target.conflicts = conflicts;
+
+        return { repairs, conflicts };
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new ConstraintCheck();
@@ -7,31 +7,42 @@
 
 // Core/NPM modules
 const _                                    = require('lodash');
-const Bluebird                             = require('bluebird');
 
 
 // Local modules
 const logger                               = require('../logger');
 const factory                              = require('../strategy-factory');
+const metadata                             = require('../metadata');
 const neo4j                                = require('../neo4j');
+const versionIndex                         = require('../version-index');
 
 
 // Environment mutators
+const installCost                          = require('./install-cost');
 const semver                               = require('./semver');
+const PriorityQueue                        = require('./priority-queue');
+const SpillQueue                           = require('./spill-queue');
+const successModel                         = require('./success-model');
+const TranspositionTable                   = require('./transposition-table');
+const versionMatrix                        = require('./version-matrix');
 
 
 // Constants
 const FIRST_N                              = 500;
 const MAX_LEVEL                            = 10;
+const FOCUS_WIDTH                          = 10;  // Candidate versions of a dependency blamed for a failure.
+const SPREAD_WIDTH                         = 3;   // Candidate versions of each dependency when none is blamed.
 
 
 // Codes
+const SKIPPED                              = 'Skipped';
 const TIMEOUT                              = 'Timeout';
 const UNKNOWN_EXCEPTION                    = 'UnknownException';
 const NOT_REPAIRABLE                       = 'NotRepairable';
 const EXHAUSTED_MATRIX_VERSIONS            = 'ExhaustedVersionMatrixVersions';
 const EXHAUSTED_SINGLE_DEPENDENCY_VERSIONS = 'ExhaustedSingleDependencyVersions';
 const EXHAUSTED_ALL_DEPENDENCY_VERSIONS    = 'ExhaustedAllDependencyVersions';
+const EXHAUSTED_CANDIDATES                 = 'ExhaustedCandidates';
 
 
 // Mutation types
@@ -61,6 +72,50 @@ RETURN v1, collect(nodes(((u)<--(v2))[0])) AS upgrade
 `;
 
 
+/**
+ * Context passed to mutators applied to the dependencies of an environment.
+ *
+ * @param   {Environment} environment Environment being mutated.
+ * @returns {Object}                  Mutation context.
+ */
+function mutationContext(environment) { return { interpreter: environment.docker.imageTag }; }
+
+
+/**
+ * Drop version matrix mutations to versions that can not be installed on the interpreter named by a mutation context,
+ * such as releases that require a newer Python or only publish wheels for other platforms. The mutations are applied
+ * one after another, so the remaining mutations are relinked to change from the version before them.
+ *
+ * @param   {Dependency}                    dependency Dependency being mutated.
+ * @param   {Array.<MutationResult>}        mutations  Mutations in order of application.
+ * @param   {Object}                        [context]  Mutation context.
+ * @returns {Promise<Array.<MutationResult>>}          Mutations to installable versions.
+ */
+async function installableMutations(dependency, mutations, context) {
+
+    let interpreter = _.get(context, 'interpreter');
+    if (!interpreter || _.isEmpty(mutations)) return mutations;
+
+    // Filter to indexed versions
+    let index = await versionIndex.get(dependency.system, dependency.name, interpreter);
+    let installable = _.filter(mutations, ({ mutant }) => index.has(mutant.version));
+    if (installable.length < mutations.length) {
+        logger.info(`Dropped ${mutations.length - installable.length} version matrix mutation(s) of `
+            + `${dependency.name} to versions that do not install on Python ${interpreter}`);
+    }
+
+    // Relink
+    let from = dependency.version;
+    return _.map(installable, ({ mutant, mutation }) => {
+        let relinked = _.cloneDeep(mutation);
+        relinked.changes.from = from;
+        from = mutant.version;
+        return { mutant, mutation: relinked };
+    });
+
+}
+
+
 /**
  * Create a generator function that spreads mutations across multiple input environments round robin.
  *
@@ -72,7 +127,8 @@ function spreadFirstN(name, search) {
 
     /**
      * Generate the first n mutations of the input environments using search strategy `search`. Mutations will be
-     * applied evenly over the input environments round-robin.
+     * applied over the input environments round-robin, with each environment's share of n proportional to its
+     * priority.
      *
      * @param   {Array.<Environment>}                environments List of environments to mutate.
      * @param   {Number}                             [n=500]      Number of mutations to generate.
@@ -80,14 +136,15 @@ function spreadFirstN(name, search) {
      */
     return async function*(environments, n=FIRST_N){
 
-        // Split n over the number of base environments, round up if not evenly divisible..
-        n = _.ceil(n / environments.length);
-        let total = n * environments.length;
+        // Split n over the base environments in proportion to their priority, rounding up.
+        let priorities = _.map(environments, e => _.get(e, 'metadata.priority', 1));
+        let shares = _.map(priorities, p => _.ceil(n * p / _.sum(priorities)));
+        let total = _.sum(shares);
 
-        logger.info(`Starting ${name}. Generating at most ${total} mutations (${n} per environment, ${environments.length} environment(s)).`);
+        logger.info(`Starting ${name}. Generating at most ${total} mutations (${shares.join(', ')} per environment, ${environments.length} environment(s)).`);
 
         // Create generators and pair with undefined previous validation result
-        let generators = _.map(environments, _.partial(search, _, n));
+        let generators = _.map(environments, (environment, i) => search(environment, shares[i]));
         generators = _.zip(generators, Array(generators.length));
 
         // Metadata about why environments were pruned
@@ -125,69 +182,66 @@ function spreadFirstN(name, search) {
 /**
  * Generate environment specifications by doing a level-order traversal of the first n levels of the mutation tree.
  *
+ * The frontier is streamed. Each environment is kept only until its children have been generated, and children are
+ * generated one at a time as the consumer asks for them. The queue of environments waiting to be expanded spills to
+ * disk past a fixed memory budget.
+ *
  * @param   {Array.<Environment>}                environments List of environments to mutate.
  * @param   {Number}                             levels       Number of levels to explore, including the root level.
  * @returns {AsyncIterableIterator<Environment>}              Environment specification.
  */
 module.exports.naiveLevelOrderTraversal = async function*(environments, levels=MAX_LEVEL){
 
-    // Start at root level.
-    let level = 0;
+    // Start at root level. Yield each root environment for evaluation, then queue it for expansion if the next level
+    // is explored.
+    logger.info('Starting mutation generation at level: 0');
+    let parents = new SpillQueue();
+    for (let environment of environments) {
+        yield environment;
+        if (levels > 1) parents.push(environment);
+    }
 
     // Continue yielding environments while there are any left to yield and we
     // have not exceeded the allowed number of levels.
-    while (environments.length && level < levels) {
+    for (let level = 1; parents.length && level < levels; level++) {
 
         // Log
         logger.info(`Starting mutation generation at level: ${level}`);
 
-        // For each environment, yield it for evaluation, then generate its mutations if not on the last level.
-        let nextLevelEnvironments = [];
-        for (let environment of environments) {
-
-            // Yield environment for evaluation.
-            yield environment;
-
-            // Generate mutations when not on the last level
-            if (level < (levels - 1)) {
-
-                // Create a new environment for each combination of version mutator and dependency
-                let mutatedEnvironments = _.compact(_.flattenDeep(await Bluebird.map(semver.versionMutators, async (versionMutator) => {
-                    return await Bluebird.map(environment.dependencies, async (dependency, index) => {
-
-                        // Let the mutator operate on the dependency
-                        let mutationResult = await versionMutator.apply(dependency);
-                        let mutantDependency = mutationResult.mutant;
-                        let mutation = mutationResult.mutation;
-
-                        // If a new dependency was formed, mutate the environment and return it.
-                        if (mutantDependency) {
+        // For each environment on the previous level, generate its mutations one at a time, yield each for
+        // evaluation, then queue it for expansion if not on the last level.
+        let children = new SpillQueue();
+        let environment;
+        while ((environment = parents.shift()) !== undefined) {
 
-                            // Deep clone the environment to avoid side effects
-                            let mutantEnv = _.cloneDeep(environment);
-                            mutantEnv.metadata.mutations.push(mutation);
-                            mutantEnv.dependencies[index] = mutantDependency;
-                            return mutantEnv;
+            // Create a new environment for each combination of version mutator and dependency
+            for (let versionMutator of semver.versionMutators) {
+                for (let [index, dependency] of environment.dependencies.entries()) {
 
-                        }
-                        else {
+                    // Let the mutator operate on the dependency. Mutators may not produce a result.
+                    let mutationResult = await versionMutator.apply(dependency, mutationContext(environment));
+                    let mutantDependency = _.get(mutationResult, 'mutant');
 
-                            return null;
+                    // If a new dependency was formed, mutate the environment and yield it.
+                    if (mutantDependency) {
 
-                        }
+                        // Deep clone the environment to avoid side effects
+                        let mutantEnv = _.cloneDeep(environment);
+                        mutantEnv.metadata.mutations.push(mutationResult.mutation);
+                        mutantEnv.dependencies[index] = mutantDependency;
 
-                    });
-                })));
+                        yield mutantEnv;
+                        if (level < (levels - 1)) children.push(mutantEnv);
 
-                nextLevelEnvironments = _.concat(nextLevelEnvironments, mutatedEnvironments);
+                    }
 
+                }
             }
 
         }
 
-        // Set environments for the next level and increment.
-        environments = nextLevelEnvironments;
-        level++;
+        // Set environments for the next level
+        parents = children;
 
     }
 
@@ -302,7 +356,7 @@ async function*IDDFS(environment, n) {
             // Apply mutation to the dependency.
             let mutator = semver.versionMutators[mutatorIndex];
             logger.info(`Mutating dependency using mutator: ${mutator.name}`);
-            let mutationResult = await mutator.apply(dependency);
+            let mutationResult = await mutator.apply(dependency, mutationContext(environment));
 
             // If the mutation was successful, continue with the search.
             if (mutationResult) {
@@ -396,115 +450,157 @@ module.exports.firstNIDDFS = spreadFirstN('Iterative-Deepening Depth-First Searc
 
 
 /**
- * Given a dependency, generate a list of mutations to be applied in order based on the dependency's version upgrade
- * matrix. If no breaking breaking upgrades exist, the result will be an empty array. If the dependency does not have
- * an upgrade matrix, return null.
+ * Query the graph for a dependency's breaking upgrades. Used when the version matrix has not been compiled.
  *
- * @param   {Dependency}                           dependency Dependency for which mutations should be generated.
- * @returns {Promise<Array.<MutationResult>|null>}            List of mutations, or null if no version matrix exists.
+ * @param   {Dependency}           dependency Dependency to query.
+ * @returns {Promise<Object|null>}            Breaking upgrades as a lookup of version to versions with breaking
+ *                                            upgrades to it, and the lookup versions sorted descending up to the
+ *                                            current version. Null if the dependency has no upgrade data.
  */
-async function versionMatrixMutations(dependency) {
+async function queryVersionMatrix(dependency) {
 
-    // Open a Neo4j Driver
-    logger.info('Searching for upgrade data.');
-    return Bluebird.using(neo4j.getDriver(), async (driver) => {
+    // Get dependency system strategy
+    let strategy = factory.getSystemStrategy(dependency.system);
 
-        // Get dependency system strategy
-        let strategy = factory.getSystemStrategy(dependency.system);
+    // Query to see if any upgrade results are available in the database
+    let hasUpgrade = await neo4j.run(HAS_UPGRADES, dependency);
+    if (!hasUpgrade.records[0].get('has_upgrade')) return null;
 
-        // Query to see if any upgrade results are available in the database
-        let hasUpgrade = await driver.session().run(HAS_UPGRADES, dependency);
-        if (hasUpgrade.records[0].get('has_upgrade')) {
+    // Search for all breaking upgrades.
+    let results = await neo4j.run(BREAKING_UPGRADES, dependency);
 
-            logger.info('Dependency has upgrade data, using version matrix');
+    // Convert to a lookup dictionary
+    let lookup = {};
+    _.each(results.records, r => {
 
-            // If the dependency has any version upgrade results, query for all (v1)->(u)->(v2) sets where
-            // v1 <= current and the percent broken is nonzero. This graph may not be connected. Order connected
-            // components by maximum version in each component. For each connected component, try all versions in the
-            // following manner: Take the natural topological ordering imposed by sorting by descending version number.
-            // For each node, explore the node if it has not been explored before (except the node equal to the current
-            // version, which has already failed validation), and record that it has been explored. Then sort its
-            // unexplored neighbors by decreasing upgrade broken percentage, and explore them too.
+        let key = r.get('v1').properties.version;
+        lookup[key] = _.map(r.get('upgrade'), (u) => u[1].properties.version);
 
-            // Search for all breaking upgrades.
-            let results = await driver.session().run(BREAKING_UPGRADES, dependency);
-            if (results.records.length) {
+    });
 
-                logger.info('Breaking upgrades found in version matrix');
-                let mutations = [];
+    // Sort keys in descending order using the current version as a cutoff
+    let sortedVersions = _.isEmpty(lookup)
+        ? []
+        : await strategy.sortPackageVersions(_.keys(lookup), false, dependency.version, dependency.name);
 
-                // Get records
-                let records = results.records;
+    return { lookup, sortedVersions };
 
-                // Convert to a lookup dictionary
-                let lookup = {};
-                _.each(records, r => {
+}
 
-                    let key = r.get('v1').properties.version;
-                    lookup[key] = _.map(r.get('upgrade'), (u) => u[1].properties.version);
 
-                });
+/**
+ * Read a dependency's breaking upgrades from the compiled version matrix.
+ *
+ * @param   {Dependency}                     dependency Dependency to read.
+ * @returns {Promise<Object|null|undefined>}            Breaking upgrades in the same format as `queryVersionMatrix`,
+ *                                                      null if the dependency has no upgrade data, or undefined if the
+ *                                                      version matrix has not been compiled.
+ */
+async function readVersionMatrix(dependency) {
 
-                // Sort keys in descending order using the current version as a cutoff
-                let sortedVersions = await strategy.sortPackageVersions(_.keys(lookup), false, dependency.version);
+    // Get artifact
+    let matrix = versionMatrix.get(dependency);
+    if (!matrix) return matrix;
 
-                // Push mutations in a correct ordering
-                let encountered = new Set();
-                let mutation;
-                let mutant = dependency;
-                _.each(sortedVersions, (to_version) => {
+    // Take versions up to and including the current version from the presorted list. Only sort if the current version
+    // is unknown to the graph.
+    let lookup = matrix.upgrades;
+    let start = dependency.version ? matrix.versions.indexOf(dependency.version) : 0;
+    let sortedVersions = start !== -1
+        ? _.filter(matrix.versions.slice(start), v => _.has(lookup, v))
+        : await factory.getSystemStrategy(dependency.system).sortPackageVersions(
+            _.keys(lookup), false, dependency.version, dependency.name
+        );
 
-                    // If the new version is not equal to the current version and it has not previously been
-                    // explored, set it as explored now.
-                    if (to_version !== dependency.version && !encountered.has(to_version)) {
+    return { lookup, sortedVersions };
 
-                        encountered.add(to_version);
+}
 
-                    }
 
-                    // Visit immediate neighbors
-                    _.each(lookup[to_version], (from_version) => {
-
-                        // Mutate
-                        mutant = _.clone(mutant);
-                        mutation = {
-                            type: 'version_matrix_from_version',
-                            changes: {
-                                package: dependency.name,
-                                from: mutant.version,
-                                to: from_version
-                            }
-                        };
-                        mutant.version = from_version;
-                        mutations.push({ mutant, mutation });
+/**
+ * Given a dependency, generate a list of mutations to be applied in order based on the dependency's version upgrade
+ * matrix. If no breaking breaking upgrades exist, the result will be an empty array. If the dependency does not have
+ * an upgrade matrix, return null. Upgrade data is read from the compiled version matrix if available, otherwise the
+ * graph is queried.
+ *
+ * @param   {Dependency}                           dependency Dependency for which mutations should be generated.
+ * @param   {Object}                               [context]  Mutation context. If it names an interpreter, only
+ *                                                            mutations to versions that install on it are generated.
+ * @returns {Promise<Array.<MutationResult>|null>}            List of mutations, or null if no version matrix exists.
+ */
+async function versionMatrixMutations(dependency, context) {
 
-                        // Add to encountered set
-                        encountered.add(from_version);
+    logger.info('Searching for upgrade data.');
 
-                    });
+    // Get upgrade data
+    let matrix = await readVersionMatrix(dependency);
+    if (matrix === undefined) matrix = await queryVersionMatrix(dependency);
+    if (!matrix) {
 
-                });
+        logger.info('Dependency has no upgrade data');
+        return null;
 
-                return mutations;
+    }
 
-            }
-            else {
+    logger.info('Dependency has upgrade data, using version matrix');
 
-                logger.info('No breaking upgrades found in version matrix');
-                return [];
+    // If the dependency has any version upgrade results, query for all (v1)->(u)->(v2) sets where
+    // v1 <= current and the percent broken is nonzero. This graph may not be connected. Order connected
+    // components by maximum version in each component. For each connected component, try all versions in the
+    // following manner: Take the natural topological ordering imposed by sorting by descending version number.
+    // For each node, explore the node if it has not been explored before (except the node equal to the current
+    // version, which has already failed validation), and record that it has been explored. Then sort its
+    // unexplored neighbors by decreasing upgrade broken percentage, and explore them too.
+    let { lookup, sortedVersions } = matrix;
+    if (_.isEmpty(lookup)) {
 
-            }
+        logger.info('No breaking upgrades found in version matrix');
+        return [];
 
-        }
-        else {
+    }
+
+    logger.info('Breaking upgrades found in version matrix');
+    let mutations = [];
+
+    // Push mutations in a correct ordering
+    let encountered = new Set();
+    let mutation;
+    let mutant = dependency;
+    _.each(sortedVersions, (to_version) => {
 
-            logger.info('Dependency has no upgrade data');
-            return null;
+        // If the new version is not equal to the current version and it has not previously been
+        // explored, set it as explored now.
+        if (to_version !== dependency.version && !encountered.has(to_version)) {
+
+            encountered.add(to_version);
 
         }
 
+        // Visit immediate neighbors
+        _.each(lookup[to_version], (from_version) => {
+
+            // Mutate
+            mutant = _.clone(mutant);
+            mutation = {
+                type: 'version_matrix_from_version',
+                changes: {
+                    package: dependency.name,
+                    from: mutant.version,
+                    to: from_version
+                }
+            };
+            mutant.version = from_version;
+            mutations.push({ mutant, mutation });
+
+            // Add to encountered set
+            encountered.add(from_version);
+
+        });
+
     });
 
+    return installableMutations(dependency, mutations, context);
+
 }
 
 
@@ -586,7 +682,7 @@ async function*dependencyIDDFS(environment, index) {
 
             // Apply mutation to the dependency.
             logger.info(`Mutating dependency using mutator: ${mutator.name}`);
-            let mutationResult = await mutator.apply(dependencies[index]);
+            let mutationResult = await mutator.apply(dependencies[index], mutationContext(environment));
 
             // If the mutation was successful, continue with the search.
             if (mutationResult) {
@@ -757,7 +853,7 @@ async function*versionMatrixIDDFS(environment) {
                 // Initialize version matrix metadata for the dependency if it hasn't already been explored.
                 if (!metadata.has(hash)) {
 
-                    let mutations = await versionMatrixMutations(dependency);
+                    let mutations = await versionMatrixMutations(dependency, mutationContext(environment));
                     metadata.set(hash, {
                         hasVersionMatrix: !!mutations,
                         versionMatrixMutations: mutations
@@ -826,7 +922,7 @@ async function*versionMatrixIDDFS(environment) {
                     // Apply mutation to the dependency.
                     let mutator = semver.versionMutators[mutatorIndex];
                     logger.info(`Mutating dependency using mutator: ${mutator.name}`);
-                    let mutationResult = await mutator.apply(dependency);
+                    let mutationResult = await mutator.apply(dependency, mutationContext(environment));
 
                     // If the mutation was successful, continue with the search.
                     if (mutationResult) {
@@ -1007,7 +1103,7 @@ async function*feedbackDirectedDFS(environment, n) {
             if (_.isUndefined(metadata.hasVersionMatrix)) {
 
                 // Initialize pending mutations from version matrix
-                metadata.versionMatrixMutations = await versionMatrixMutations(dependency);
+                metadata.versionMatrixMutations = await versionMatrixMutations(dependency, mutationContext(environment));
                 metadata.hasVersionMatrix = !!metadata.versionMatrixMutations;
 
             }
@@ -1102,6 +1198,10 @@ async function*feedbackDirectedDFS(environment, n) {
         // so we do so by default.
         fixedValidations.pop();
 
+        // Mutants skipped without validation, such as ones with conflicting requirements, did not change anything the
+        // checkpoint tells us. Treat them as reproducing it, so the next mutation for the checkpoint is picked.
+        if (validation.status_code === SKIPPED) validation = checkpoint;
+
         // Inspect the validation to determine if mutation has introduced a different execution result that occurs
         // after the the exception encountered during the checkpoint (the checkpoint exception comes first). If it has,
         // set the current validation as the new checkpoint. We only need to check object reference equality for the
@@ -1210,9 +1310,190 @@ async function*feedbackDirectedDFS(environment, n) {
 module.exports.feedbackDirectedDFS = spreadFirstN('Feedback Directed Search', feedbackDirectedDFS);
 
 
+/**
+ * Get candidate replacement versions of a dependency for best-first search. Candidates are the versions with breaking
+ * upgrades into the current version, taken from the version matrix, followed by the results of the semver mutators.
+ *
+ * @param   {Dependency}             dependency Dependency to mutate.
+ * @param   {Number}                 limit      Maximum number of candidates.
+ * @param   {Object}                 context    Mutation context.
+ * @returns {Promise<Array.<Object>>}           Candidates as `{ mutant, mutation, broken }`, where `broken` is the
+ *                                              fraction of clients broken by upgrading from the candidate version to
+ *                                              the current version, or null if unknown.
+ */
+async function bestFirstCandidates(dependency, limit, context) {
+
+    let candidates = [];
+
+    // Use the compiled version matrix if available, since it carries upgrade percentages. Otherwise fall back to the
+    // version matrix mutations, which query the graph.
+    let matrix = versionMatrix.get(dependency);
+    if (matrix) {
+        let broken = _.get(matrix.broken, dependency.version, []);
+        _.each(_.get(matrix.upgrades, dependency.version, []), (version, i) => candidates.push({
+            mutant: _.assign(_.clone(dependency), { version }),
+            mutation: {
+                type: TYPE_VERSION_MATRIX_FROM,
+                changes: { package: dependency.name, from: dependency.version, to: version }
+            },
+            broken: _.isNil(broken[i]) ? null : broken[i]
+        }));
+    }
+    else if (matrix === undefined) {
+        _.each(await versionMatrixMutations(dependency, context), ({ mutant }) => candidates.push({
+            mutant,
+            mutation: {
+                type: TYPE_VERSION_MATRIX_FROM,
+                changes: { package: dependency.name, from: dependency.version, to: mutant.version }
+            },
+            broken: null
+        }));
+    }
+
+    // Add semver mutations
+    for (let versionMutator of semver.versionMutators) {
+        let mutationResult = await versionMutator.apply(dependency, context);
+        if (_.get(mutationResult, 'mutant')) candidates.push(_.assign({ broken: null }, mutationResult));
+    }
+
+    // Drop versions that do not install on the interpreter. Only compiled version matrix candidates can include them.
+    let interpreter = _.get(context, 'interpreter');
+    if (interpreter && matrix) {
+        let index = await versionIndex.get(dependency.system, dependency.name, interpreter);
+        candidates = _.filter(candidates, c => index.has(c.mutant.version));
+    }
+
+    // Drop the current version and duplicates, keeping the first occurrence of each version
+    return _.take(_.uniqBy(_.reject(candidates, c => c.mutant.version === dependency.version), 'mutant.version'), limit);
+
+}
+
+
+/**
+ * Perform best-first search from a single environment, and yield at most n mutations.
+ *
+ * Candidate environments are kept in a priority queue ordered by {@see SuccessModel}. Each validation is fed back the
+ * same way {@see feedbackDirectedDFS} consumes it. Branches are pruned on timeouts, unknown exceptions and errors that
+ * are not repairable, and otherwise the validated environment is expanded. Outcomes are recorded in the success model
+ * by inference, which alone knows whether a validation was fresh rather than reused. If the language strategy blames a
+ * single dependency for the failure, only that dependency is mutated and its candidates are boosted. Otherwise a few
+ * candidates of every dependency are queued. Candidates that are slow to install, such as versions that only ship an
+ * sdist, are penalized slightly so cheaper ones are tried first when candidates are otherwise equally promising.
+ *
+ * Helper function for {@see module:mutation.bestFirst}.
+ *
+ * @param   {Environment}                        environment Environment to mutate.
+ * @param   {Number}                             n           Maximum number of mutations to generate.
+ * @returns {AsyncIterableIterator<Environment>}             Environment specification.
+ */
+async function*bestFirst(environment, n) {
+
+    // Get language strategy
+    let language = factory.getLanguageStrategy(environment.metadata.language);
+
+    // Initialize potential return value for when generator stops
+    let returnValue = { id: environment.id };
+
+    // Track queued environments so none is generated twice
+    let seen = new Set([TranspositionTable.fingerprint(environment)]);
+    let queue = new PriorityQueue();
+
+    // Yield the initial environment and get its validation
+    logger.info('Yielding initial environment');
+    let validation = yield environment;
+
+    // Continue while at most n mutations have been yielded
+    let count = 0;
+    while (true) {
+
+        // Prune if there is no information to direct the next mutation. Otherwise expand. Skipped candidates were
+        // never validated, so there is nothing to expand them from.
+        if (validation.status_code === SKIPPED) {
+            logger.info('Candidate was skipped without validation');
+        }
+        else if (validation.status_code === TIMEOUT) {
+            logger.info('Execution timed out, pruning');
+        }
+        else if (!validation.execution || validation.execution.status_code === UNKNOWN_EXCEPTION) {
+            logger.info('Execution produced an unknown exception, pruning');
+        }
+        else if (!language.isRepairableVersionError(environment, validation)) {
+            logger.info('Execution exception is not a repairable version error, pruning');
+        }
+        else {
+
+            // Mutate only the dependency blamed for the exception if one is found, otherwise all dependencies
+            let focus = language.dependencyProducingException(environment, validation);
+            let indices = _.isNull(focus) ? _.range(environment.dependencies.length) : [focus];
+            let width = _.isNull(focus) ? SPREAD_WIDTH : FOCUS_WIDTH;
+
+            for (let index of indices) {
+
+                let dependency = environment.dependencies[index];
+                let strategy = factory.getSystemStrategy(dependency.system);
+                let context = mutationContext(environment);
+                for (let { mutant, mutation, broken } of await bestFirstCandidates(dependency, width, context)) {
+
+                    // Create the candidate environment, skipping any generated before
+                    let candidate = _.cloneDeep(environment);
+                    candidate.dependencies[index] = mutant;
+                    candidate.metadata.mutations.push(mutation);
+                    let fingerprint = TranspositionTable.fingerprint(candidate);
+                    if (seen.has(fingerprint)) continue;
+                    seen.add(fingerprint);
+
+                    // Score and queue
+                    let released = await strategy.getReleaseDate(mutant.name, mutant.version);
+                    let cost = await installCost.estimate(mutant, context.interpreter);
+                    queue.push(candidate, successModel.score({
+                        mutant: candidate,
+                        index,
+                        broken,
+                        released,
+                        cost,
+                        reference: _.get(candidate, 'metadata.era.date') || metadata.date || null,
+                        focus: !_.isNull(focus)
+                    }));
+
+                }
+
+            }
+
+        }
+
+        // Stop once n mutations have been yielded or there is nothing left to try
+        if (count >= n) return returnValue;
+        if (!queue.length) {
+            logger.info('No more candidates can be generated');
+            returnValue.code = EXHAUSTED_CANDIDATES;
+            returnValue.message = 'Exhausted all candidate environments';
+            return returnValue;
+        }
+
+        // Yield the most promising candidate and get its validation
+        environment = queue.pop();
+        logger.info('Yielding best candidate environment');
+        count++;
+        validation = yield environment;
+
+    }
+
+}
+
+
+/**
+ * Generate environment specifications by best-first search, validating the candidates most likely to succeed first.
+ *
+ * @param   {Array.<Environment>}                environments List of environments to mutate.
+ * @returns {AsyncIterableIterator<Environment>}              Environment specification.
+ */
+module.exports.bestFirst = spreadFirstN('Best-First Search', bestFirst);
+
+
 // Create lookup table
 module.exports.lookup = {
     'level-order': module.exports.naiveLevelOrderTraversal,
     'id-dfs': module.exports.firstNIDDFS,
     'feedback-directed': module.exports.feedbackDirectedDFS,
+    'best-first': module.exports.bestFirst,
 };
@@ -0,0 +1,174 @@
+/**
+ * Estimated cost of installing dependency versions.
+ *
+ * @module mutation/install-cost
+ */
+
+
+// Core/NPM modules
+const _               = require('lodash');
+const fs              = require('fs');
+
+
+// Local modules
+const dataDir         = require('../data-dir');
+const factory         = require('../strategy-factory');
+const logger          = require('../logger');
+
+
+// Constants
+const DURATIONS_FILE  = 'install-durations.json';
+const DURATIONS_PATH  = 'dependencies.install_durations';
+const SAVE_INTERVAL   = 25;    // Validations recorded between saves.
+const BINARY_SECONDS  = 5;     // Typical install time of a version with a compatible prebuilt binary.
+const SOURCE_SECONDS  = 120;   // Typical install time of a version that has to be built from source.
+const UNKNOWN_SECONDS = 20;    // Install time assumed when nothing is known.
+const CHEAPER_FACTOR  = 2;     // How many times cheaper an alternative must be to be preferred.
+
+
+/**
+ * Estimates how long installing a dependency version takes on an interpreter. Install durations measured during
+ * validation are persisted to the data directory and shared across inferences. Versions that have not been installed
+ * before are estimated from whether they ship a prebuilt binary for the interpreter, since building from source
+ * dominates install time.
+ */
+class InstallCost {
+
+    /**
+     * Total install seconds and install counts by dependency version and interpreter. Loaded from the data directory
+     * on first access.
+     *
+     * @returns {Object} Map of key to `[seconds, count]`.
+     */
+    get durations() {
+
+        if (!this._durations) {
+            let file = dataDir.resolve(DURATIONS_FILE);
+            this._durations = fs.existsSync(file) ? JSON.parse(fs.readFileSync(file, 'utf8')) : {};
+            this.unsaved = 0;
+            process.once('exit', () => this.save());
+        }
+        return this._durations;
+
+    }
+
+    /**
+     * Key identifying a dependency version on an interpreter.
+     *
+     * @param   {Dependency} dependency  Dependency.
+     * @param   {String}     interpreter Interpreter version.
+     * @returns {String}                 Key.
+     */
+    key(dependency, interpreter) {
+
+        return `${interpreter} ${dependency.system}:${dependency.name}==${dependency.version}`;
+
+    }
+
+    /**
+     * Record how long installing each dependency of a validated environment took. Validations without install
+     * durations, or with a duration missing for some dependency, are ignored. Dependencies whose install failed have a
+     * null duration and are not recorded, since a fast failure is not a cheap install.
+     *
+     * @param {Environment}           environment Validated environment.
+     * @param {EnvironmentValidation} validation  Validation result.
+     */
+    record(environment, validation) {
+
+        let seconds = _.get(validation, DURATIONS_PATH);
+        if (!_.isArray(seconds) || seconds.length !== environment.dependencies.length) return;
+
+        let durations = this.durations;
+        _.each(environment.dependencies, (dependency, i) => {
+            if (!_.isNumber(seconds[i])) return;
+            let key = this.key(dependency, environment.docker.imageTag);
+            durations[key] = durations[key] || [0, 0];
+            durations[key][0] += seconds[i];
+            durations[key][1]++;
+        });
+
+        // Save periodically
+        if (++this.unsaved >= SAVE_INTERVAL) this.save();
+
+    }
+
+    /**
+     * Write install durations to the data directory.
+     */
+    save() {
+
+        if (!this._durations || !this.unsaved) return;
+        try {
+            let file = dataDir.resolve(DURATIONS_FILE);
+            fs.writeFileSync(`${file}.tmp`, JSON.stringify(this._durations));
+            fs.renameSync(`${file}.tmp`, file);
+            this.unsaved = 0;
+        }
+        catch (e) {
+            logger.warn(`Unable to save install durations: ${e.message}`);
+        }
+
+    }
+
+    /**
+     * Estimate how long installing a dependency version takes. The mean measured duration is used if the version has
+     * been installed on the interpreter before. Otherwise the estimate depends on whether a prebuilt binary exists.
+     *
+     * @param   {Dependency}      dependency  Dependency.
+     * @param   {String}          interpreter Interpreter version.
+     * @returns {Promise<Number>}             Estimated seconds.
+     */
+    async estimate(dependency, interpreter) {
+
+        // Measured
+        let [seconds, count] = this.durations[this.key(dependency, interpreter)] || [0, 0];
+        if (count) return seconds / count;
+
+        // Estimated from release files. Lookup failures only cost the estimate.
+        let binary;
+        try {
+            let strategy = factory.getSystemStrategy(dependency.system);
+            binary = await strategy.hasBinaryRelease(dependency.name, dependency.version, interpreter);
+        }
+        catch (e) {
+            logger.warn(`Unable to check binary releases of ${dependency.name}==${dependency.version}: ${e.message}`);
+            binary = null;
+        }
+        return _.isNull(binary) ? UNKNOWN_SECONDS : (binary ? BINARY_SECONDS : SOURCE_SECONDS);
+
+    }
+
+    /**
+     * Choose among equally plausible versions of a dependency. Versions are given in order of preference, and the
+     * first is kept unless another is at least `CHEAPER_FACTOR` times cheaper to install, in which case the cheapest
+     * is taken.
+     *
+     * @param   {Dependency}      dependency  Dependency.
+     * @param   {Array.<String>}  versions    Candidate versions, most preferred first.
+     * @param   {String}          interpreter Interpreter version.
+     * @returns {Promise<String>}             Chosen version.
+     */
+    async cheapest(dependency, versions, interpreter) {
+
+        if (versions.length < 2) return _.first(versions);
+
+        // Estimate all candidates
+        let costs = [];
+        for (let version of versions) {
+            costs.push(await this.estimate(_.assign(_.clone(dependency), { version }), interpreter));
+        }
+
+        // Keep the preferred version unless something is substantially cheaper
+        let best = _.indexOf(costs, _.min(costs));
+        if (costs[best] * CHEAPER_FACTOR > costs[0]) return versions[0];
+        logger.info(`Preferring ${dependency.name}==${versions[best]} over ${versions[0]}, estimated install `
+            + `${_.round(costs[best])}s instead of ${_.round(costs[0])}s`);
+        return versions[best];
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new InstallCost();
@@ -26,10 +26,13 @@ class Mutator {
     /**
      * Apply mutation to a source object.
      *
-     * @param   {Object}                  source Source object to mutate.
-     * @returns {Promise<MutationResult>}        Result of applying mutation. May be null if mutation could not be applied.
+     * @param   {Object}                  source                Source object to mutate.
+     * @param   {Object}                  [context]             Context the source is mutated in.
+     * @param   {String}                  [context.interpreter] Interpreter of the environment containing the source.
+     * @returns {Promise<MutationResult>}                       Result of applying mutation. May be null if mutation
+     *                                                          could not be applied.
      */
-    async apply(source) { throw new Error(NOT_IMPLEMENTED); }
+    async apply(source, context) { throw new Error(NOT_IMPLEMENTED); }
 
     /**
      * Undo a mutation.
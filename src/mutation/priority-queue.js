@@ -0,0 +1,114 @@
+/**
+ * Binary heap priority queue.
+ *
+ * @module mutation/priority-queue
+ */
+
+
+/**
+ * Max priority queue. Items with higher priority are removed first. Items with equal priority are removed in the
+ * order they were added, so searches using the queue are deterministic.
+ *
+ * @property {Number} length Number of items in the queue.
+ */
+class PriorityQueue {
+
+    /**
+     * Construct an empty queue.
+     */
+    constructor() {
+
+        this.heap = [];
+        this.added = 0;
+
+    }
+
+    /**
+     * Number of items in the queue.
+     *
+     * @returns {Number} Queue length.
+     */
+    get length() { return this.heap.length; }
+
+    /**
+     * Determine if the entry at index i should be removed before the entry at index j.
+     *
+     * @param   {Number}  i First heap index.
+     * @param   {Number}  j Second heap index.
+     * @returns {Boolean}   True if entry i comes first.
+     */
+    before(i, j) {
+
+        let a = this.heap[i];
+        let b = this.heap[j];
+        return a.priority > b.priority || (a.priority === b.priority && a.order < b.order);
+
+    }
+
+    /**
+     * Swap two heap entries.
+     *
+     * @param {Number} i First heap index.
+     * @param {Number} j Second heap index.
+     */
+    swap(i, j) {
+
+        [this.heap[i], this.heap[j]] = [this.heap[j], this.heap[i]];
+
+    }
+
+    /**
+     * Add an item.
+     *
+     * @param {*}      item     Item to add.
+     * @param {Number} priority Item priority.
+     */
+    push(item, priority) {
+
+        // Append, then sift up
+        this.heap.push({ item, priority, order: this.added++ });
+        let i = this.heap.length - 1;
+        while (i > 0) {
+            let parent = (i - 1) >> 1;
+            if (!this.before(i, parent)) break;
+            this.swap(i, parent);
+            i = parent;
+        }
+
+    }
+
+    /**
+     * Remove and return the item with the highest priority.
+     *
+     * @returns {*} Item, or undefined if the queue is empty.
+     */
+    pop() {
+
+        if (!this.heap.length) return undefined;
+
+        // Move the last entry to the root, then sift down
+        let top = this.heap[0];
+        let last = this.heap.pop();
+        if (this.heap.length) {
+            this.heap[0] = last;
+            let i = 0;
+            while (true) {
+                let first = i;
+                for (let child of [2 * i + 1, 2 * i + 2]) {
+                    if (child < this.heap.length && this.before(child, first)) first = child;
+                }
+                if (first === i) break;
+                this.swap(i, first);
+                i = first;
+            }
+        }
+
+        return top.item;
+
+    }
+
+}
+
+
+// Export
+module.exports = PriorityQueue;
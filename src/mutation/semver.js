@@ -10,46 +10,62 @@
 
 // NPM modules
 const _                           = require('lodash');
-const semver                      = require('semver');
 
 
 // Local modules
-const factory                     = require('../strategy-factory');
+const installCost                 = require('./install-cost');
 const logger                      = require('../logger');
 const Mutator                     = require('./mutator');
+const versionIndex                = require('../version-index');
 const versionUtils                = require('../version-utils');
 
 
 // Constants
 const TYPE_DECREMENT_SEMVER_MAJOR = 'decrement_semver_major';
 const TYPE_DECREMENT_SEMVER_MINOR = 'decrement_semver_minor';
+const MAX_PATCHES                 = 5;  // Patch releases of the target minor version weighed by install cost.
 
 
 class DependencySemverMutator extends Mutator {
 
     /**
-     * Helper function for getting a lookup table containing all available versions for a dependency. Keys are the value
-     * coerced to semver.
+     * Helper function for getting the in-process version index containing all available versions for a dependency. If
+     * the context names an interpreter, only versions that install on it are included, so no mutation moves to a
+     * release that can not be installed.
      *
-     * @param   {Dependency}      dependency Dependency to lookup versions for.
-     * @returns {Promise<Object>}            Lookup table containing <semver, version> pairs.
+     * @param   {Dependency}            dependency Dependency to lookup versions for.
+     * @param   {Object}                [context]  Mutation context.
+     * @returns {Promise<VersionIndex>}            Sorted index of available versions.
      */
-    async getSemverLookupTable(dependency) {
+    async getVersionIndex(dependency, context) {
 
-        // Get system strategy
-        const strategy = await factory.getSystemStrategy(dependency.system);
+        return versionIndex.get(dependency.system, dependency.name, _.get(context, 'interpreter'));
 
-        // Resolve all available versions
-        let availableVersions = await strategy.getAvailablePackageVersions(dependency.name);
+    }
 
-        // Force all available versions to semver.
-        let semverVersions = _.map(availableVersions, versionUtils.coerceSemver);
+    /**
+     * Choose the patch release of a minor version to move to. Patch releases of a minor version are equally plausible,
+     * so the latest is preferred unless the context names an interpreter and one of the latest few patches is much
+     * cheaper to install on it, for example because the latest only ships an sdist.
+     *
+     * @param   {Dependency}      dependency Dependency being mutated.
+     * @param   {VersionIndex}    index      Index of available versions.
+     * @param   {String}          latest     Latest release of the target minor version.
+     * @param   {Object}          [context]  Mutation context.
+     * @returns {Promise<String>}            Chosen version.
+     */
+    async choosePatch(dependency, index, latest, context) {
 
-        // Pair and remove any versions that could not be parsed as semver (the semver version is null)
-        [semverVersions, availableVersions] = _.zip(..._.reject(_.zip(semverVersions, availableVersions), _.partial(_.some, _, _.isNull)));
+        let interpreter = _.get(context, 'interpreter');
+        if (!interpreter) return latest;
 
-        // Zip into an object (lookup table)
-        return _.zipObject(semverVersions, availableVersions);
+        // Weigh the latest patches of the same minor version by install cost
+        let version = versionUtils.coerceSemver(latest);
+        let patches = _.take(
+            index.releasesBetween(`${version.major}.${version.minor + 1}.0`, `${version.major}.${version.minor}.0`),
+            MAX_PATCHES
+        );
+        return patches.length ? installCost.cheapest(dependency, patches, interpreter) : latest;
 
     }
 
@@ -80,25 +96,25 @@ class DecrementSemverMajorVersion extends DependencySemverMutator {
     constructor() { super(TYPE_DECREMENT_SEMVER_MAJOR); }
 
     /**
-     * Mutate a dependency by decrementing the version to the latest release of the last major version.
+     * Mutate a dependency by decrementing the version to the latest release of the last major version, or a cheaper
+     * patch release of the same minor version.
      *
      * @param   {Dependency}              dependency Dependency specification to mutate.
+     * @param   {Object}                  [context]  Mutation context.
      * @returns {Promise<MutationResult>}            Mutation result containing mutated dependency specification.
      */
-    async apply(dependency) {
+    async apply(dependency, context) {
 
         // Try to coerce version to semver. If it is valid and greater than zero, try to decrement.
         let version = versionUtils.coerceSemver(dependency.version);
         if (version && version.major > 0) {
 
-            // Get lookup table for available versions.
-            const lookup = await this.getSemverLookupTable(dependency);
+            // Get index of available versions.
+            const index = await this.getVersionIndex(dependency, context);
 
             // Find the last release of the previous major version
-            const lastMajorVersion = semver.maxSatisfying(_.keys(lookup), `<${version.major}.0.0`);
-
-            // Lookup original version name
-            let newVersion = lookup[lastMajorVersion];
+            let newVersion = index.latestBelow(`${version.major}.0.0`);
+            if (newVersion) newVersion = await this.choosePatch(dependency, index, newVersion, context);
 
             // If a new version was found, alter the environment and return it.
             if (newVersion) {
@@ -140,28 +156,28 @@ class DecrementSemverMinorVersion extends DependencySemverMutator {
     constructor() { super(TYPE_DECREMENT_SEMVER_MINOR); }
 
     /**
-     * Mutate a dependency by decrementing the version to the latest patch of the last minor version.
+     * Mutate a dependency by decrementing the version to the latest patch of the last minor version, or a cheaper
+     * patch release of the same minor version.
      *
      * @param   {Dependency}              dependency Dependency specification to mutate.
+     * @param   {Object}                  [context]  Mutation context.
      * @returns {Promise<MutationResult>}            Mutation result containing mutated dependency specification.
      */
-    async apply(dependency) {
+    async apply(dependency, context) {
 
         // Try to coerce version to semver. If it is valid and greater than zero, try to decrement.
         let version = versionUtils.coerceSemver(dependency.version);
         if (version && version.minor > 0) {
 
-            // Get lookup table for available versions.
-            const lookup = await this.getSemverLookupTable(dependency);
+            // Get index of available versions.
+            const index = await this.getVersionIndex(dependency, context);
 
-            // Find the last release of the previous major version
-            const lastMajorVersion = semver.maxSatisfying(
-                _.keys(lookup),
-                `>=${version.major}.0.0 <${version.major}.${version.minor}.0`
+            // Find the last release of the previous minor version
+            let newVersion = index.latestBelow(
+                `${version.major}.${version.minor}.0`,
+                `${version.major}.0.0`
             );
-
-            // Lookup original version name
-            let newVersion = lookup[lastMajorVersion];
+            if (newVersion) newVersion = await this.choosePatch(dependency, index, newVersion, context);
 
             // If a new version was found, alter the environment and return it.
             if (newVersion) {
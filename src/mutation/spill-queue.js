@@ -0,0 +1,147 @@
+/**
+ * First in, first out queue that spills to disk past a memory budget.
+ *
+ * @module mutation/spill-queue
+ */
+
+
+// Core/NPM modules
+const _            = require('lodash');
+const fs           = require('fs');
+const os           = require('os');
+const path         = require('path');
+
+
+// Constants
+const MEMORY_LIMIT = 1000;       // Items held in memory before spilling.
+const CHUNK_BYTES  = 64 * 1024;  // Bytes read from the spill file at a time.
+
+
+// Spill files that have not been removed yet. Removed when the process exits.
+const spillFiles   = new Set();
+process.once('exit', () => spillFiles.forEach(file => fs.existsSync(file) && fs.unlinkSync(file)));
+
+
+/**
+ * A queue of JSON serializable items. Up to `limit` items are held in memory. Once the memory budget is full, items
+ * are appended to a newline delimited JSON file in the temp directory and read back in chunks as the queue drains, so
+ * memory use stays bounded regardless of queue length.
+ *
+ * @property {Number} length Number of items in the queue.
+ * @property {Number} limit  Maximum number of items held in memory.
+ */
+class SpillQueue {
+
+    /**
+     * Construct an empty queue.
+     *
+     * @param {Number} [limit] Maximum number of items held in memory.
+     */
+    constructor(limit = MEMORY_LIMIT) {
+
+        this.limit = limit;
+        this.length = 0;
+        this.memory = [];
+        this.file = null;
+        this.spilled = 0;      // Items in the spill file that have not been read.
+        this.readOffset = 0;   // Byte offset of the first unread item in the spill file.
+        this.partial = null;   // Bytes read past the last complete line.
+
+    }
+
+    /**
+     * Add an item to the end of the queue.
+     *
+     * @param {*} item JSON serializable item.
+     */
+    push(item) {
+
+        // Keep in memory while under budget and nothing is waiting on disk, which would be ahead of this item.
+        if (!this.spilled && this.memory.length < this.limit) {
+            this.memory.push(item);
+        }
+        else {
+            if (!this.file) {
+                this.file = path.join(os.tmpdir(), `v2-spill-${process.pid}-${_.uniqueId()}-${Date.now()}.jsonl`);
+                spillFiles.add(this.file);
+            }
+            fs.appendFileSync(this.file, `${JSON.stringify(item)}\n`);
+            this.spilled++;
+        }
+        this.length++;
+
+    }
+
+    /**
+     * Remove and return the item at the front of the queue.
+     *
+     * @returns {*} Item, or undefined if the queue is empty.
+     */
+    shift() {
+
+        if (!this.memory.length && this.spilled) this.refill();
+        if (!this.memory.length) return undefined;
+        this.length--;
+        return this.memory.shift();
+
+    }
+
+    /**
+     * Read up to `limit` spilled items back into memory. Removes the spill file once every item has been read.
+     */
+    refill() {
+
+        let fd = fs.openSync(this.file, 'r');
+        try {
+
+            let buffer = Buffer.alloc(CHUNK_BYTES);
+            while (this.spilled && this.memory.length < this.limit) {
+
+                // Read a chunk and parse complete lines
+                let bytes = fs.readSync(fd, buffer, 0, CHUNK_BYTES, this.readOffset);
+                if (!bytes) break;
+                this.readOffset += bytes;
+
+                // Only decode up to the last newline, so multi-byte characters are never split
+                let data = this.partial ? Buffer.concat([this.partial, buffer.slice(0, bytes)]) : buffer.slice(0, bytes);
+                let end = data.lastIndexOf('\n') + 1;
+                this.partial = Buffer.from(data.slice(end));
+                for (let line of _.compact(data.toString('utf8', 0, end).split('\n'))) {
+                    this.memory.push(JSON.parse(line));
+                    this.spilled--;
+                }
+
+            }
+
+        }
+        finally {
+
+            fs.closeSync(fd);
+
+        }
+
+        // Remove the spill file once drained. Later spills start a new file.
+        if (!this.spilled) this.clear();
+
+    }
+
+    /**
+     * Remove the spill file, if any.
+     */
+    clear() {
+
+        if (this.file) {
+            fs.unlinkSync(this.file);
+            spillFiles.delete(this.file);
+        }
+        this.file = null;
+        this.readOffset = 0;
+        this.partial = null;
+
+    }
+
+}
+
+
+// Export
+module.exports = SpillQueue;
@@ -0,0 +1,202 @@
+/**
+ * Model of how likely a candidate environment is to validate successfully.
+ *
+ * @module mutation/success-model
+ */
+
+
+// Core/NPM modules
+const _              = require('lodash');
+const fs             = require('fs');
+
+
+// Local modules
+const dataDir        = require('../data-dir');
+const logger         = require('../logger');
+
+
+// Constants
+const PAIRS_FILE     = 'version-pairs.json';
+const SAVE_INTERVAL  = 25;    // Validations recorded between saves.
+const DAY            = 86400000;
+const NEWER_DECAY    = 180;   // Days. Releases newer than the codebase lose score quickly.
+const OLDER_DECAY    = 730;   // Days. Releases older than the codebase lose score slowly.
+const SLOW_INSTALL   = 600;   // Seconds. Installs this slow or slower get the full cost penalty.
+const WEIGHTS        = {
+    broken: 1,                // Fraction of clients broken by the upgrade away from the candidate version.
+    age: 1,                   // Closeness of the release date to the codebase date.
+    pairs: 1,                 // Historical success rate of the candidate version alongside the other dependencies.
+    feedback: 2,              // Candidate changes the dependency blamed for the last failure.
+    depth: 0.1,               // Penalty per mutation from the initial environment.
+    cost: 0.25                // Penalty for the estimated install time of the candidate version.
+};
+
+
+/**
+ * Scores candidate environments for best-first search. Success rates of pairs of dependency versions that have been
+ * validated together are persisted to the data directory and shared across inferences.
+ */
+class SuccessModel {
+
+    /**
+     * Success and failure counts by version pair. Loaded from the data directory on first access.
+     *
+     * @returns {Object} Map of pair key to `[successes, failures]`.
+     */
+    get pairs() {
+
+        if (!this._pairs) {
+            let file = dataDir.resolve(PAIRS_FILE);
+            this._pairs = fs.existsSync(file) ? JSON.parse(fs.readFileSync(file, 'utf8')) : {};
+            this.unsaved = 0;
+            process.once('exit', () => this.save());
+        }
+        return this._pairs;
+
+    }
+
+    /**
+     * Key identifying a dependency version.
+     *
+     * @param   {Dependency} dependency Dependency.
+     * @returns {String}                Dependency key.
+     */
+    key(dependency) {
+
+        return `${dependency.system}:${dependency.name}==${dependency.version}`;
+
+    }
+
+    /**
+     * Key identifying an unordered pair of dependency versions.
+     *
+     * @param   {Dependency} a First dependency.
+     * @param   {Dependency} b Second dependency.
+     * @returns {String}       Pair key.
+     */
+    pairKey(a, b) {
+
+        return _.sortBy([this.key(a), this.key(b)]).join(' ');
+
+    }
+
+    /**
+     * Record the outcome of validating an environment against every pair of its dependencies.
+     *
+     * @param {Environment} environment Validated environment.
+     * @param {Boolean}     success     Whether validation succeeded.
+     */
+    record(environment, success) {
+
+        let pairs = this.pairs;
+        let dependencies = environment.dependencies;
+        for (let i = 0; i < dependencies.length; i++) {
+            for (let j = i + 1; j < dependencies.length; j++) {
+                let key = this.pairKey(dependencies[i], dependencies[j]);
+                pairs[key] = pairs[key] || [0, 0];
+                pairs[key][success ? 0 : 1]++;
+            }
+        }
+
+        // Save periodically
+        if (++this.unsaved >= SAVE_INTERVAL) this.save();
+
+    }
+
+    /**
+     * Write pair counts to the data directory.
+     */
+    save() {
+
+        if (!this._pairs || !this.unsaved) return;
+        try {
+            let file = dataDir.resolve(PAIRS_FILE);
+            fs.writeFileSync(`${file}.tmp`, JSON.stringify(this._pairs));
+            fs.renameSync(`${file}.tmp`, file);
+            this.unsaved = 0;
+        }
+        catch (e) {
+            logger.warn(`Unable to save version pair outcomes: ${e.message}`);
+        }
+
+    }
+
+    /**
+     * Average smoothed success rate of a dependency version alongside the other dependencies of an environment.
+     *
+     * @param   {Environment} environment Environment containing the dependency.
+     * @param   {Number}      index       Index of the dependency.
+     * @returns {Number}                  Success rate between 0 and 1. 0.5 if nothing is known.
+     */
+    pairRate(environment, index) {
+
+        let dependency = environment.dependencies[index];
+        let others = _.filter(environment.dependencies, (d, i) => i !== index);
+        if (!others.length) return 0.5;
+        return _.meanBy(others, (other) => {
+            let [successes, failures] = this.pairs[this.pairKey(dependency, other)] || [0, 0];
+            return (successes + 1) / (successes + failures + 2);
+        });
+
+    }
+
+    /**
+     * Score how close a release is to the date of the codebase. Releases made shortly before the codebase was written
+     * score highest.
+     *
+     * @param   {Date|null} released  Release date of the candidate version.
+     * @param   {Date|null} reference Date of the codebase.
+     * @returns {Number}              Score between 0 and 1. 0.5 if either date is unknown.
+     */
+    ageScore(released, reference) {
+
+        if (!released || !reference) return 0.5;
+        let days = (reference - released) / DAY;
+        return days < 0 ? Math.exp(days / NEWER_DECAY) : Math.exp(-days / OLDER_DECAY);
+
+    }
+
+    /**
+     * Score the estimated install time of a candidate version on a log scale, so the difference between a wheel and a
+     * source build counts far more than the difference between two source builds.
+     *
+     * @param   {Number|null} seconds Estimated install seconds.
+     * @returns {Number}              Cost between 0 and 1. 0 if unknown.
+     */
+    costScore(seconds) {
+
+        if (_.isNil(seconds)) return 0;
+        return _.clamp(Math.log1p(seconds) / Math.log1p(SLOW_INSTALL), 0, 1);
+
+    }
+
+    /**
+     * Score a candidate environment. Higher scores are more likely to succeed.
+     *
+     * @param   {Object}      candidate           Candidate description.
+     * @param   {Environment} candidate.mutant    Candidate environment.
+     * @param   {Number}      candidate.index     Index of the changed dependency.
+     * @param   {Number|null} candidate.broken    Fraction of clients broken by upgrading from the candidate version to
+     *                                            the current version, if known.
+     * @param   {Date|null}   candidate.released  Release date of the candidate version, if known.
+     * @param   {Date|null}   candidate.reference Date of the codebase, if known.
+     * @param   {Number|null} [candidate.cost]    Estimated seconds to install the candidate version, if known.
+     * @param   {Boolean}     candidate.focus     Whether the changed dependency was blamed for the last failure.
+     * @returns {Number}                          Score.
+     */
+    score({ mutant, index, broken, released, reference, cost, focus }) {
+
+        return WEIGHTS.broken * (_.isNil(broken) ? 0 : _.clamp(broken, 0, 1))
+            + WEIGHTS.age * this.ageScore(released, reference)
+            + WEIGHTS.pairs * this.pairRate(mutant, index)
+            + WEIGHTS.feedback * (focus ? 1 : 0)
+            - WEIGHTS.depth * mutant.metadata.mutations.length
+            - WEIGHTS.cost * this.costScore(cost);
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new SuccessModel();
@@ -0,0 +1,74 @@
+/**
+ * Transposition table of validated environments.
+ *
+ * @module mutation/transposition-table
+ */
+
+
+// Core/NPM modules
+const _ = require('lodash');
+
+
+/**
+ * Stores validation results by environment fingerprint. Search strategies can reach the same environment through
+ * different orders of mutations, and iterative deepening yields shallower levels again on each pass. Looking up an
+ * environment before validating it lets the result be reused instead of running another validation container.
+ */
+class TranspositionTable {
+
+    /**
+     * Canonical fingerprint of an environment. Two environments with the same fingerprint install the same packages
+     * on the same base image, so they validate the same way.
+     *
+     * @param   {Environment} environment Environment specification.
+     * @returns {String}                  Fingerprint.
+     */
+    static fingerprint(environment) {
+
+        return JSON.stringify([
+            _.get(environment, 'docker.imageName'),
+            _.get(environment, 'docker.imageTag'),
+            _.map(environment.dependencies, d => [d.system, d.name, d.version])
+        ]);
+
+    }
+
+    /**
+     * Construct an empty table.
+     */
+    constructor() {
+
+        this.table = new Map();
+
+    }
+
+    /**
+     * Get the stored validation of an environment.
+     *
+     * @param   {Environment}                environment Environment specification.
+     * @returns {EnvironmentValidation|null}             Copy of the stored validation, or null if it was never validated.
+     */
+    get(environment) {
+
+        let validation = this.table.get(TranspositionTable.fingerprint(environment));
+        return validation ? _.cloneDeep(validation) : null;
+
+    }
+
+    /**
+     * Store the validation of an environment.
+     *
+     * @param {Environment}           environment Environment specification.
+     * @param {EnvironmentValidation} validation  Validation result.
+     */
+    set(environment, validation) {
+
+        this.table.set(TranspositionTable.fingerprint(environment), _.cloneDeep(validation));
+
+    }
+
+}
+
+
+// Export
+module.exports = TranspositionTable;
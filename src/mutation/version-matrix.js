@@ -0,0 +1,133 @@
+/**
+ * Precompiled version upgrade matrices.
+ *
+ * @module mutation/version-matrix
+ */
+
+
+// Core/NPM modules
+const _                = require('lodash');
+const Bluebird         = require('bluebird');
+const fs               = require('fs');
+const path             = require('path');
+
+
+// Local modules
+const dataDir          = require('../data-dir');
+const factory          = require('../strategy-factory');
+const logger           = require('../logger');
+const neo4j            = require('../neo4j');
+
+
+// Constants
+const MATRIX_DIR       = 'version-matrix';
+const INDEX_FILE       = 'index.json';
+const SORT_CONCURRENCY = 8;
+const UPGRADES         = `
+MATCH (p :package)-[:version]->(v1 :version)<-[:upgrade]-(u :upgrade)<-[:upgrade]-(v2 :version)<-[:version]-(p)
+WITH p, v1, v2, u
+ORDER BY u.percent_broken DESC
+WITH p, v1, collect(CASE WHEN u.percent_broken > 0 THEN [v2.version, u.percent_broken / 100.0] END) AS upgrade
+RETURN p.name AS name, p.system AS system, collect([v1.version, upgrade]) AS upgrades
+`;
+const VERSIONS         = `
+UNWIND $packages AS package
+MATCH (p :package {name: package.name, system: package.system})-[:version]->(v :version)
+RETURN p.name AS name, p.system AS system, collect(DISTINCT v.version) AS versions
+`;
+
+
+// Compiled package list and artifacts read by this process
+let compiled           = null;
+const artifacts        = new Map();
+
+
+/**
+ * Path of the artifact for a package inside of the matrix directory.
+ *
+ * @param   {String} system Package system name.
+ * @param   {String} name   Package name.
+ * @returns {String}        Artifact path.
+ */
+function artifactPath(system, name) {
+
+    return dataDir.resolve(MATRIX_DIR, system, `${encodeURIComponent(name)}.json`);
+
+}
+
+
+/**
+ * Compile the upgrade graph into one artifact per package with upgrade data. Each artifact holds every version of the
+ * package sorted descending and, for each version, the versions with breaking upgrades to it ordered by decreasing
+ * `percent_broken`, along with the fraction of clients each breaks. The graph stores `percent_broken` as a percentage,
+ * so it is converted to a fraction here, once. An index of compiled packages is written last.
+ *
+ * @returns {Promise<Number>} Number of packages compiled.
+ */
+async function compile() {
+
+    // Breaking upgrades of every package with upgrade data
+    logger.info('Compiling version matrix from the graph');
+    let packages = _.map((await neo4j.run(UPGRADES)).records, (r) => {
+        let upgrades = _.fromPairs(_.filter(r.get('upgrades'), ([, upgrade]) => upgrade.length));
+        return {
+            name: r.get('name'),
+            system: r.get('system'),
+            upgrades: _.mapValues(upgrades, upgrade => _.map(upgrade, 0)),
+            broken: _.mapValues(upgrades, upgrade => _.map(upgrade, 1))
+        };
+    });
+
+    // All versions of those packages
+    let results = await neo4j.run(VERSIONS, { packages: _.map(packages, p => _.pick(p, ['name', 'system'])) });
+    let versions = new Map(_.map(results.records, r => [`${r.get('system')},${r.get('name')}`, r.get('versions')]));
+
+    // Sort versions and write artifacts
+    await Bluebird.map(packages, async ({ name, system, upgrades, broken }) => {
+        let strategy = factory.getSystemStrategy(system);
+        let sorted = await strategy.sortPackageVersions(versions.get(`${system},${name}`) || [], false, undefined, name);
+        fs.writeFileSync(artifactPath(system, name), JSON.stringify({ versions: sorted, upgrades, broken }));
+    }, { concurrency: SORT_CONCURRENCY });
+
+    // Write index
+    fs.writeFileSync(dataDir.resolve(MATRIX_DIR, INDEX_FILE), JSON.stringify({
+        created: _.toInteger(Date.now() / 1000),
+        packages: _.map(packages, p => `${p.system},${p.name}`)
+    }));
+    compiled = null;
+    artifacts.clear();
+    return packages.length;
+
+}
+
+
+/**
+ * Get the compiled upgrade matrix of a package. Artifacts are read lazily the first time they are needed.
+ *
+ * @param   {Dependency}            dependency Dependency to get the matrix for.
+ * @returns {Object|null|undefined}            Matrix with `versions` sorted descending, and breaking `upgrades` and
+ *                                             their `broken` fractions by version. Null if the package has no upgrade
+ *                                             data, or undefined if the version matrix has not been compiled.
+ */
+function get(dependency) {
+
+    // Read the compiled package list
+    if (compiled === null) {
+        let file = path.join(dataDir.path, MATRIX_DIR, INDEX_FILE);
+        compiled = fs.existsSync(file) ? new Set(JSON.parse(fs.readFileSync(file, 'utf8')).packages) : undefined;
+    }
+    if (!compiled) return undefined;
+
+    // Read the package artifact
+    let key = `${dependency.system},${dependency.name}`;
+    if (!compiled.has(key)) return null;
+    if (!artifacts.has(key)) {
+        artifacts.set(key, JSON.parse(fs.readFileSync(artifactPath(dependency.system, dependency.name), 'utf8')));
+    }
+    return artifacts.get(key);
+
+}
+
+
+// Export
+module.exports = { compile, get };
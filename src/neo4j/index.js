@@ -6,32 +6,137 @@
 
 
 // Core/NPM modules
-const Bluebird    = require('bluebird');
-const neo4j       = require('neo4j-driver').v1;
+const _              = require('lodash');
+const Bluebird       = require('bluebird');
+const neo4j          = require('neo4j-driver').v1;
 
 
 // Local modules
-const dockerTools = require('../docker-tools');
+const dockerTools    = require('../docker-tools');
+const logger         = require('../logger');
+
+
+// Constants
+const READY_TIMEOUT  = 300;  // Seconds to wait for the graph to finish loading.
+const READY_INTERVAL = 2;    // Seconds between readiness checks.
+const DUMP_CHECKSUM  = 'MATCH (d :dump) RETURN d.checksum AS checksum';
 
 
 /**
- * Class for interacting with Neo4J.
+ * Class for interacting with Neo4J. A single driver is shared by the whole process. The driver pools connections, so
+ * the short lived sessions opened for each query reuse open connections.
  */
 class Neo4j {
 
     /**
-     * Return a neo4j client.
+     * The shared neo4j driver. Created on first access.
      *
-     * @returns {Promise<neo4j.driver>} Configured Neo4j driver wrapped in a Bluebird disposer.
+     * @returns {neo4j.driver} Configured Neo4j driver.
      */
-    async getDriver() {
+    get driver() {
 
         // Get correct hostname and init driver
-        let hostname = dockerTools.dockerContainer ? 'neo4j' : 'localhost';
-        let driver = neo4j.driver(`bolt://${hostname}:7687`);
+        if (!this._driver) {
+            let hostname = dockerTools.dockerContainer ? 'neo4j' : 'localhost';
+            this._driver = neo4j.driver(`bolt://${hostname}:7687`);
+        }
+
+        return this._driver;
+
+    }
+
+    /**
+     * Return a neo4j client. The driver is shared, so disposing of it does not close it.
+     *
+     * @returns {Promise<neo4j.driver>} Configured Neo4j driver wrapped in a Bluebird disposer.
+     */
+    async getDriver() {
 
         // Return as a Bluebird disposer
-        return Bluebird.resolve(driver).disposer(driver.close);
+        return Bluebird.resolve(this.driver).disposer(_.noop);
+
+    }
+
+    /**
+     * Run a query in a session borrowed from the shared driver. The session is closed once the query finishes,
+     * returning its connection to the pool.
+     *
+     * @param   {String}                  query    Cypher query.
+     * @param   {Object}                  [params] Query parameters.
+     * @returns {Promise<neo4j.Result>}            Query result.
+     */
+    async run(query, params) {
+
+        let session = this.driver.session();
+        try {
+            return await session.run(query, params);
+        }
+        finally {
+            session.close();
+        }
+
+    }
+
+    /**
+     * Get the checksum of the dump the graph was loaded from. The neo4j container records it in the graph shortly
+     * after the server starts. Data exported from the graph is keyed to it, so it can be rebuilt after a new graph is
+     * loaded.
+     *
+     * @returns {Promise<String|null>} Dump checksum, or null if it has not been recorded.
+     */
+    async dumpChecksum() {
+
+        let record = _.first((await this.run(DUMP_CHECKSUM)).records);
+        return record ? record.get('checksum') : null;
+
+    }
+
+    /**
+     * Wait for the graph to be ready to answer queries. The neo4j container loads its database before starting the
+     * server, so the server accepting queries means the graph is fully loaded. The dump checksum is waited for too,
+     * so data exported from the graph can be checked against it. Graphs that never record one are used anyway once
+     * the timeout passes.
+     *
+     * @param   {Number}        [timeout] Seconds to wait before giving up.
+     * @returns {Promise<void>}
+     */
+    async waitUntilReady(timeout = READY_TIMEOUT) {
+
+        let deadline = Date.now() + timeout * 1000;
+        while (true) {
+
+            try {
+
+                // Ready once the dump checksum is recorded
+                if (await this.dumpChecksum()) return;
+                if (Date.now() >= deadline) {
+                    logger.warn('The graph has no dump checksum, so data exported from it can not be checked for '
+                        + 'staleness');
+                    return;
+                }
+                logger.info('Waiting for the graph to record its dump checksum');
+
+            }
+            catch (e) {
+
+                // Only retry while the server is unavailable
+                if (e.code !== neo4j.error.SERVICE_UNAVAILABLE || Date.now() >= deadline) throw e;
+                logger.info(`Waiting for the graph to finish loading: ${e.message}`);
+
+            }
+            await Bluebird.delay(READY_INTERVAL * 1000);
+
+        }
+
+    }
+
+    /**
+     * Close the shared driver and all pooled connections.
+     */
+    close() {
+
+        if (this._driver) this._driver.close();
+        this._driver = null;
 
     }
 
@@ -3,11 +3,32 @@
 # Exit on failure
 set -e
 
+# Checksum of the dump the image was built with, and of the dump last loaded into the /data volume
+DUMP=/build-files/database.dump
+BUILD_CHECKSUM=/build-files/database.dump.sha256
+LOADED_CHECKSUM=/data/database.dump.sha256
+
 # Create database from backup file
 # Done at runtime because the /data volume from the base neo4j image
 # wont have build time modifications persisted.
-mkdir -p /data/databases/graph.db
-neo4j-admin load --force --from=/build-files/database.dump
+# Skip loading if the volume already holds a database loaded from this exact dump.
+if [[ -s /data/databases/graph.db/neostore && -f "$LOADED_CHECKSUM" ]] && cmp -s "$BUILD_CHECKSUM" "$LOADED_CHECKSUM"
+then
+    echo 'Database already loaded from this dump, skipping load' >&2
+else
+    rm -f "$LOADED_CHECKSUM"
+    mkdir -p /data/databases/graph.db
+    neo4j-admin load --force --from="$DUMP"
+    cp "$BUILD_CHECKSUM" "$LOADED_CHECKSUM"
+fi
+
+# Record the checksum of the loaded dump in the graph once the server answers queries, so clients can tell which dump
+# data they exported from the graph came from. Authentication is disabled, so any credentials are accepted.
+CHECKSUM=$(cut -d ' ' -f 1 "$LOADED_CHECKSUM")
+(
+    until cypher-shell -u neo4j -p neo4j --format plain 'RETURN 1' > /dev/null 2>&1; do sleep 2; done
+    cypher-shell -u neo4j -p neo4j --format plain "MERGE (d :dump) SET d.checksum = '$CHECKSUM'" > /dev/null
+) &
 
 # Start neo4j
 /docker-entrypoint.sh neo4j
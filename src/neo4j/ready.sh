@@ -0,0 +1,5 @@
+#!/usr/bin/env bash
+
+# Readiness probe. Succeeds once neo4j is answering queries over bolt, which only happens after the database is loaded.
+# Authentication is disabled, so any credentials are accepted.
+cypher-shell -u neo4j -p neo4j --format plain 'RETURN 1' > /dev/null
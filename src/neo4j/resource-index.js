@@ -0,0 +1,169 @@
+/**
+ * In-memory index of the resources provided by each package in the graph.
+ *
+ * @module neo4j/resource-index
+ */
+
+
+// Core/NPM modules
+const _             = require('lodash');
+const fs            = require('fs');
+
+
+// Local modules
+const dataDir       = require('../data-dir');
+const logger        = require('../logger');
+const neo4j         = require('./index');
+
+
+// Constants
+const INDEX_FILE    = 'resource-index.json';
+const RESOURCES     = `
+MATCH (resource :resource)<-[:resource]-(:version)<-[:version]-(package :package)
+RETURN toLower(resource.name) AS resource, collect(DISTINCT package) AS packages
+`;
+const PACKAGES      = `
+MATCH (package :package)-[:version]->(:version)
+RETURN DISTINCT package
+`;
+
+
+// Index loaded by this process
+let loading         = null;
+
+
+/**
+ * Index of lowercased resource names to the packages providing them, exported from the graph. Answers the same
+ * question as `RESOURCE_LOOKUP` without scanning every resource node: a resource name matches a package if any
+ * resource of the package is a case insensitive prefix of the name, or if the package name equals the name exactly.
+ * Only packages with at least one version are indexed.
+ *
+ * @property {Number}                      created   Unix timestamp the index was exported at.
+ * @property {String|null}                 checksum  Checksum of the graph dump the index was exported from.
+ * @property {Array.<Object>}              packages  Package properties.
+ * @property {Map.<String, Array.<Number>>} resources Lowercased resource name to indexes of the packages providing it.
+ * @property {Map.<String, Number>}         names     `system,name` to the index of the package with that exact name.
+ */
+class ResourceIndex {
+
+    /**
+     * Default index file path inside of the data directory.
+     *
+     * @returns {String} Index file path.
+     */
+    static get defaultPath() { return dataDir.resolve(INDEX_FILE); }
+
+    /**
+     * Load the index. The index is read from the data directory, or exported from the graph and saved there if it has
+     * not been exported before or was exported from a different graph dump. Indexes are only reused without a
+     * checksum if the graph has none to compare against. The index is loaded once per process and shared.
+     *
+     * @returns {Promise<ResourceIndex>} Loaded index.
+     */
+    static load() {
+
+        if (!loading) {
+            loading = (async () => {
+
+                // Read the saved index if it was exported from the loaded graph
+                let path = ResourceIndex.defaultPath;
+                let checksum = await neo4j.dumpChecksum();
+                let contents = fs.existsSync(path) ? JSON.parse(fs.readFileSync(path, 'utf8')) : null;
+                if (contents && checksum && contents.checksum !== checksum) {
+                    logger.info('The graph was reloaded since the resource index was exported');
+                    contents = null;
+                }
+
+                // Otherwise export it
+                if (!contents) contents = await ResourceIndex.export(path);
+
+                let index = new ResourceIndex(contents);
+                logger.info(`Loaded resource index with ${index.resources.size} resources from ${path}`);
+                return index;
+            })();
+            loading.catch(() => { loading = null; });
+        }
+        return loading;
+
+    }
+
+    /**
+     * Export the index from the graph and save it.
+     *
+     * @param   {String}          [path] Output file path. Defaults to the index in the data directory.
+     * @returns {Promise<Object>}        Exported index file contents.
+     */
+    static async export(path = ResourceIndex.defaultPath) {
+
+        logger.info('Exporting resource index from the graph');
+
+        // Number each package
+        let checksum = await neo4j.dumpChecksum();
+        let packages = _.map((await neo4j.run(PACKAGES)).records, r => r.get('package').properties);
+        let numbers = new Map(_.map(packages, (p, i) => [`${p.system},${p.name}`, i]));
+
+        // Map each resource to its package numbers
+        let resources = _.fromPairs(_.map((await neo4j.run(RESOURCES)).records, r => [
+            r.get('resource'),
+            _.map(r.get('packages'), p => numbers.get(`${p.properties.system},${p.properties.name}`))
+        ]));
+
+        // Write, then move into place
+        let contents = { created: _.toInteger(Date.now() / 1000), checksum, packages, resources };
+        fs.writeFileSync(`${path}.tmp`, JSON.stringify(contents));
+        fs.renameSync(`${path}.tmp`, path);
+        loading = null;
+        return contents;
+
+    }
+
+    /**
+     * Construct an index from exported contents.
+     *
+     * @param {Object}         contents            Exported index.
+     * @param {Number}         contents.created    Unix timestamp the index was exported at.
+     * @param {String}         [contents.checksum] Checksum of the graph dump the index was exported from.
+     * @param {Array.<Object>} contents.packages   Package properties.
+     * @param {Object}         contents.resources  Lowercased resource name to indexes of the packages providing it.
+     */
+    constructor({ created, checksum, packages, resources }) {
+
+        this.created = created;
+        this.checksum = checksum || null;
+        this.packages = packages;
+        this.resources = new Map(_.toPairs(resources));
+        this.names = new Map(_.map(packages, (p, i) => [`${p.system},${p.name}`, i]));
+
+    }
+
+    /**
+     * Find the packages in a system that provide a resource.
+     *
+     * @param   {String}         name   Resource name.
+     * @param   {String}         system Package system name.
+     * @returns {Array.<Object>}        Properties of the matching packages.
+     */
+    lookup(name, system) {
+
+        let found = new Set();
+
+        // Packages with a resource that is a prefix of the name, including the empty and full prefixes
+        let lower = name.toLowerCase();
+        for (let i = 0; i <= lower.length; i++) {
+            for (let n of this.resources.get(lower.substr(0, i)) || []) {
+                if (this.packages[n].system === system) found.add(n);
+            }
+        }
+
+        // Package with an exact name match
+        if (this.names.has(`${system},${name}`)) found.add(this.names.get(`${system},${name}`));
+
+        return _.map(Array.from(found), n => this.packages[n]);
+
+    }
+
+}
+
+
+// Export
+module.exports = ResourceIndex;
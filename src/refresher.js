@@ -0,0 +1,132 @@
+/**
+ * Background revalidation of stale cache entries.
+ *
+ * @module refresher
+ */
+
+
+// Core/NPM modules
+const _         = require('lodash');
+
+
+// Local modules
+const logger    = require('./logger');
+
+
+// All refreshers created by this process, by name
+const refreshers = new Map();
+
+
+/**
+ * Runs cache revalidations in the background with bounded concurrency, so callers can return stale entries immediately
+ * (stale-while-revalidate). Each key is refreshed at most once at a time. Freshness metrics are recorded for every
+ * lookup made through the refresher.
+ *
+ * @property {String} name        Refresher name, usually the cache it refreshes.
+ * @property {Number} concurrency Maximum number of refreshes running at once.
+ * @property {Object} metrics     Freshness metrics.
+ */
+class Refresher {
+
+    /**
+     * Get metrics for every refresher in the process.
+     *
+     * @returns {Object} Metrics by refresher name.
+     */
+    static metrics() {
+
+        return _.fromPairs(_.map(Array.from(refreshers.values()), r => [r.name, r.metrics]));
+
+    }
+
+    /**
+     * Construct a new refresher.
+     *
+     * @param {String} name          Refresher name, usually the cache it refreshes.
+     * @param {Number} [concurrency] Maximum number of refreshes running at once.
+     */
+    constructor(name, concurrency = 4) {
+
+        this.name = name;
+        this.concurrency = concurrency;
+        this.queue = [];
+        this.keys = new Set();
+        this.running = 0;
+        this.metrics = {
+            fresh: 0,
+            stale: 0,
+            miss: 0,
+            maxStaleAge: 0,
+            refreshed: 0,
+            failed: 0,
+            pending: 0
+        };
+        refreshers.set(name, this);
+
+    }
+
+    /**
+     * Record the freshness of a lookup.
+     *
+     * @param {'fresh'|'stale'|'miss'} freshness Whether the entry was fresh, stale, or missing.
+     * @param {Number}                 [age]     Age of a stale entry in seconds.
+     */
+    record(freshness, age) {
+
+        this.metrics[freshness]++;
+        if (freshness === 'stale') this.metrics.maxStaleAge = _.max([this.metrics.maxStaleAge, age]);
+
+    }
+
+    /**
+     * Schedule a key to be refreshed in the background. Does nothing if the key is already queued or refreshing.
+     *
+     * @param {String}             key     Cache key.
+     * @param {Function.<Promise>} refresh Function performing the refresh.
+     */
+    schedule(key, refresh) {
+
+        if (this.keys.has(key)) return;
+        this.keys.add(key);
+        this.queue.push([key, refresh]);
+        this.metrics.pending = this.keys.size;
+        this.drain();
+
+    }
+
+    /**
+     * Start queued refreshes while under the concurrency limit.
+     */
+    drain() {
+
+        while (this.running < this.concurrency && this.queue.length) {
+
+            let [key, refresh] = this.queue.shift();
+            this.running++;
+            logger.info(`Refreshing ${this.name} cache entry in the background: '${key}'`);
+
+            Promise.resolve()
+                .then(refresh)
+                .then(
+                    () => { this.metrics.refreshed++; },
+                    (e) => {
+                        this.metrics.failed++;
+                        logger.warn(`Background refresh of ${this.name} cache entry '${key}' failed: ${e.message}`);
+                    }
+                )
+                .then(() => {
+                    this.running--;
+                    this.keys.delete(key);
+                    this.metrics.pending = this.keys.size;
+                    this.drain();
+                });
+
+        }
+
+    }
+
+}
+
+
+// Export
+module.exports = Refresher;
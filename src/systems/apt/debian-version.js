@@ -0,0 +1,112 @@
+/**
+ * Debian package version comparison, following the algorithm used by dpkg.
+ *
+ * @module systems/apt/debian-version
+ */
+
+
+// Core/NPM modules
+const _ = require('lodash');
+
+
+/**
+ * Split a Debian version into its epoch, upstream version, and revision.
+ *
+ * @param   {String} version Version string, formatted `[epoch:]upstream[-revision]`.
+ * @returns {Object}         Parsed version with `epoch`, `upstream`, and `revision` properties.
+ */
+function parse(version) {
+
+    // Epoch is everything before the first colon
+    let colon = version.indexOf(':');
+    let epoch = colon === -1 ? 0 : _.toInteger(version.substr(0, colon));
+    let rest = version.substr(colon + 1);
+
+    // Revision is everything after the last hyphen
+    let hyphen = rest.lastIndexOf('-');
+    return hyphen === -1
+        ? { epoch, upstream: rest, revision: '' }
+        : { epoch, upstream: rest.substr(0, hyphen), revision: rest.substr(hyphen + 1) };
+
+}
+
+
+/**
+ * Sort weight of a character in the non-digit part of a version. Tildes sort before everything, including the end of
+ * the string. Letters sort before other characters.
+ *
+ * @param   {String} c Single character, or an empty string for the end of the version.
+ * @returns {Number}   Weight.
+ */
+function order(c) {
+
+    if (!c || /\d/.test(c)) return 0;
+    if (/[A-Za-z]/.test(c)) return c.charCodeAt(0);
+    if (c === '~') return -1;
+    return c.charCodeAt(0) + 256;
+
+}
+
+
+/**
+ * Compare upstream versions or revisions by alternating non-digit and digit runs.
+ *
+ * @param   {String} a First version part.
+ * @param   {String} b Second version part.
+ * @returns {Number}   Negative if a < b, positive if a > b, otherwise 0.
+ */
+function compareParts(a, b) {
+
+    let isDigit = c => c >= '0' && c <= '9';
+    let i = 0;
+    let j = 0;
+
+    while (i < a.length || j < b.length) {
+
+        // Compare the non-digit runs character by character
+        while ((i < a.length && !isDigit(a[i])) || (j < b.length && !isDigit(b[j]))) {
+            let diff = order(a[i]) - order(b[j]);
+            if (diff) return diff;
+            i++;
+            j++;
+        }
+
+        // Compare the digit runs numerically, ignoring leading zeros
+        while (a[i] === '0') i++;
+        while (b[j] === '0') j++;
+        let diff = 0;
+        while (isDigit(a[i]) && isDigit(b[j])) {
+            if (!diff) diff = a.charCodeAt(i) - b.charCodeAt(j);
+            i++;
+            j++;
+        }
+        if (isDigit(a[i])) return 1;
+        if (isDigit(b[j])) return -1;
+        if (diff) return diff;
+
+    }
+
+    return 0;
+
+}
+
+
+/**
+ * Compare two Debian package versions.
+ *
+ * @param   {String} a First version.
+ * @param   {String} b Second version.
+ * @returns {Number}   -1 if a < b, 1 if a > b, otherwise 0.
+ */
+function compare(a, b) {
+
+    let x = parse(a);
+    let y = parse(b);
+    let diff = (x.epoch - y.epoch) || compareParts(x.upstream, y.upstream) || compareParts(x.revision, y.revision);
+    return Math.sign(diff);
+
+}
+
+
+// Export
+module.exports = { parse, compare };
@@ -0,0 +1,157 @@
+/**
+ * Local index of the apt packages and versions available in the V2 base distribution.
+ *
+ * @module systems/apt/package-index
+ */
+
+
+// Core/NPM modules
+const _             = require('lodash');
+const fs            = require('fs');
+
+
+// Local modules
+const dataDir       = require('../../data-dir');
+const debianVersion = require('./debian-version');
+const dockerTools   = require('../../docker-tools');
+const logger        = require('../../logger');
+
+
+// Constants
+const APT_VERSIONS  = 'localhost:5000/v2/apt-versions:latest';
+const INDEX_FILE    = 'apt-index.json';
+
+
+// Indexes loaded by this process, by path
+const loaded        = new Map();
+
+
+/**
+ * An index of package name to available versions, built once from the distribution's Packages indexes by `v2
+ * ingest-apt`. Versions are stored in descending Debian version order, so lookups and sorts are in-process reads.
+ *
+ * @property {String} path     Index file path.
+ * @property {Number} created  Unix timestamp the index was built at.
+ * @property {Object} packages Map of package name to versions, sorted descending.
+ */
+class PackageIndex {
+
+    /**
+     * Default index file path inside of the data directory.
+     *
+     * @returns {String} Index file path.
+     */
+    static get defaultPath() { return dataDir.resolve(INDEX_FILE); }
+
+    /**
+     * Load an index. Indexes are loaded once per process and shared.
+     *
+     * @param   {String}            [path] Index file path. Defaults to the index in the data directory.
+     * @returns {PackageIndex|null}        Loaded index, or null if no index has been ingested.
+     */
+    static load(path = PackageIndex.defaultPath) {
+
+        if (!loaded.has(path)) {
+            let index = null;
+            if (fs.existsSync(path)) {
+                index = new PackageIndex(path, JSON.parse(fs.readFileSync(path, 'utf8')));
+                logger.info(`Loaded apt index with ${_.size(index.packages)} packages from ${path}`);
+            }
+            loaded.set(path, index);
+        }
+        return loaded.get(path);
+
+    }
+
+    /**
+     * Ingest the Packages indexes of the `apt-versions` image into an index file.
+     *
+     * @param   {String}          [path] Output file path. Defaults to the index in the data directory.
+     * @returns {Promise<Number>}        Number of packages indexed.
+     * @throws  {Error}                  If no packages were found.
+     */
+    static async ingest(path = PackageIndex.defaultPath) {
+
+        // Dump all (package, version) pairs. An empty dump means the Packages indexes could not be read.
+        let pairs = await dockerTools.runDockerContainer(APT_VERSIONS, '', ['--entrypoint', '/scripts/dump-index.sh']);
+        if (_.isEmpty(pairs)) throw new Error('No packages found in the apt-versions image Packages indexes');
+
+        // Group versions by package, dropping duplicates listed by more than one Packages index, and sort descending.
+        let packages = _(pairs)
+            .groupBy(0)
+            .mapValues(group => _.uniq(_.map(group, 1)).sort((a, b) => debianVersion.compare(b, a)))
+            .value();
+
+        // Write, then move into place
+        fs.writeFileSync(`${path}.tmp`, JSON.stringify({ created: _.toInteger(Date.now() / 1000), packages }));
+        fs.renameSync(`${path}.tmp`, path);
+        loaded.delete(path);
+        return _.size(packages);
+
+    }
+
+    /**
+     * Construct an index from parsed file contents.
+     *
+     * @param {String} path              Index file path.
+     * @param {Object} contents          Parsed index file.
+     * @param {Number} contents.created  Unix timestamp the index was built at.
+     * @param {Object} contents.packages Map of package name to versions, sorted descending.
+     */
+    constructor(path, { created, packages }) {
+
+        this.path = path;
+        this.created = created;
+        this.packages = packages;
+        this.ranks = new Map();
+
+    }
+
+    /**
+     * Check whether a package is in the index.
+     *
+     * @param   {String}  pkg Normalized package name.
+     * @returns {Boolean}     True if the package has indexed versions.
+     */
+    has(pkg) {
+
+        return !_.isEmpty(_.get(this.packages, pkg));
+
+    }
+
+    /**
+     * Get the available versions of a package.
+     *
+     * @param   {String}         pkg Normalized package name.
+     * @returns {Array.<String>}     Versions sorted descending. Empty if the package is not available.
+     */
+    versions(pkg) {
+
+        return _.get(this.packages, pkg, []);
+
+    }
+
+    /**
+     * Compare two versions of a package using the precomputed ordering, falling back to a Debian version comparison for
+     * versions not in the index.
+     *
+     * @param   {String} pkg Normalized package name.
+     * @param   {String} a   First version.
+     * @param   {String} b   Second version.
+     * @returns {Number}     Negative if a < b, positive if a > b, otherwise 0.
+     */
+    compare(pkg, a, b) {
+
+        // Build version ranks for the package on first use. Lower ranks are newer.
+        if (!this.ranks.has(pkg)) this.ranks.set(pkg, new Map(_.map(this.versions(pkg), (v, i) => [v, i])));
+        let ranks = this.ranks.get(pkg);
+
+        return ranks.has(a) && ranks.has(b) ? ranks.get(b) - ranks.get(a) : debianVersion.compare(a, b);
+
+    }
+
+}
+
+
+// Export
+module.exports = PackageIndex;
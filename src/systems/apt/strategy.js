@@ -5,16 +5,21 @@
 
 // Core/NPM modules
 const _              = require('lodash');
-const Bluebird       = require('bluebird');
-const semver         = require('semver');
 
 
 // Local modules
 const cache          = require('../../cache');
+const debianVersion  = require('./debian-version');
 const dockerTools    = require('../../docker-tools');
 const logger         = require('../../logger');
+const PackageIndex   = require('./package-index');
+const Refresher      = require('../../refresher');
 const SystemStrategy = require('../system-strategy');
-const versionUtils   = require('../../version-utils');
+
+
+// Constants
+const APT_VERSIONS        = 'localhost:5000/v2/apt-versions:latest';
+const REFRESH_CONCURRENCY = 1;
 
 
 /**
@@ -23,64 +28,110 @@ const versionUtils   = require('../../version-utils');
 class APTStrategy extends SystemStrategy {
 
     /**
-     * Get all versions of a package that are available to be installed.
+     * Construct an apt strategy.
+     */
+    constructor() {
+
+        super();
+
+        // Background revalidation of stale version lists. Each refresh starts a container, so keep concurrency low.
+        this.refresher = new Refresher('apt', REFRESH_CONCURRENCY);
+
+    }
+
+    /**
+     * List the versions of a package by running the `apt-versions` container.
+     *
+     * @param   {String}                  pkg Normalized package name.
+     * @returns {Promise<Array.<String>>}     List of available version specifiers.
+     */
+    async listPackageVersions(pkg) {
+
+        return dockerTools.runDockerContainer(APT_VERSIONS, pkg);
+
+    }
+
+    /**
+     * Cache a list of package versions.
+     *
+     * @param   {String}         pkg        Normalized package name.
+     * @param   {Array.<String>} definition List of available version specifiers.
+     * @param   {Number}         updated    Unix timestamp the versions were listed at.
+     * @returns {Promise<void>}
+     */
+    async cachePackageVersions(pkg, definition, updated) {
+
+        try {
+            await cache.setJSON('apt', pkg, { definition, updated });
+        }
+        catch (e) {
+            logger.error(e);
+        }
+
+    }
+
+    /**
+     * Get all versions of a package that are available to be installed. If an apt index has been ingested with `v2
+     * ingest-apt` and contains the package, versions are read from the index. Otherwise, versions are listed by the
+     * `apt-versions` container and cached. Stale cached versions are returned immediately and relisted in the
+     * background.
      *
      * @param   {String}                  pkg Package name.
      * @returns {Promise<Array.<String>>}     List of available version specifiers.
      */
     async getAvailablePackageVersions(pkg) {
 
-        // Get redis client with Bluebird.using to properly close connection after finish.
-        return Bluebird.using(cache.getClientFor('apt'), async (redis) => {
+        // Normalize package name for cache storage
+        pkg = this.normalizePackageName(pkg);
+        logger.info(`Getting definition for apt package: '${pkg}'`);
 
-            // Normalize package name for cache storage
-            pkg = this.normalizePackageName(pkg);
-            logger.info(`Getting definition for apt package: '${pkg}'`);
+        // Read from the local index if one has been ingested and lists the package
+        let index = PackageIndex.load();
+        if (index && index.has(pkg)) return index.versions(pkg);
 
-            // Known package definition and when cache was updated
-            let definition;
-            let updated;
+        // Known package definition and when cache was updated
+        let definition;
+        let updated;
 
-            // Check for package info in the cache
-            if (await redis.existsAsync(pkg)) {
+        // Check for package info in the cache
+        let record = await cache.getJSON('apt', pkg);
+        if (record) {
+            definition = record.definition;
+            updated = record.updated;
+            logger.info(`Cache hit for '${pkg}'`);
+        }
 
-                // Get definition
-                let cache = JSON.parse(await redis.send_commandAsync('JSON.GET', [pkg]));
-                if (cache) {
-                    definition = cache.definition;
-                    updated = cache.updated;
-                    logger.info(`Cache hit for '${pkg}'`);
-                }
+        // Determine if the cache is stale (cache was last validated more than 1 week (604800 seconds) ago).
+        let now = _.toInteger(Date.now() / 1000);  // Date.now() returns milliseconds.
+        let stale = definition && (now - updated) > 604800;
 
-            }
+        // If stale, return the cached versions and relist them in the background.
+        if (stale) {
 
-            // Determine if the cache is stale (cache was last validated more than 1 week (604800 seconds) ago).
-            let now = _.toInteger(Date.now() / 1000);  // Date.now() returns milliseconds.
-            let stale = definition && (now - updated) > 604800;
-            if (stale) { logger.info(`Cache is stale, updating`); }
+            logger.info(`Cache is stale, updating in the background`);
+            this.refresher.record('stale', now - updated);
+            this.refresher.schedule(pkg, async () => {
+                let definition = await this.listPackageVersions(pkg);
+                await this.cachePackageVersions(pkg, definition, _.toInteger(Date.now() / 1000));
+            });
 
-            // Find versions
-            if (definition === undefined || stale) {
+        }
+        // Find versions on a miss
+        else if (definition === undefined) {
 
-                definition = await dockerTools.runDockerContainer('localhost:5000/v2/apt-versions:latest', pkg);
+            this.refresher.record('miss');
+            definition = await this.listPackageVersions(pkg);
+            await this.cachePackageVersions(pkg, definition, now);
 
-                // Cache definition
-                try {
-                    await redis.send_commandAsync('JSON.SET', [pkg, '.', JSON.stringify({
-                        definition,
-                        updated: now
-                    })]);
-                }
-                catch (e) {
-                    logger.error(e);
-                }
+        }
+        else {
 
-            }
+            this.refresher.record('fresh');
 
-            // Return package definition
-            return definition;
+        }
 
-        });
+        // Return package definition
+        return definition;
 
     }
 
@@ -92,25 +143,26 @@ class APTStrategy extends SystemStrategy {
      * @param   {String}                  [cutoff]          Only include versions less than cutoff or equal to cutoff
      *                                                      if sorting descending, or greater than or equal to cutoff
      *                                                      if sorting ascending. Include all versions if not specified.
+     * @param   {String}                  [pkg]             Name of the package the versions belong to. Implementations
+     *                                                      may use it to memoize work across calls.
      * @returns {Promise<Array.<String>>}                   Sorted versions.
      */
-    async sortPackageVersions(versions, ascending=false, cutoff) {
+    async sortPackageVersions(versions, ascending=false, cutoff, pkg) {
 
-        // Coerce to semver
-        versions = versions.map(versionUtils.coerceSemver);
-        cutoff = versionUtils.coerceSemver(cutoff);
+        // Compare using the precomputed ordering of the local index if available, otherwise compare Debian versions.
+        let index = PackageIndex.load();
+        let compare = index && pkg ? _.partial(index.compare.bind(index), this.normalizePackageName(pkg)) : debianVersion.compare;
 
         // Sort
-        let comp = ascending ? (a, b) => a.compare(b) : (a, b) => -a.compare(b);
-        versions = versions.sort(comp);
+        versions = _.clone(versions).sort(ascending ? compare : (a, b) => compare(b, a));
 
         // Filter if cutoff is specified
         if (cutoff) {
-            versions = versions.filter(_.partial(ascending ? semver.gte : semver.lte, _, cutoff));
+            versions = versions.filter(ascending ? v => compare(v, cutoff) >= 0 : v => compare(v, cutoff) <= 0);
         }
 
         // Return
-        return versions.map(v => v.version);
+        return versions;
 
     }
 
@@ -0,0 +1,17 @@
+#!/bin/bash
+
+
+# Fail if apt can not read its indexes, rather than printing an empty list
+set -eo pipefail
+
+
+# Print every (package, version) pair in the distribution's Packages indexes as a JSON array of pairs. The indexes are
+# read through apt, since Debian images store them compressed. Each stanza has a `Package:` field before its
+# `Version:` field. Package names and Debian versions never contain quotes or backslashes, so they can be printed as
+# JSON strings as-is.
+echo -n '['
+apt-cache dumpavail | awk '
+    /^Package: / { name = $2 }
+    /^Version: / { printf "%s[\"%s\",\"%s\"]", sep, name, $2; sep = "," }
+'
+echo ']'
@@ -0,0 +1,329 @@
+/**
+ * Batched, deduplicated access to PyPI package metadata.
+ *
+ * @module systems/pip/metadata
+ */
+
+
+// Core/NPM Modules
+const _                   = require('lodash');
+const Bluebird            = require('bluebird');
+const http                = require('http');
+const https               = require('https');
+const request             = require('request');
+const status              = require('statuses');
+const URL                 = require('url').URL;
+
+
+// Local modules
+const cache               = require('../../cache');
+const logger              = require('../../logger');
+const Refresher           = require('../../refresher');
+
+
+// Constants
+const PYPI_BASE           = process.env.V2_PYPI_URL || 'https://pypi.org/pypi/';
+const MAX_SOCKETS         = 16;
+const MAX_AGE             = 3600;  // Seconds a cached definition is considered fresh.
+const REFRESH_CONCURRENCY = 4;
+const FORMAT              = 3;     // Version of the stored definition format. Cached entries in any other format are refetched.
+const FILE_FIELDS         = ['filename', 'packagetype', 'python_version', 'requires_python', 'yanked', 'upload_time'];
+const RELEASE_FIELDS      = ['requires_dist', 'requires_python'];
+
+
+/**
+ * Project a full PyPI package definition down to the fields V2 uses: `info.name`, `info.version`, release version
+ * keys, and the filename, packagetype, python_version, requires_python, yanked and upload_time of each release file.
+ *
+ * @param   {Object} definition Full PyPI package definition.
+ * @returns {Object}            Projected package definition.
+ */
+function project(definition) {
+
+    return {
+        info: _.pick(_.get(definition, 'info', {}), ['name', 'version']),
+        releases: _.mapValues(_.get(definition, 'releases', {}), files => _.map(files, f => _.pick(f, FILE_FIELDS)))
+    };
+
+}
+
+
+/**
+ * PyPI metadata layer. Lookups made in the same tick are coalesced into one batch: cached definitions for the whole
+ * batch are read through the shared cache client with pipelined commands, concurrent lookups of the same package share
+ * one in-flight request, and PyPI is called over pooled keep-alive connections. Stale definitions are returned
+ * immediately and revalidated in the background using their stored etag.
+ *
+ * @property {String} base Base URL of the PyPI JSON API. Defaults to `$V2_PYPI_URL` or https://pypi.org/pypi/.
+ */
+class PyPIMetadata {
+
+    /**
+     * Construct a metadata layer.
+     *
+     * @param {Object} [options]                      Options object.
+     * @param {String} [options.base]                 Base URL of the PyPI JSON API, such as a local stand-in server.
+     * @param {Number} [options.maxSockets=16]        Maximum number of concurrent connections to PyPI.
+     * @param {Number} [options.refreshConcurrency=4] Maximum number of concurrent background revalidations.
+     */
+    constructor(options = {}) {
+
+        this.base = options.base || PYPI_BASE;
+        this.maxSockets = options.maxSockets || MAX_SOCKETS;
+
+        // Keep-alive connection pool for the API protocol
+        let Agent = new URL(this.base).protocol === 'http:' ? http.Agent : https.Agent;
+        this.agent = new Agent({ keepAlive: true, maxSockets: this.maxSockets });
+
+        // Lookups waiting for the next batch, and promises for lookups that have not settled.
+        this.queue = new Map();
+        this.inflight = new Map();
+
+        // Background revalidation of stale definitions
+        this.refresher = new Refresher('pip', options.refreshConcurrency || REFRESH_CONCURRENCY);
+
+    }
+
+    /**
+     * Get a projected package definition. Concurrent calls for the same package share a single lookup.
+     *
+     * @param   {String}               pkg Normalized package name.
+     * @returns {Promise<Object|null>}     Projected package definition, or null if the package does not exist.
+     */
+    get(pkg) {
+
+        // Share in-flight lookups
+        if (this.inflight.has(pkg)) return this.inflight.get(pkg);
+
+        // Queue for the next batch, flushing on the next tick if this is the first queued lookup
+        let promise = new Promise((resolve, reject) => {
+            if (!this.queue.size) process.nextTick(() => this.flush());
+            this.queue.set(pkg, { resolve, reject });
+        });
+
+        // Track until settled
+        let settled = () => this.inflight.delete(pkg);
+        promise.then(settled, settled);
+        this.inflight.set(pkg, promise);
+        return promise;
+
+    }
+
+    /**
+     * Get projected definitions for a list of packages in one batch.
+     *
+     * @param   {Array.<String>}               pkgs Normalized package names.
+     * @returns {Promise<Array.<Object|null>>}      Projected package definitions, in the same order.
+     */
+    getAll(pkgs) {
+
+        return Promise.all(_.map(pkgs, pkg => this.get(pkg)));
+
+    }
+
+    /**
+     * Resolve all queued lookups. Cached records are read through the in-process cache, then with pipelined commands
+     * over the shared redis connection. Missing records are requested from PyPI concurrently.
+     *
+     * @returns {Promise<void>}
+     */
+    async flush() {
+
+        // Take the current queue
+        let batch = this.queue;
+        this.queue = new Map();
+        let pkgs = Array.from(batch.keys());
+        logger.info(`Getting definitions for ${pkgs.length} pip package(s):`, pkgs);
+
+        try {
+
+            // Read all cached records. Redis commands for lookups missing the in-process cache are pipelined.
+            let records = _.map(await cache.getManyJSON('pip', pkgs), r => r && r.format === FORMAT ? r : null);
+
+            // Resolve fresh records immediately, and request missing or stale records from PyPI.
+            let now = _.toInteger(Date.now() / 1000);  // Date.now() returns milliseconds.
+            let updates = [];
+            await Bluebird.map(_.zip(pkgs, records), async ([pkg, record]) => {
+
+                let { resolve, reject } = batch.get(pkg);
+
+                // Cache hit. Definitions for packages that do not exist are never considered stale.
+                if (record && (!record.definition || (now - record.updated) <= MAX_AGE)) {
+                    logger.info(`Cache hit for '${pkg}'`);
+                    this.refresher.record('fresh');
+                    return resolve(record.definition);
+                }
+
+                // Stale hit. Return the stale definition and revalidate in the background.
+                if (record) {
+                    logger.info(`Cache is stale for '${pkg}', revalidating in the background`);
+                    this.refresher.record('stale', now - record.updated);
+                    this.refresher.schedule(pkg, () => this.refresh(pkg, record));
+                    return resolve(record.definition);
+                }
+
+                // Fetch on miss
+                this.refresher.record('miss');
+                try {
+                    let update = await this.revalidate(pkg, record, now);
+                    updates.push([pkg, update]);
+                    resolve(update.definition);
+                }
+                catch (e) {
+                    reject(e);
+                }
+
+            }, { concurrency: this.maxSockets });
+
+            // Write all updated records
+            await Bluebird.map(updates, async ([pkg, update]) => {
+                try {
+                    await cache.setJSON('pip', pkg, update);
+                }
+                catch (e) {
+                    logger.error(e);
+                }
+            });
+
+        }
+        catch (e) {
+
+            // Fail any lookups that were not resolved (ex. redis is unavailable).
+            for (let { reject } of batch.values()) reject(e);
+
+        }
+
+    }
+
+    /**
+     * Revalidate a stale cached record and store the result. Used for background refreshes.
+     *
+     * @param   {String}        pkg    Normalized package name.
+     * @param   {Object}        record Stale cached record.
+     * @returns {Promise<void>}
+     */
+    async refresh(pkg, record) {
+
+        let update = await this.revalidate(pkg, record, _.toInteger(Date.now() / 1000));
+        await cache.setJSON('pip', pkg, update);
+
+    }
+
+    /**
+     * Request a package definition from PyPI using `If-None-Match` with the etag of a cached record, if any.
+     *
+     * @param   {String}          pkg      Normalized package name.
+     * @param   {Object|null}     [record] Cached record.
+     * @param   {Number}          now      Current unix timestamp.
+     * @returns {Promise<Object>}          Updated record.
+     */
+    async revalidate(pkg, record, now) {
+
+        // Ask for package from PyPI using If-None-Match
+        let etag = _.get(record, 'etag');
+        let response = await this.request(pkg, etag ? { 'If-None-Match': etag } : {});
+
+        // If not found, cache null
+        if (response.statusCode === status('Not Found')) {
+            return { definition: null, etag: null, updated: now, format: FORMAT };
+        }
+
+        // Error if the status code is otherwise unexpected.
+        if (response.statusCode !== status('OK') && response.statusCode !== status('Not Modified')) {
+            throw new Error(JSON.stringify(_.get(response, 'body')));
+        }
+
+        // If response modified, project the new definition
+        if (response.statusCode === status('OK')) {
+            etag = _.get(response, 'headers.etag');
+            logger.info(`Found new etag '${etag}' for '${pkg}'`);
+            return { definition: project(response.body), etag, updated: now, format: FORMAT };
+        }
+
+        logger.info(`Not Modified: '${pkg}'`);
+        return _.assign({}, record, { updated: now });
+
+    }
+
+    /**
+     * Get the metadata of a single release: its `requires_dist` and `requires_python`. These are only published per
+     * release, and never change once uploaded, so cached records are never revalidated. Concurrent calls for the same
+     * release share a single request.
+     *
+     * @param   {String}               pkg     Normalized package name.
+     * @param   {String}               version Release version.
+     * @returns {Promise<Object|null>}         Release metadata, or null if the release does not exist.
+     */
+    getRelease(pkg, version) {
+
+        // Share in-flight lookups. Keys can not collide with package names.
+        let key = `${pkg}==${version}`;
+        if (this.inflight.has(key)) return this.inflight.get(key);
+
+        let promise = (async () => {
+
+            // Cache hit
+            let record = await cache.getJSON('pip', key);
+            if (record && record.format === FORMAT) {
+                logger.info(`Cache hit for '${key}'`);
+                return record.release;
+            }
+
+            // Fetch on miss
+            let response = await this.request(pkg, {}, version);
+            if (response.statusCode !== status('OK') && response.statusCode !== status('Not Found')) {
+                throw new Error(JSON.stringify(_.get(response, 'body')));
+            }
+            let release = response.statusCode === status('OK')
+                ? _.pick(_.get(response, 'body.info', {}), RELEASE_FIELDS)
+                : null;
+            await cache.setJSON('pip', key, { release, format: FORMAT });
+            return release;
+
+        })();
+
+        // Track until settled
+        let settled = () => this.inflight.delete(key);
+        promise.then(settled, settled);
+        this.inflight.set(key, promise);
+        return promise;
+
+    }
+
+    /**
+     * Get a full package definition from PyPI, bypassing the cache.
+     *
+     * @param   {String}               pkg Normalized package name.
+     * @returns {Promise<Object|null>}     Full package definition, or null if the package does not exist.
+     */
+    async getFull(pkg) {
+
+        let response = await this.request(pkg);
+        if (response.statusCode === status('Not Found')) return null;
+        if (response.statusCode !== status('OK')) throw new Error(JSON.stringify(_.get(response, 'body')));
+        return response.body;
+
+    }
+
+    /**
+     * Call the PyPI JSON API for a package, or one of its releases, over the keep-alive connection pool.
+     *
+     * @param   {String}                        pkg       Normalized package name.
+     * @param   {Object}                        [headers] Request headers.
+     * @param   {String}                        [version] Release version.
+     * @returns {Promise<http.IncomingMessage>}           API response with a parsed JSON body.
+     */
+    async request(pkg, headers = {}, version) {
+
+        let url = new URL(version ? `${pkg}/${version}/json` : `${pkg}/json`, this.base);
+        logger.info(`Calling PyPI API: GET ${url}`);
+        return Bluebird.fromCallback(cb => request.get({ url, json: true, headers, agent: this.agent }, cb));
+
+    }
+
+}
+
+
+// Export
+module.exports = PyPIMetadata;
+module.exports.project = project;
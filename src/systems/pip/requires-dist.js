@@ -0,0 +1,142 @@
+/**
+ * Parsing of PyPI `requires_dist` metadata.
+ *
+ * @module systems/pip/requires-dist
+ */
+
+
+// Core/NPM modules
+const _            = require('lodash');
+
+
+// Local modules
+const versionUtils = require('../../version-utils');
+
+
+// Constants
+const REQUIREMENT  = /^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*\(?([^;()]*)\)?\s*(?:;(.*))?$/;
+const ATOM         = /^\s*([a-z_]+)\s*(===|==|!=|~=|<=|>=|<|>|not\s+in|in)\s*(["'])(.*)\3\s*$/;
+const VERSION_VARS = ['python_version', 'python_full_version', 'implementation_version'];
+
+
+// Patch releases run by the validation images, by major.minor image tag.
+const FULL_VERSION = {
+    '2.7': '2.7.18',
+    '3.7': '3.7.17'
+};
+
+
+// Environment marker values of the validation images, except for the interpreter version.
+const ENVIRONMENT  = {
+    os_name: 'posix',
+    sys_platform: 'linux',
+    platform_system: 'Linux',
+    platform_machine: 'x86_64',
+    platform_python_implementation: 'CPython',
+    implementation_name: 'cpython'
+};
+
+
+/**
+ * Parses the requirements a release declares in its `requires_dist` metadata, and evaluates their environment markers
+ * for the interpreters V2 validates with. Requirements guarded by markers that cannot be evaluated, including extras,
+ * are treated as not applying, so uncertain requirements never reject an environment.
+ */
+class RequiresDist {
+
+    /**
+     * Parse a requirement, such as `numpy (>=1.7.1)` or `futures>=3.0; python_version < "3"`.
+     *
+     * @param   {String}      line Requirement.
+     * @returns {Object|null}      Requirement as `{ name, specifier, marker }`, or null if it is not a version
+     *                             requirement.
+     */
+    parse(line) {
+
+        // Direct references, such as `pkg @ https://...`, are not version constraints
+        let match = REQUIREMENT.exec(line || '');
+        if (!match || _.includes(match[2], '@')) return null;
+        return {
+            name: match[1],
+            specifier: match[2].replace(/\s+/g, ''),
+            marker: _.trim(match[3]) || null
+        };
+
+    }
+
+    /**
+     * Full version of the interpreter an image runs. Images are tagged by major.minor version but run its latest patch
+     * release, so `requires_python` and full version markers such as `>=3.7.1` must be checked against that release
+     * rather than against the tag, which would read as `3.7.0`.
+     *
+     * @param   {String} interpreter Interpreter version, such as `3.7`.
+     * @returns {String}             Full version, such as `3.7.17`. The interpreter version if its image is unknown.
+     */
+    fullVersion(interpreter) {
+
+        return FULL_VERSION[interpreter] || interpreter;
+
+    }
+
+    /**
+     * Evaluate a single marker comparison.
+     *
+     * @param   {String}       atom        Comparison, such as `python_version < "3"`.
+     * @param   {String}       interpreter Interpreter version, such as `3.7`.
+     * @returns {Boolean|null}             Result, or null if it can not be evaluated.
+     */
+    atom(atom, interpreter) {
+
+        let match = ATOM.exec(atom);
+        if (!match) return null;
+        let [, variable, operator, , value] = match;
+        operator = operator.replace(/\s+/g, ' ');
+
+        // Versions
+        if (_.includes(VERSION_VARS, variable)) {
+            if (_.includes(['in', 'not in'], operator)) return null;
+            let version = variable === 'python_version' ? interpreter : this.fullVersion(interpreter);
+            return versionUtils.satisfiesSpecifier(version, `${operator}${value}`);
+        }
+
+        // Strings
+        if (!_.has(ENVIRONMENT, variable)) return null;
+        let actual = ENVIRONMENT[variable];
+        switch (operator) {
+            case '==': case '===': return actual === value;
+            case '!=': return actual !== value;
+            case 'in': return _.includes(value, actual);
+            case 'not in': return !_.includes(value, actual);
+            default: return null;
+        }
+
+    }
+
+    /**
+     * Evaluate an environment marker. Markers mixing `and` and `or` with parentheses are not evaluated.
+     *
+     * @param   {String|null} marker      Environment marker.
+     * @param   {String}      interpreter Interpreter version, such as `3.7`.
+     * @returns {Boolean}                 Whether the requirement applies. False if the marker can not be evaluated.
+     */
+    applies(marker, interpreter) {
+
+        if (!marker) return true;
+        if (/\bextra\b/.test(marker)) return false;
+        if (/[()]/.test(marker) && /\band\b/.test(marker) && /\bor\b/.test(marker)) return false;
+
+        // Or of ands, treating unknown comparisons as unknown
+        let clauses = _.map(_.split(marker.replace(/[()]/g, ' '), /\s+or\s+/), (clause) => {
+            let atoms = _.map(_.split(clause, /\s+and\s+/), atom => this.atom(atom, interpreter));
+            if (_.includes(atoms, false)) return false;
+            return _.includes(atoms, null) ? null : true;
+        });
+        return _.includes(clauses, true);
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new RequiresDist();
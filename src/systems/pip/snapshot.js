@@ -0,0 +1,167 @@
+/**
+ * Offline snapshots of PyPI package metadata.
+ *
+ * @module systems/pip/snapshot
+ */
+
+
+// Core/NPM Modules
+const _       = require('lodash');
+const fs      = require('fs');
+
+
+// Constants
+const MAGIC   = 'V2SNAP1\n';
+const TRAILER = 33;  // Two 16 digit offsets and a newline.
+
+
+// Snapshots opened by this process, by path
+const opened  = new Map();
+
+
+/**
+ * A read-only, indexed file of projected PyPI package definitions. Definitions are stored back to back after a magic
+ * header, followed by a JSON index of `name -> [offset, length]` and a fixed width trailer locating the index. Opening a
+ * snapshot only reads the index. Definitions are read from disk on demand.
+ *
+ * @property {String} path    Snapshot file path.
+ * @property {Number} created Unix timestamp the snapshot was built at.
+ * @property {Number} count   Number of packages in the snapshot.
+ */
+class Snapshot {
+
+    /**
+     * Open a snapshot. Snapshots are opened once per process and shared.
+     *
+     * @param   {String}   path Snapshot file path.
+     * @returns {Snapshot}      Opened snapshot.
+     */
+    static open(path) {
+
+        if (!opened.has(path)) opened.set(path, new Snapshot(path));
+        return opened.get(path);
+
+    }
+
+    /**
+     * Build a snapshot file.
+     *
+     * @param   {String}                              path    Output file path.
+     * @param   {AsyncIterable.<[String, Object|null]>} entries Pairs of normalized package names and projected package
+     *                                                        definitions. A null definition records a missing package.
+     * @returns {Promise<Number>}                             Number of packages written.
+     */
+    static async build(path, entries) {
+
+        let fd = fs.openSync(`${path}.tmp`, 'w');
+        try {
+
+            // Write header and definitions, recording where each one lands
+            let offset = fs.writeSync(fd, MAGIC);
+            let index = {};
+            for await (let [name, definition] of entries) {
+                let length = fs.writeSync(fd, JSON.stringify(definition));
+                index[name] = [offset, length];
+                offset += length;
+            }
+
+            // Write index and trailer
+            let length = fs.writeSync(fd, JSON.stringify({ created: _.toInteger(Date.now() / 1000), index }));
+            fs.writeSync(fd, `${_.padStart(offset, 16, '0')}${_.padStart(length, 16, '0')}\n`);
+
+            // Move into place
+            fs.closeSync(fd);
+            fd = null;
+            fs.renameSync(`${path}.tmp`, path);
+            opened.delete(path);
+            return _.size(index);
+
+        }
+        finally {
+
+            if (fd !== null) fs.closeSync(fd);
+
+        }
+
+    }
+
+    /**
+     * Open a snapshot file and read its index.
+     *
+     * @param {String} path Snapshot file path.
+     */
+    constructor(path) {
+
+        this.path = path;
+        this.fd = fs.openSync(path, 'r');
+
+        // Verify header
+        if (this.read(0, MAGIC.length) !== MAGIC) throw new Error(`Not a V2 PyPI snapshot: ${path}`);
+
+        // Read trailer, then index
+        let size = fs.fstatSync(this.fd).size;
+        let trailer = this.read(size - TRAILER, TRAILER);
+        let { created, index } = JSON.parse(this.read(_.toInteger(trailer.substr(0, 16)), _.toInteger(trailer.substr(16, 16))));
+        this.created = created;
+        this.index = new Map(_.toPairs(index));
+
+    }
+
+    /**
+     * Read a string from the snapshot file.
+     *
+     * @param   {Number} position Byte offset.
+     * @param   {Number} length   Number of bytes.
+     * @returns {String}          File contents.
+     */
+    read(position, length) {
+
+        let buffer = Buffer.alloc(length);
+        fs.readSync(this.fd, buffer, 0, length, position);
+        return buffer.toString('utf8');
+
+    }
+
+    /**
+     * Number of packages in the snapshot.
+     *
+     * @returns {Number} Package count.
+     */
+    get count() { return this.index.size; }
+
+    /**
+     * Age of the snapshot.
+     *
+     * @returns {Number} Seconds since the snapshot was built.
+     */
+    get age() { return _.toInteger(Date.now() / 1000) - this.created; }
+
+    /**
+     * Get a projected package definition.
+     *
+     * @param   {String}      name Normalized package name.
+     * @returns {Object|null}      Projected package definition, or null if the package is not in the snapshot.
+     */
+    get(name) {
+
+        let entry = this.index.get(name);
+        return entry ? JSON.parse(this.read(...entry)) : null;
+
+    }
+
+    /**
+     * Describe the snapshot for inference metadata.
+     *
+     * @returns {Object} Snapshot path, creation time, age in seconds, and package count.
+     */
+    toJSON() {
+
+        return { path: this.path, created: this.created, age: this.age, count: this.count };
+
+    }
+
+}
+
+
+// Export
+module.exports = Snapshot;
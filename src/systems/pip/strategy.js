@@ -5,21 +5,24 @@
 
 // Core/NPM Modules
 const _              = require('lodash');
-const Bluebird       = require('bluebird');
-const request        = require('request');
-const status         = require('statuses');
-const URL            = require('url').URL;
 
 
 // Local modules
-const cache          = require('../../cache');
-const dockerTools    = require('../../docker-tools');
+const DockerService  = require('../../docker-tools/service');
 const logger         = require('../../logger');
+const metadata       = require('../../metadata');
+const PyPIMetadata   = require('./metadata');
+const requiresDist   = require('./requires-dist');
+const Snapshot       = require('./snapshot');
 const SystemStrategy = require('../system-strategy');
+const wheelhouse     = require('./wheelhouse');
+const versionUtils   = require('../../version-utils');
+const wheelTags      = require('./wheel-tags');
 
 
 // Constants
-const PYPI_BASE = 'https://pypi.org/pypi/';
+const PIP_VERSIONS   = 'localhost:5000/v2/pip-versions:latest';
+const PRERELEASE     = /(a|b|c|rc|alpha|beta|pre|preview|dev)[-_.]?\d*$/i;
 
 
 /**
@@ -27,152 +30,238 @@ const PYPI_BASE = 'https://pypi.org/pypi/';
  */
 class PIPStrategy extends SystemStrategy {
 
+    /**
+     * Construct a pip strategy.
+     *
+     * @param {Object} [options]      Options object.
+     * @param {String} [options.pypi] Base URL of the PyPI JSON API. Defaults to `$V2_PYPI_URL` or the public PyPI.
+     */
+    constructor(options = {}) {
+
+        super();
+        this.pypi = new PyPIMetadata({ base: options.pypi });
+
+    }
+
+    /**
+     * Get the full PyPI package definition directly from the PyPI API, bypassing the cache. Use this only when fields
+     * outside of the projection returned by {@see getPackageDefinition} are needed.
+     *
+     * @param   {String}               pkg Package name.
+     * @returns {Promise<Object|null>}     Full package definition, or null if the package does not exist.
+     */
+    async getFullPackageDefinition(pkg) {
+
+        // Full definitions are never available offline
+        if (metadata.snapshot) throw new Error(`Full definition for '${pkg}' is not available in offline snapshot mode`);
+
+        return this.pypi.getFull(this.normalizePackageName(pkg));
+
+    }
+
     /**
      * Get a PyPI package definition using the PyPI API. This method respects the ETag header. Requests are made using
-     * `If-None-Exists: <etag>`. If the API response is 200 OK, the returned definition is cached in redis. If the
-     * response is 304 Not Modified, the definition is loaded from redis.
+     * `If-None-Exists: <etag>`. If the API response is 200 OK, the returned definition is projected down to the fields
+     * V2 uses and cached in redis. If the response is 304 Not Modified, the definition is loaded from redis. Lookups
+     * made concurrently are batched and deduplicated by {@see PyPIMetadata}.
+     *
+     * If an offline snapshot is configured (`metadata.snapshot`), definitions are served entirely from the snapshot and
+     * no network calls are made.
      *
      * @param   {String}          pkg Package name.
-     * @returns {Promise<Object>}     Package definition.
+     * @returns {Promise<Object>}     Projected package definition.
      */
     async getPackageDefinition(pkg) {
 
-        // Use Bluebird.using to properly close connection after finish.
-        return Bluebird.using(cache.getClientFor('pip'), async (redis) => {
+        // Serve from offline snapshot if configured
+        if (metadata.snapshot) {
+            logger.info(`Getting definition for pip package from snapshot: '${pkg}'`);
+            return Snapshot.open(metadata.snapshot).get(this.normalizePackageName(pkg));
+        }
 
-            // Normalize package name for cache storage
-            pkg = this.normalizePackageName(pkg);
-            logger.info(`Getting definition for pip package: '${pkg}'`);
+        return this.pypi.get(this.normalizePackageName(pkg));
 
-            // Format API url
-            let url = new URL(`${pkg}/json`, PYPI_BASE);
+    }
 
-            // Known package definition and etag
-            let definition;
-            let etag;
-            let updated;
+    /**
+     * Check whether a release has a file pip would install on an interpreter. Yanked files and files whose
+     * `requires_python` excludes the full version run by the interpreter's image are skipped. Source distributions
+     * install anywhere, and wheels install if their tags are compatible. Other file types, such as eggs and Windows
+     * installers, are never used by pip.
+     *
+     * @param   {Array.<Object>} files       Projected release files.
+     * @param   {String}         interpreter Interpreter version, such as `3.7`.
+     * @returns {Boolean}                    Whether the release installs on the interpreter.
+     */
+    installsOn(files, interpreter) {
 
-            // Check for package info in the cache
-            if (await redis.existsAsync(pkg)) {
+        return _.some(files, (file) => {
 
-                // Get definition and stored etag
-                let cache = JSON.parse(await redis.send_commandAsync('JSON.GET', [pkg]));
-                if (cache) {
-                    definition = cache.definition;
-                    etag = cache.etag;
-                    updated = cache.updated;
-                    logger.info(`Cache hit for '${pkg}'`);
+            // Skip yanked files and files for other Python versions. Malformed specifiers are not enforced.
+            if (file.yanked) return false;
+            try {
+                let version = requiresDist.fullVersion(interpreter);
+                if (file.requires_python && !versionUtils.satisfiesSpecifier(version, file.requires_python)) {
+                    return false;
                 }
-
+            }
+            catch (e) {
+                logger.warn(`Unable to check requires_python '${file.requires_python}': ${e.message}`);
             }
 
-            // Determine if the cache is stale (cache was last validated more than 1 hour (3600 seconds) ago).
-            let now = _.toInteger(Date.now() / 1000);  // Date.now() returns milliseconds.
-            let stale = definition && (now - updated) > 3600;
-            if (stale) { logger.info(`Cache is stale, updating`); }
-
-            // Call API on cache miss or if stale
-            if (definition === undefined || stale) {
-
-                // Ask for package from PyPI using If-None-Match
-                logger.info(`Calling PyPI API: GET ${url}`);
-                let response = await Bluebird.fromCallback(cb => request.get(
-                    { url, json: true, headers: { 'If-None-Match': etag } },
-                    cb
-                ));
-
-                // If not found, cache and return null
-                if (response.statusCode === status('Not Found')) {
-                    try {
-                        await redis.send_commandAsync('JSON.SET', [pkg, '.', JSON.stringify({
-                            definition: null,
-                            etag: null,
-                            updated: now
-                        })]);
-                    }
-                    catch (e) {
-                        logger.error(e);
-                    }
-                    return null;
-                }
-
-                // Error if the status code is otherwise unexpected.
-                if (response.statusCode !== status('OK') && response.statusCode !== status('Not Modified')) {
+            // Check the file type. Wheels with unknown filenames are assumed to be compatible.
+            if (file.packagetype === 'sdist') return true;
+            if (file.packagetype !== 'bdist_wheel') return false;
+            return !file.filename || wheelTags.compatible(file.filename, interpreter);
 
-                    throw new Error(JSON.stringify(_.get(response, 'body')));
+        });
 
-                }
+    }
 
-                // If response modified, cache the new definition
-                if (response.statusCode === status('OK')) {
+    /**
+     * Get all versions of a package that are available to be installed. If an interpreter is given, only versions
+     * with a release file that installs on it are listed.
+     *
+     * @param   {String}                  pkg           Package name.
+     * @param   {String}                  [interpreter] Interpreter version, such as `3.7`.
+     * @returns {Promise<Array.<String>>}               List of available version specifiers.
+     */
+    async getAvailablePackageVersions(pkg, interpreter) {
 
-                    definition = _.get(response, 'body');
-                    etag = _.get(response, 'headers.etag');
-                    logger.info(`Found new etag '${etag}' for '${pkg}'`);
+        // Get package version
+        let definition = await this.getPackageDefinition(pkg);
+        let releases = _.get(definition, 'releases', {});
+
+        // Filter to versions that install on the interpreter
+        let versions = _.keys(releases);
+        if (interpreter) {
+            versions = _.filter(versions, version => this.installsOn(releases[version], interpreter));
+            logger.info(`${versions.length} of ${_.size(releases)} release(s) of '${pkg}' install on `
+                + `Python ${interpreter}`);
+        }
 
-                }
-                else {
+        // Parse all versions and sort in some reasonable order
+        return versions.sort();
 
-                    logger.info('Not Modified.');
+    }
 
-                }
+    /**
+     * Get the date a version of a package was released, taken as the earliest upload time of its release files.
+     *
+     * @param   {String}             pkg     Package name.
+     * @param   {String}             version Package version.
+     * @returns {Promise<Date|null>}         Release date, or null if unknown.
+     */
+    async getReleaseDate(pkg, version) {
 
-                // Cache definition
-                try {
-                    await redis.send_commandAsync('JSON.SET', [pkg, '.', JSON.stringify({
-                        definition,
-                        etag,
-                        updated: now
-                    })]);
-                }
-                catch (e) {
-                    logger.error(e);
-                }
+        // PyPI upload times are UTC without a timezone designator
+        let definition = await this.getPackageDefinition(pkg);
+        let uploaded = _.min(_.compact(_.map(_.get(definition, ['releases', version]), 'upload_time')));
+        return uploaded ? new Date(`${uploaded}Z`) : null;
 
-            }
+    }
 
-            // Return package definition
-            return definition;
+    /**
+     * Get the newest final release of a package uploaded by a date. Pre-releases and yanked releases are skipped.
+     *
+     * @param   {String}               pkg  Package name.
+     * @param   {Date}                 date Date.
+     * @returns {Promise<String|null>}      Version, or null if nothing had been released by the date.
+     */
+    async getVersionAtDate(pkg, date) {
 
+        // Find releases with a file uploaded by the date
+        let definition = await this.getPackageDefinition(pkg);
+        let released = _.filter(_.keys(_.get(definition, 'releases', {})), version => {
+            let files = _.reject(definition.releases[version], 'yanked');
+            let uploaded = _.min(_.compact(_.map(files, 'upload_time')));
+            return !PRERELEASE.test(version) && uploaded && new Date(`${uploaded}Z`) <= date;
         });
 
+        // Take the newest
+        if (!released.length) return null;
+        return _.first(await this.sortPackageVersions(released, false, undefined, pkg));
+
     }
 
     /**
-     * Get all versions of a package that are available to be installed.
+     * Check whether a version of a package has a wheel that installs on an interpreter, either on PyPI or in the local
+     * wheelhouse. Versions without one are built from their sdist during install, which can take minutes for packages
+     * with extension modules.
      *
-     * @param   {String}                  pkg Package name.
-     * @returns {Promise<Array.<String>>}     List of available version specifiers.
+     * @param   {String}                pkg         Package name.
+     * @param   {String}                version     Package version.
+     * @param   {String}                interpreter Interpreter version, such as `3.7`.
+     * @returns {Promise<Boolean|null>}             Whether a compatible wheel exists, or null if the version has no
+     *                                              release files or its wheel filenames are unknown.
      */
-    async getAvailablePackageVersions(pkg) {
+    async hasBinaryRelease(pkg, version, interpreter) {
 
-        // Get package version
+        // Built locally
+        if (wheelhouse.has(pkg, version, interpreter)) return true;
+
+        // Get installable release files
         let definition = await this.getPackageDefinition(pkg);
+        let files = _.reject(_.get(definition, ['releases', version]), 'yanked');
+        if (!files.length) return null;
 
-        // Parse all versions and sort in some reasonable order
-        return _.keys(_.get(definition, 'releases', {})).sort();
+        // Look for a compatible wheel
+        let wheels = _.filter(files, { packagetype: 'bdist_wheel' });
+        if (_.some(wheels, w => wheelTags.compatible(w.filename, interpreter))) return true;
+        return _.every(wheels, 'filename') ? false : null;
+
+    }
+
+    /**
+     * Get the requirements a version of a package declares in its `requires_dist` metadata that apply on an
+     * interpreter. Requirements of extras are left out, since V2 never installs extras. Release metadata is not
+     * included in offline snapshots.
+     *
+     * @param   {String}                       pkg         Package name.
+     * @param   {String}                       version     Package version.
+     * @param   {String}                       interpreter Interpreter version, such as `3.7`.
+     * @returns {Promise<Array.<Object>|null>}             Constraints as `{ name, specifier }` with normalized names, or
+     *                                                     null if the release is unknown.
+     */
+    async getDependencyConstraints(pkg, version, interpreter) {
+
+        if (metadata.snapshot) return null;
+        let release = await this.pypi.getRelease(this.normalizePackageName(pkg), version);
+        if (!release) return null;
+
+        // Parse requirements, keeping those that apply
+        return _.compact(_.map(release.requires_dist, (line) => {
+            let requirement = requiresDist.parse(line);
+            if (!requirement || !requiresDist.applies(requirement.marker, interpreter)) return null;
+            return { name: this.normalizePackageName(requirement.name), specifier: requirement.specifier };
+        }));
 
     }
 
     /**
-     * Given a list of package versions, return them sorted order.
+     * Given a list of package versions, return them sorted order. Sorting is done by a long lived `pip-versions`
+     * container shared by all calls, which memoizes parsed versions per package.
      *
      * @param   {Array.<String>}          versions          Versions to sort.
      * @param   {Boolean}                 [ascending=false] Whether to sort in ascending or descending order.
      * @param   {String}                  [cutoff]          Only include versions less than cutoff or equal to cutoff
      *                                                      if sorting descending, or greater than or equal to cutoff
      *                                                      if sorting ascending. Include all versions if not specified.
+     * @param   {String}                  [pkg]             Name of the package the versions belong to.
      * @returns {Promise<Array.<String>>}                   Sorted versions.
      */
-    async sortPackageVersions(versions, ascending=false, cutoff) {
+    async sortPackageVersions(versions, ascending=false, cutoff, pkg) {
 
-        // Generate command
-        let cmd = [`'${JSON.stringify(versions)}'`];
-        if (cutoff) cmd.push(`--cutoff='${cutoff}'`);
-        if (ascending) cmd.push('--ascending');
+        // Start the sort service on first use
+        if (!this.sortService) this.sortService = new DockerService(PIP_VERSIONS, '--serve');
 
-        // Run sort
-        return dockerTools.runDockerContainer('localhost:5000/v2/pip-versions:latest', cmd.reverse().join(' '));
+        // Sort
+        return this.sortService.request({
+            versions,
+            ascending,
+            cutoff: cutoff || null,
+            package: pkg ? this.normalizePackageName(pkg) : null
+        });
 
     }
 
@@ -207,13 +296,16 @@ class PIPStrategy extends SystemStrategy {
     /**
      * Search for a package exactly matching a given name using a packaging system implementation. If a version is
      * specified, the package search requires that a package exists matching both the name and version. Implementations
-     * may vary on "exact." For example, some implementations may perform a case insensitive match.
+     * may vary on "exact." For example, some implementations may perform a case insensitive match. If an interpreter
+     * is specified, only releases that install on it are considered, and the newest of them is returned if no version
+     * is specified.
      *
-     * @param   {String}     name      Package name.
-     * @param   {String}     [version] Package version.
-     * @returns {Dependency}           Package with exact match.
+     * @param   {String}     name          Package name.
+     * @param   {String}     [version]     Package version.
+     * @param   {String}     [interpreter] Interpreter version, such as `3.7`.
+     * @returns {Dependency}               Package with exact match.
      */
-    async searchForExactPackageMatch(name, version) {
+    async searchForExactPackageMatch(name, version, interpreter) {
 
         // Get package definition
         let definition = await this.getPackageDefinition(name);
@@ -224,20 +316,24 @@ class PIPStrategy extends SystemStrategy {
             return null;
         }
 
-        // Get releases
-        // TODO can filter to releases that support a particular python version
-        // may need PEP 440 https://www.python.org/dev/peps/pep-0440/
-
-        // Get releases. If a version is specified, get releases for only that version.
-        // Otherwise get releases for all versions.
-        let path = version ? `releases['${version}']` : 'releases';
-        let releases = _.flattenDeep(_.values(_.get(definition, path, {})));
+        // Get releases, filtered to releases that install on the interpreter if one is specified. If a version is
+        // specified, get releases for only that version. Otherwise get releases for all versions.
+        let releases = _.get(definition, 'releases', {});
+        if (interpreter) releases = _.pickBy(releases, files => this.installsOn(files, interpreter));
+        let files = _.flattenDeep(version ? _.get(releases, [version], []) : _.values(releases));
+
+        // Without a version, take the latest release, or the newest final release that installs on the interpreter
+        let latest = _.get(definition, 'info.version');
+        if (!version && interpreter && !_.has(releases, latest)) {
+            let final = _.reject(_.keys(releases), v => PRERELEASE.test(v));
+            latest = final.length ? _.first(await this.sortPackageVersions(final, false, undefined, name)) : null;
+        }
 
         // Return if any releases are found
-        if (!_.isEmpty(releases)) {
+        if (!_.isEmpty(files) && (version || latest)) {
             return {
                 name: _.get(definition, 'info.name'),
-                version: version || _.get(definition, 'info.version'),
+                version: version || latest,
                 system: 'pip'
             };
         }
@@ -10,6 +10,95 @@ import sys
 from packaging import version
 
 
+class Sorter(object):
+    """Version sorter with a memo of parsed versions per package.
+
+    Parsing a version with `packaging` is the dominant cost of sorting, and
+    callers repeatedly sort the same release lists. Parsed versions are kept
+    per package, as is the most recent sorted release list, so a repeated
+    sort only has to bisect and slice.
+    """
+
+    def __init__(self):
+        """Initialize Sorter."""
+        # Parsed versions by package, then by version string
+        self.parsed = {}
+
+        # Most recently sorted (versions, sorted parsed versions) by package
+        self.sorted = {}
+
+    def parse(self, package, versions):
+        """Parse versions, reusing memoized results for the package.
+
+        Parameters
+        ----------
+        package : str
+            Package the versions belong to. May be None.
+        versions : list
+            List of version strings.
+
+        Returns
+        -------
+        list
+            Parsed versions.
+        """
+        memo = self.parsed.setdefault(package, {})
+        parsed = []
+        for v in versions:
+            key = memo.get(v)
+            if key is None:
+                key = memo[v] = version.parse(v)
+            parsed.append(key)
+        return parsed
+
+    def sort(self, versions, ascending=False, cutoff=None, package=None):
+        """Sort a list of versions.
+
+        Parameters
+        ----------
+        versions : list
+            List of versions to be sorted.
+        ascending : bool
+            Whether sorting should be done in ascending or descending order.
+            Defaults to false (descending order).
+        cutoff : str
+            Version cutoff. Only include versions less than or equal to
+            cutoff if sorting descending, or greater than or equal to cutoff
+            if sorting ascending. Include all versions if not specified.
+        package : str
+            Package the versions belong to. Used to memoize parsed versions.
+
+        Returns
+        -------
+        list
+            Sorted versions.
+        """
+        # Parse as versions and sort, unless this list was the last one sorted
+        # for the package.
+        key = tuple(versions)
+        last = self.sorted.get(package)
+        if last is not None and last[0] == key:
+            versions = last[1]
+        else:
+            versions = sorted(self.parse(package, versions))
+            self.sorted[package] = (key, versions)
+
+        # Filter by cutoff if specified
+        if cutoff:
+            cutoff = version.parse(cutoff)
+            if ascending:
+                versions = versions[bisect.bisect_left(versions, cutoff):]
+            else:
+                versions = versions[:bisect.bisect_right(versions, cutoff)]
+
+        # Reverse if descending
+        if not ascending:
+            versions = list(reversed(versions))
+
+        # Return versions
+        return list(map(str, versions))
+
+
 def sort(versions, ascending=False, cutoff=None):
     """Sort a list of versions.
 
@@ -30,23 +119,54 @@ def sort(versions, ascending=False, cutoff=None):
     list
         Sorted versions.
     """
-    # Parse as versions and sort
-    versions = list(sorted(map(version.parse, versions)))
-
-    # Filter by cutoff if specified
-    if cutoff:
-        cutoff = version.parse(cutoff)
-        if ascending:
-            versions = versions[bisect.bisect_left(versions, cutoff):]
-        else:
-            versions = versions[:bisect.bisect_right(versions, cutoff)]
+    return Sorter().sort(versions, ascending, cutoff)
+
+
+def serve(stdin, stdout):
+    """Answer sort requests until stdin is closed.
 
-    # Reverse if descending
-    if not ascending:
-        versions = list(reversed(versions))
+    Each request is a JSON object on its own line with the keys `id`,
+    `versions`, and optionally `ascending`, `cutoff`, and `package`. Each
+    response is written as a JSON object on its own line with the request
+    `id` and either a `result` or an `error`.
 
-    # Return versions
-    return list(map(str, versions))
+    Parameters
+    ----------
+    stdin : file
+        Request stream.
+    stdout : file
+        Response stream.
+    """
+    sorter = Sorter()
+    for line in iter(stdin.readline, ''):
+
+        # Skip blank lines
+        if not line.strip():
+            continue
+
+        # Sort, reporting any failure back to the caller
+        request = {}
+        try:
+            request = json.loads(line)
+            response = {
+                'id': request.get('id'),
+                'result': sorter.sort(
+                    list(request['versions']),
+                    bool(request.get('ascending')),
+                    request.get('cutoff'),
+                    request.get('package'),
+                ),
+            }
+        except Exception as e:
+            response = {
+                'id': request.get('id'),
+                'error': '{}: {}'.format(type(e).__name__, e),
+            }
+
+        # Write response
+        json.dump(response, stdout)
+        stdout.write('\n')
+        stdout.flush()
 
 
 def main():
@@ -55,9 +175,17 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--ascending', action='store_true',)
     parser.add_argument('--cutoff', nargs='?',)
-    parser.add_argument('versions',)
+    parser.add_argument('--serve', action='store_true',)
+    parser.add_argument('versions', nargs='?',)
     argv = parser.parse_args()
 
+    # Run as a long lived service if requested
+    if argv.serve:
+        serve(sys.stdin, sys.stdout)
+        return
+    if argv.versions is None:
+        parser.error('versions are required unless --serve is given')
+
     # Parse versions as a list
     versions = list(json.loads(argv.versions))
 
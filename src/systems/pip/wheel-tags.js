@@ -0,0 +1,96 @@
+/**
+ * Wheel compatibility tags.
+ *
+ * @module systems/pip/wheel-tags
+ */
+
+
+// Core/NPM modules
+const _         = require('lodash');
+
+
+// Constants
+const WHEEL     = /^(.+?)-(.+?)(?:-(\d[^-]*))?-([^-]+)-([^-]+)-([^-]+)\.whl$/;
+const MANYLINUX = /^manylinux(?:(1|2010|2014)|_(\d+)_(\d+))_x86_64$/;
+const LEGACY    = { 1: 5, 2010: 12, 2014: 17 };   // glibc minor version required by each legacy manylinux tag.
+const GLIBC     = 28;                             // glibc minor version of the validation images (Debian buster).
+
+
+/**
+ * Decides whether wheels install on the interpreters V2 validates with. Validation images are the official CPython
+ * images for x86_64 Linux, so only pure Python wheels and manylinux wheels for the interpreter's ABI qualify. Python 2
+ * images are built with wide unicode, so Python 2 wheels must be tagged for the `mu` ABI.
+ */
+class WheelTags {
+
+    /**
+     * Parse the compatibility tags of a wheel filename. Compressed tag sets such as `py2.py3` are expanded.
+     *
+     * @param   {String}      filename Wheel filename.
+     * @returns {Object|null}          Tags as `{ python, abi, platform }` arrays, or null if not a wheel filename.
+     */
+    parse(filename) {
+
+        let match = WHEEL.exec(filename || '');
+        if (!match) return null;
+        return {
+            python: _.split(match[4], '.'),
+            abi: _.split(match[5], '.'),
+            platform: _.split(match[6], '.')
+        };
+
+    }
+
+    /**
+     * Check whether a platform tag installs on the validation images.
+     *
+     * @param   {String}  platform Platform tag.
+     * @returns {Boolean}          Whether the platform is supported.
+     */
+    platform(platform) {
+
+        if (platform === 'any' || platform === 'linux_x86_64') return true;
+        let match = MANYLINUX.exec(platform);
+        if (!match) return false;
+        let glibc = match[1] ? LEGACY[match[1]] : (_.toInteger(match[2]) === 2 ? _.toInteger(match[3]) : Infinity);
+        return glibc <= GLIBC;
+
+    }
+
+    /**
+     * Check whether a wheel installs on an interpreter without building anything.
+     *
+     * @param   {String}  filename    Wheel filename.
+     * @param   {String}  interpreter Interpreter version, as `<major>.<minor>`.
+     * @returns {Boolean}             Whether the wheel is compatible.
+     */
+    compatible(filename, interpreter) {
+
+        let tags = this.parse(filename);
+        let [major, minor] = _.map(_.split(interpreter, '.'), _.toInteger);
+        if (!tags || !major) return false;
+
+        // Python tags. Generic tags apply to the interpreter and earlier minor versions. CPython tags apply to the
+        // exact version, or to earlier minor versions with the stable ABI.
+        let python = _.some(tags.python, (tag) => {
+            let match = /^(py|cp)(\d)(\d*)$/.exec(tag);
+            if (!match || _.toInteger(match[2]) !== major) return false;
+            if (match[1] === 'py') return !match[3] || _.toInteger(match[3]) <= minor;
+            return _.toInteger(match[3]) === minor
+                || (_.toInteger(match[3]) < minor && _.includes(tags.abi, 'abi3'));
+        });
+
+        // ABI tags
+        let abis = ['none', `cp${major}${minor}`, major === 2 ? `cp${major}${minor}mu` : `cp${major}${minor}m`];
+        if (major >= 3) abis.push('abi3');
+        let abi = _.some(tags.abi, tag => _.includes(abis, tag));
+
+        return python && abi && _.some(tags.platform, tag => this.platform(tag));
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new WheelTags();
@@ -0,0 +1,199 @@
+/**
+ * Local wheelhouse of wheels built from source distributions.
+ *
+ * @module systems/pip/wheelhouse
+ */
+
+
+// Core/NPM modules
+const _            = require('lodash');
+const fs           = require('fs');
+
+
+// Local modules
+const dataDir      = require('../../data-dir');
+const dockerTools  = require('../../docker-tools');
+const logger       = require('../../logger');
+
+
+// Constants
+const VOLUME       = process.env.V2_WHEELHOUSE || 'v2-wheelhouse';
+const MOUNT        = '/wheelhouse';
+const BUILDS_FILE  = 'wheelhouse.json';
+const BUILD_SCRIPT = '/scripts/build_wheels.py';
+const BUILT        = 'built';
+const FAILED       = 'failed';
+const RETRY_DELAY  = 86400;  // Seconds before a failed build is attempted again. Doubles after each failure.
+const MAX_ATTEMPTS = 3;      // Failed builds attempted this many times are not attempted again.
+
+
+/**
+ * Wheels built once for `(package, version, interpreter)` combinations that only publish an sdist, so later
+ * validations install them without compiling. Wheels are kept in a Docker volume (`$V2_WHEELHOUSE`, or
+ * `v2-wheelhouse` by default) that validation containers mount read only and point pip at with `PIP_FIND_LINKS`. The
+ * outcome of every build is recorded in the data directory so nothing is built twice. Failed builds may have failed
+ * for transient reasons, such as the network, so they are retried a few times with increasing delays. Builds run one
+ * at a time.
+ */
+class Wheelhouse {
+
+    /**
+     * Construct an empty build queue.
+     */
+    constructor() {
+
+        this.queue = Promise.resolve();
+        this.pending = new Set();
+
+    }
+
+    /**
+     * Build outcomes by key. Loaded from the data directory on first access.
+     *
+     * @returns {Object} Map of key to `{ status, date }`, with the number of `attempts` and the `retry` date of failed
+     *                  builds.
+     */
+    get builds() {
+
+        if (!this._builds) {
+            let file = dataDir.resolve(BUILDS_FILE);
+            this._builds = fs.existsSync(file) ? JSON.parse(fs.readFileSync(file, 'utf8')) : {};
+        }
+        return this._builds;
+
+    }
+
+    /**
+     * Key identifying a package version on an interpreter. Package names are normalized as in PEP 503.
+     *
+     * @param   {String} pkg         Package name.
+     * @param   {String} version     Package version.
+     * @param   {String} interpreter Interpreter version, such as `3.7`.
+     * @returns {String}             Key.
+     */
+    key(pkg, version, interpreter) {
+
+        return `${interpreter} ${pkg.toLowerCase().replace(/[-_.]+/g, '-')}==${version}`;
+
+    }
+
+    /**
+     * Check whether a wheel has been built for a package version.
+     *
+     * @param   {String}  pkg         Package name.
+     * @param   {String}  version     Package version.
+     * @param   {String}  interpreter Interpreter version.
+     * @returns {Boolean}             Whether the wheelhouse has a wheel.
+     */
+    has(pkg, version, interpreter) {
+
+        return _.get(this.builds[this.key(pkg, version, interpreter)], 'status') === BUILT;
+
+    }
+
+    /**
+     * Check whether a wheel has been built, is being built, or has failed to build and is not due to be retried for a
+     * package version.
+     *
+     * @param   {String}  pkg         Package name.
+     * @param   {String}  version     Package version.
+     * @param   {String}  interpreter Interpreter version.
+     * @returns {Boolean}             Whether a build has been attempted and should not be attempted again yet.
+     */
+    attempted(pkg, version, interpreter) {
+
+        let key = this.key(pkg, version, interpreter);
+        let build = this.builds[key];
+        if (this.pending.has(key)) return true;
+        if (!build) return false;
+        return build.status !== FAILED || !build.retry || new Date(build.retry) > new Date();
+
+    }
+
+    /**
+     * Docker arguments that let a validation container install from the wheelhouse.
+     *
+     * @returns {Array.<String>} Docker run arguments.
+     */
+    dockerArgs() {
+
+        return [
+            `--mount='type=volume,source=${VOLUME},target=${MOUNT},readonly'`,
+            `--env PIP_FIND_LINKS=${MOUNT}`
+        ];
+
+    }
+
+    /**
+     * Write build outcomes to the data directory.
+     */
+    save() {
+
+        try {
+            let file = dataDir.resolve(BUILDS_FILE);
+            fs.writeFileSync(`${file}.tmp`, JSON.stringify(this._builds));
+            fs.renameSync(`${file}.tmp`, file);
+        }
+        catch (e) {
+            logger.warn(`Unable to save wheelhouse builds: ${e.message}`);
+        }
+
+    }
+
+    /**
+     * Build wheels in a container created from an image with the target interpreter. All dependencies are installed in
+     * order, since building a package may need the packages before it, and wheels are built for the requested ones.
+     *
+     * @param   {String}                  image        Image to build in. Must contain the wheel build script.
+     * @param   {String}                  interpreter  Interpreter version of the image.
+     * @param   {Array.<Dependency>}      dependencies Pip dependencies in installation order.
+     * @param   {Array.<Dependency>}      build        Dependencies to build wheels for.
+     * @returns {Promise<Array.<String>>}              Requirements wheels were built for.
+     */
+    async build(image, interpreter, dependencies, build) {
+
+        let requirement = d => d.version ? `${d.name}==${d.version}` : d.name;
+        let keys = _.zipObject(_.map(build, requirement), _.map(build, d => this.key(d.name, d.version, interpreter)));
+        _.each(keys, key => this.pending.add(key));
+        logger.info(`Queueing wheel builds for Python ${interpreter}: ${_.keys(keys).join(', ')}`);
+
+        // Wait for earlier builds, then run the build script with the wheelhouse mounted read-write
+        let command = `${BUILD_SCRIPT} ${MOUNT} '${_.map(dependencies, requirement).join(',')}' `
+            + `--build '${_.keys(keys).join(',')}'`;
+        let args = ['--entrypoint python', `--mount='type=volume,source=${VOLUME},target=${MOUNT}'`];
+        let run = this.queue.then(() => dockerTools.runDockerContainer(image, command, args));
+        this.queue = run.catch(_.noop);
+
+        // Record outcomes. Nothing is recorded if the container itself failed, so the build can be attempted again.
+        let result;
+        try {
+            result = await run;
+        }
+        finally {
+            _.each(keys, key => this.pending.delete(key));
+        }
+        let now = new Date();
+        let date = now.toISOString();
+        _.each(_.pick(keys, result.built), key => { this.builds[key] = { status: BUILT, date }; });
+        _.each(_.pick(keys, result.failed), (key) => {
+
+            // Retry after a delay doubling with each failure, until the build has failed too often to be transient
+            let attempts = _.get(this.builds[key], 'attempts', 0) + 1;
+            let retry = attempts < MAX_ATTEMPTS
+                ? new Date(now.getTime() + RETRY_DELAY * 1000 * Math.pow(2, attempts - 1)).toISOString()
+                : null;
+            this.builds[key] = { status: FAILED, date, attempts, retry };
+
+        });
+        this.save();
+
+        logger.info(`Built ${result.built.length} wheel(s), ${result.failed.length} failed`);
+        return result.built;
+
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new Wheelhouse();
@@ -22,12 +22,14 @@ class SystemStrategy {
     get system() { throw new Error(NOT_IMPLEMENTED); }
 
     /**
-     * Get all versions of a package that are available to be installed.
+     * Get all versions of a package that are available to be installed. Systems whose releases target particular
+     * interpreters only list versions that install on the given interpreter.
      *
-     * @param   {String}                  pkg Package name.
-     * @returns {Promise<Array.<String>>}     List of available version specifiers.
+     * @param   {String}                  pkg           Package name.
+     * @param   {String}                  [interpreter] Interpreter version, such as `3.7`.
+     * @returns {Promise<Array.<String>>}               List of available version specifiers.
      */
-    async getAvailablePackageVersions(pkg) { throw new Error(NOT_IMPLEMENTED); }
+    async getAvailablePackageVersions(pkg, interpreter) { throw new Error(NOT_IMPLEMENTED); }
 
     /**
      * Given a list of package versions, return them sorted order.
@@ -37,9 +39,54 @@ class SystemStrategy {
      * @param   {String}                  [cutoff]          Only include versions less than cutoff or equal to cutoff
      *                                                      if sorting descending, or greater than or equal to cutoff
      *                                                      if sorting ascending. Include all versions if not specified.
+     * @param   {String}                  [pkg]             Name of the package the versions belong to. Implementations
+     *                                                      may use it to memoize work across calls.
      * @returns {Promise<Array.<String>>}                   Sorted versions.
      */
-    async sortPackageVersions(versions, ascending=false, cutoff) { throw new Error(NOT_IMPLEMENTED); }
+    async sortPackageVersions(versions, ascending=false, cutoff, pkg) { throw new Error(NOT_IMPLEMENTED); }
+
+    /**
+     * Get the date a version of a package was released. Default is unknown. Systems with release metadata may override
+     * this.
+     *
+     * @param   {String}             pkg     Package name.
+     * @param   {String}             version Package version.
+     * @returns {Promise<Date|null>}         Release date, or null if unknown.
+     */
+    async getReleaseDate(pkg, version) { return null; }
+
+    /**
+     * Get the newest version of a package that had been released by a date. Default is unknown. Systems with release
+     * metadata may override this.
+     *
+     * @param   {String}               pkg  Package name.
+     * @param   {Date}                 date Date.
+     * @returns {Promise<String|null>}      Version, or null if unknown.
+     */
+    async getVersionAtDate(pkg, date) { return null; }
+
+    /**
+     * Check whether a version of a package ships a prebuilt binary for an interpreter, so installing it does not build
+     * anything from source. Default is unknown. Systems with release file metadata may override this.
+     *
+     * @param   {String}                pkg         Package name.
+     * @param   {String}                version     Package version.
+     * @param   {String}                interpreter Interpreter version, such as `3.7`.
+     * @returns {Promise<Boolean|null>}             Whether a compatible binary exists, or null if unknown.
+     */
+    async hasBinaryRelease(pkg, version, interpreter) { return null; }
+
+    /**
+     * Get the version constraints a version of a package places on other packages of the same system when installed
+     * on an interpreter. Default is unknown. Systems with dependency metadata may override this.
+     *
+     * @param   {String}                       pkg         Package name.
+     * @param   {String}                       version     Package version.
+     * @param   {String}                       interpreter Interpreter version, such as `3.7`.
+     * @returns {Promise<Array.<Object>|null>}             Constraints as `{ name, specifier }` with normalized names, or
+     *                                                     null if unknown.
+     */
+    async getDependencyConstraints(pkg, version, interpreter) { return null; }
 
     /**
      * Get a system specific command for installing a package.
@@ -62,13 +109,15 @@ class SystemStrategy {
     /**
      * Search for a package exactly matching a given name using a packaging system implementation. If a version is
      * specified, the package search requires that a package exists matching both the name and version. Implementations
-     * may vary on "exact." For example, some implementations may perform a case insensitive match.
+     * may vary on "exact." For example, some implementations may perform a case insensitive match. If an interpreter
+     * is specified, implementations may require a release that installs on it.
      *
-     * @param   {String}     name      Package name.
-     * @param   {String}     [version] Package version.
-     * @returns {Dependency}           Package with exact match.
+     * @param   {String}     name          Package name.
+     * @param   {String}     [version]     Package version.
+     * @param   {String}     [interpreter] Interpreter version, such as `3.7`.
+     * @returns {Dependency}               Package with exact match.
      */
-    async searchForExactPackageMatch(name, version) { throw new Error(NOT_IMPLEMENTED); }
+    async searchForExactPackageMatch(name, version, interpreter) { throw new Error(NOT_IMPLEMENTED); }
 
 }
 
@@ -0,0 +1,220 @@
+/**
+ * In-process index of the available versions of each package.
+ *
+ * @module version-index
+ */
+
+
+// Core/NPM modules
+const _            = require('lodash');
+
+
+// Local modules
+const factory      = require('./strategy-factory');
+const LRUCache     = require('./lru-cache');
+const versionUtils = require('./version-utils');
+
+
+// Constants
+const CAPACITY     = 512;
+
+
+/**
+ * Sorted index of the available versions of a single package. Versions are coerced to semver, sorted in ascending
+ * order, and kept alongside the original version strings so range queries can be answered with a binary search.
+ *
+ * @property {Array.<semver.SemVer>} semvers  Available versions coerced to semver, in ascending order.
+ * @property {Array.<String>}        versions Original version strings, parallel to `semvers`.
+ */
+class VersionIndex {
+
+    /**
+     * Build an index from a list of version strings. Versions that can not be coerced to semver are dropped. If
+     * multiple versions coerce to the same semver value, the last one listed wins.
+     *
+     * @param {Array.<String>} versions Available version strings.
+     */
+    constructor(versions) {
+
+        // Map each semver value to the last original version string that produced it
+        let lookup = new Map();
+        _.each(versions, (version) => {
+            let coerced = versionUtils.coerceSemver(version);
+            if (coerced) lookup.set(coerced.version, [coerced, version]);
+        });
+
+        // Sort ascending and split into parallel arrays
+        let pairs = Array.from(lookup.values()).sort(([a], [b]) => a.compare(b));
+        this.semvers = _.map(pairs, 0);
+        this.versions = _.map(pairs, 1);
+
+    }
+
+    /**
+     * Number of indexed versions.
+     *
+     * @returns {Number} Index size.
+     */
+    get size() { return this.semvers.length; }
+
+    /**
+     * Find the position of the first indexed version greater than or equal to a bound.
+     *
+     * @param   {semver.SemVer} bound Version bound.
+     * @returns {Number}              Insertion index of the bound.
+     */
+    lowerBound(bound) {
+
+        let lo = 0;
+        let hi = this.semvers.length;
+        while (lo < hi) {
+            let mid = (lo + hi) >>> 1;
+            if (this.semvers[mid].compare(bound) < 0) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+
+    }
+
+    /**
+     * Check whether a version is indexed. Versions are compared after coercing them to semver.
+     *
+     * @param   {String}  version Version.
+     * @returns {Boolean}         True if the version is indexed.
+     */
+    has(version) {
+
+        let coerced = versionUtils.coerceSemver(version);
+        if (!coerced) return false;
+        let i = this.lowerBound(coerced);
+        return i < this.semvers.length && this.semvers[i].compare(coerced) === 0;
+
+    }
+
+    /**
+     * Find the latest release strictly below an upper bound and at or above an optional lower bound. Prereleases are
+     * skipped, matching the default behavior of `semver.maxSatisfying` for ranges without prerelease tags.
+     *
+     * @param   {String|semver.SemVer} upper   Exclusive upper bound.
+     * @param   {String|semver.SemVer} [lower] Inclusive lower bound.
+     * @returns {String|null}                  Original version string of the latest matching release, if any.
+     */
+    latestBelow(upper, lower) {
+
+        // Coerce bounds
+        upper = versionUtils.coerceSemver(upper);
+        lower = _.isNil(lower) ? null : versionUtils.coerceSemver(lower);
+
+        // Walk down from the insertion point of the upper bound, skipping prereleases
+        for (let i = this.lowerBound(upper) - 1; i >= 0; i--) {
+            let version = this.semvers[i];
+            if (lower && version.compare(lower) < 0) break;
+            if (!version.prerelease.length) return this.versions[i];
+        }
+
+        return null;
+
+    }
+
+    /**
+     * Find all releases strictly below an upper bound and at or above a lower bound. Prereleases are skipped.
+     *
+     * @param   {String|semver.SemVer} upper Exclusive upper bound.
+     * @param   {String|semver.SemVer} lower Inclusive lower bound.
+     * @returns {Array.<String>}             Original version strings of matching releases, latest first.
+     */
+    releasesBetween(upper, lower) {
+
+        // Coerce bounds
+        upper = versionUtils.coerceSemver(upper);
+        lower = versionUtils.coerceSemver(lower);
+
+        // Take the slice between the insertion points of the bounds, skipping prereleases
+        let releases = [];
+        for (let i = this.lowerBound(upper) - 1; i >= this.lowerBound(lower); i--) {
+            if (!this.semvers[i].prerelease.length) releases.push(this.versions[i]);
+        }
+
+        return releases;
+
+    }
+
+}
+
+
+/**
+ * Per-process cache of version indexes keyed by system, normalized package name, and interpreter, with LRU eviction.
+ */
+class VersionIndexes {
+
+    /**
+     * Construct a new cache.
+     *
+     * @param {Number} [capacity=512] Maximum number of package indexes held in memory.
+     */
+    constructor(capacity = CAPACITY) {
+        this.indexes = new LRUCache(capacity);
+    }
+
+    /**
+     * Get the cache key for a package.
+     *
+     * @param   {String} system        System name.
+     * @param   {String} pkg           Package name.
+     * @param   {String} [interpreter] Interpreter version.
+     * @returns {String}               Cache key.
+     */
+    key(system, pkg, interpreter) {
+        return `${system},${factory.getSystemStrategy(system).normalizePackageName(pkg)},${interpreter || ''}`;
+    }
+
+    /**
+     * Get the version index for a package, building it from the available package versions on a miss. If an
+     * interpreter is given, only versions that can be installed on it are indexed. Concurrent misses for the same
+     * package share a single build.
+     *
+     * @param   {String}                system        System name.
+     * @param   {String}                pkg           Package name.
+     * @param   {String}                [interpreter] Interpreter version, such as `3.7`.
+     * @returns {Promise<VersionIndex>}               Version index.
+     */
+    async get(system, pkg, interpreter) {
+
+        // Return a cached (or pending) index
+        let key = this.key(system, pkg, interpreter);
+        let index = this.indexes.get(key);
+        if (index) return index;
+
+        // Build the index from available versions, caching the pending result so concurrent callers share it.
+        let strategy = factory.getSystemStrategy(system);
+        index = Promise.resolve(strategy.getAvailablePackageVersions(pkg, interpreter))
+            .then(versions => new VersionIndex(versions));
+        this.indexes.set(key, index);
+
+        // Do not cache failures
+        try {
+            return await index;
+        }
+        catch (e) {
+            this.indexes.delete(key);
+            throw e;
+        }
+
+    }
+
+    /**
+     * Drop the cached index for a package, forcing it to be rebuilt on next access.
+     *
+     * @param {String} system        System name.
+     * @param {String} pkg           Package name.
+     * @param {String} [interpreter] Interpreter version.
+     */
+    invalidate(system, pkg, interpreter) {
+        this.indexes.delete(this.key(system, pkg, interpreter));
+    }
+
+}
+
+
+// Export singleton instance
+module.exports = new VersionIndexes();
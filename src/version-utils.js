@@ -10,6 +10,10 @@ const _      = require('lodash');
 const semver = require('semver');
 
 
+// Constants
+const CLAUSE = /^(===|==|!=|~=|>=|<=|>|<)?\s*(\S+)$/;
+
+
 /**
  * Version utilities.
  */
@@ -66,6 +70,56 @@ class VersionUtils {
 
     }
 
+    /**
+     * Determine if a version satisfies a PEP 440 version specifier, such as `>=1.2,<2` or `==1.4.*`. Versions are
+     * compared after coercing them to semver, so this is an approximation for versions that are not semver like.
+     *
+     * @param   {String}  version   Version.
+     * @param   {String}  specifier Comma separated version clauses. An empty specifier matches every version.
+     * @returns {Boolean}           True if the version satisfies every clause.
+     */
+    satisfiesSpecifier(version, specifier) {
+
+        return _.every(_.compact(_.map(_.split(specifier, ','), _.trim)), (clause) => {
+
+            // Parse the clause. Unknown clauses are not enforced.
+            let match = clause.match(CLAUSE);
+            if (!match) return true;
+            let [, operator = '==', target] = match;
+
+            // Prefix matching
+            if (_.endsWith(target, '.*')) {
+                let prefix = target.slice(0, -2).split('.');
+                let matches = _.isEqual(_.take(version.split('.'), prefix.length), prefix);
+                return operator === '!=' ? !matches : matches;
+            }
+
+            // Arbitrary equality
+            if (operator === '===') return version === target;
+
+            // Compatible release. ~=1.4.2 means >=1.4.2 and ==1.4.*.
+            if (operator === '~=') {
+                let prefix = _.dropRight(target.split('.'), 1).join('.');
+                return this.satisfiesSpecifier(version, `>=${target},==${prefix}.*`);
+            }
+
+            // Compare. Clauses on versions that cannot be coerced are not enforced.
+            let [a, b] = [this.coerceSemver(version), this.coerceSemver(target)];
+            if (!a || !b) return true;
+            let comparison = semver.compare(a, b);
+            switch (operator) {
+                case '==': return comparison === 0;
+                case '!=': return comparison !== 0;
+                case '>=': return comparison >= 0;
+                case '<=': return comparison <= 0;
+                case '>': return comparison > 0;
+                case '<': return comparison < 0;
+            }
+
+        });
+
+    }
+
 }
 
 
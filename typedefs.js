@@ -51,11 +51,18 @@
  * @property {Object}                        metadata.importedResources       Metadata for all imported resources.
  * @property {Number}                        metadata.importedResources.count Number of resources imported by the application.
  * @property {Array.<String>}                metadata.importedResources.items Names of resources imported by the application.
+ * @property {Object}                        [metadata.optionalResources]     Resources the application imports but can run without, which are not resolved to dependencies.
  * @property {DirectDependencyLookup}        metadata.directDependencies      Metadata for all direct dependencies.
  * @property {TransitiveDependencyLookup}    metadata.transitiveDependencies  Metadata for all transitive dependencies.
  * @property {Object}                        metadata.parseResult             Information generated by parsing the target application.
  * @property {Array.<Mutation>}              metadata.mutations               All mutations that have been applied since the initial environment.
+ * @property {Number}                        [metadata.priority]              Relative share of the search budget. Defaults to 1.
  * @property {Array.<EnvironmentValidation>} [metadata.fixedValidations]      Failed environment validation results where the underlying problem was fixed during inference.
+ * @property {Era}                           [metadata.era]                   Date the dependencies were pinned to, if starting from an era.
+ * @property {Array.<Object>}                [metadata.requirements]          Requirements stated by the code (name, specifier, sources) and the version each was pinned to.
+ * @property {Object}                        [metadata.seed]                  Knowledge base solution the environment was seeded from, with the similarity of its import set.
+ * @property {Array.<Object>}                [metadata.repairs]               Versions changed before validation to satisfy requirements between pinned dependencies, if the environment has no mutations.
+ * @property {Array.<Object>}                [metadata.conflicts]             Requirements between pinned dependencies left unsatisfied, if the environment has no mutations.
  * @property {Object}                        docker                           Docker specific environment options.
  * @property {String}                        docker.imageName                 Name of the Docker environment to use.
  * @property {String}                        docker.imageTag                  Docker image tag to use.
@@ -67,21 +74,38 @@
  */
 
 
+/**
+ * Estimated date an application was written.
+ *
+ * @typedef {Object} Era
+ *
+ * @property {Date}   date   Date.
+ * @property {String} source Evidence the date is taken from.
+ */
+
+
 /**
  * V2 inference procedure data.
  *
  * @typedef {Object} InferenceResult
  *
- * @property {Object}                      [error]                      Any encountered exception.
- * @property {Environment}                 [environment]                Inferred environment.
- * @property {Object}                      [metadata]                   Global inference metadata.
- * @property {Number}                      [metadata.start]             Start time (unix timestamp).
- * @property {Number}                      [metadata.end]               End time (unix timestamp).
- * @property {Set.<EnvironmentValidation>} [metadata.failedValidations] All unique past failing validation results.
- * @property {Number}                      [metadata.numValidations]    Total number of environments validated.
- * @property {EnvironmentValidation}       [metadata.validation]        Passing validation result.
- * @property {Array.<InstallCommand>}      [installCommands]            RUN commands used to install dependencies in the dockerfile.
- * @property {String}                      [dockerfile]                 Formatted environment dockerfile.
+ * @property {Object}                      [error]                         Any encountered exception.
+ * @property {Environment}                 [environment]                   Inferred environment.
+ * @property {Object}                      [metadata]                      Global inference metadata.
+ * @property {Number}                      [metadata.start]                Start time (unix timestamp).
+ * @property {Number}                      [metadata.end]                  End time (unix timestamp).
+ * @property {Set.<EnvironmentValidation>} [metadata.failedValidations]    All unique past failing validation results.
+ * @property {Number}                      [metadata.numValidations]       Total number of environments validated.
+ * @property {Number}                      [metadata.reusedValidations]    Number of environments whose validation was reused from an identical environment.
+ * @property {Number}                      [metadata.repairedEnvironments] Number of environments whose pinned versions were changed to satisfy each other's requirements.
+ * @property {Number}                      [metadata.rejectedEnvironments] Number of mutated environments not validated because their pinned versions conflict.
+ * @property {Number}                      [metadata.seededEnvironments]   Number of starting environments seeded from the knowledge base of solved codebases.
+ * @property {EnvironmentValidation}       [metadata.validation]           Passing validation result.
+ * @property {Object}                      [metadata.snapshot]             Offline PyPI snapshot served from, including its age in seconds.
+ * @property {Object}                      [metadata.freshness]            Cache freshness metrics (fresh, stale, and missing lookups, and background refreshes) by cache.
+ * @property {Object}                      [metadata.cache]                Cache hits, misses, and hit rates for the in-process (l1) and redis tiers by cache.
+ * @property {Array.<InstallCommand>}      [installCommands]               RUN commands used to install dependencies in the dockerfile.
+ * @property {String}                      [dockerfile]                    Formatted environment dockerfile.
  */
 
 
@@ -110,8 +134,10 @@
  *
  * @typedef {Object} Mutation
  *
- * @property {String} type    The type of mutation performed.
- * @property {Object} changes An object that describes the changes made in the environment mutation.
+ * @property {String}         type        The type of mutation performed.
+ * @property {Object}         changes     An object that describes the changes made in the environment mutation.
+ * @property {Array.<Object>} [repairs]   Other versions changed to satisfy requirements between pinned dependencies.
+ * @property {Array.<Object>} [conflicts] Requirements between pinned dependencies the mutation left unsatisfied.
  */
 
 
@@ -139,7 +165,8 @@
  *
  * @typedef EnvironmentValidation
  *
- * @property {String}                 status_code                          Result of overall validation process.
+ * @property {String}                 status_code                          Result of overall validation process. `Skipped` if the environment was not validated because its pinned versions conflict.
+ * @property {Array.<Object>}         [conflicts]                          Conflicting requirements of a skipped environment.
  * @property {String}                 [exception_name]                     Name of any unexpected exception that occurred.
  * @property {String}                 [exception_message]                  Message of any unexpected exception that occurred.
  * @property {String}                 [exception_file_name]                File name of any unexpected exception that occurred.
@@ -156,6 +183,7 @@
  * @property {Object}                 [dependencies]                       Metadata about dependency installation.
  * @property {String}                 dependencies.status_code             Result from installing dependencies.
  * @property {Array.<Array.<String>>} [dependencies.install_errors]        [stdout, stderr] pairs from any package installation failure.
+ * @property {Array.<Number>}         [dependencies.install_durations]     Seconds taken by the install command of each dependency, in installation order. Null where the install failed.
  * @property {String}                 [dependencies.exception_name]        Name of any exception that occurred while installing dependencies.
  * @property {String}                 [dependencies.exception_message]     Message of any exception that occurred while installing dependencies.
  * @property {String}                 [dependencies.exception_file_name]   File name of any exception that occurred while installing dependencies.